@@ -0,0 +1,23 @@
+"""
+Run the task manager as python -m task_manager from the directory above
+this one, with the same options and commands as task_manager.py.
+
+Example usage:
+python -m task_manager import tasks new_tasks.jsonl
+python -m task_manager export tasks all_tasks.csv
+
+Tasks and users are read from and saved to the working directory, as when
+task_manager.py is run. From this directory, python -m task_manager runs
+task_manager.py itself.
+"""
+
+# ====importing libraries====
+import sys
+
+from task_manager import task_manager as tm
+
+# ====Main code====
+if __name__ == "__main__":
+    # Show how the program was run in the usage, not this file's name
+    sys.argv[0] = "python -m task_manager"
+    tm.main()
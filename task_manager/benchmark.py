@@ -0,0 +1,889 @@
+"""
+Benchmarks for the task manager.
+
+Example usage (from the task_manager directory):
+python benchmark.py dates --tasks 1000000
+python benchmark.py memory --tasks 100000
+python benchmark.py reports --tasks 5000000
+python benchmark.py generate --tasks 1000000 --users 1000 --dir data
+python benchmark.py suite --tasks 10000 100000 1000000 --output results.json
+python benchmark.py suite --tasks 100000 --compare results.json
+python benchmark.py writes --tasks 100000
+python benchmark.py stress --workers 8 --adds 50
+python benchmark.py parallel --tasks 5000000 --workers 1 2 4 8
+
+"""
+
+# ====importing libraries====
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+import task_manager as tm
+
+
+# ====Helper Section====
+def time_call(func, *args, **kwargs) -> tuple[float, object]:
+    """
+    Time a single call of a function.
+
+    Parameters
+    ----------
+    func : callable
+        The function to call.
+    *args, **kwargs
+        Arguments passed to the function.
+
+    Returns
+    -------
+    tuple[float, object]
+        The elapsed wall time in seconds and the function's return value.
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def peak_memory_call(func, *args, **kwargs) -> int:
+    """
+    Measure the peak memory allocated during a single call of a function.
+
+    Parameters
+    ----------
+    func : callable
+        The function to call.
+    *args, **kwargs
+        Arguments passed to the function.
+
+    Returns
+    -------
+    int
+        The peak traced memory in bytes, above what was allocated before
+        the call.
+    """
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def random_date_strings(
+    count: int, distinct: int, seed: int = 0
+) -> list[str]:
+    """
+    Create date strings drawn from a small set of distinct dates.
+
+    Parameters
+    ----------
+    count : int
+        Number of date strings to create.
+    distinct : int
+        Number of distinct dates to draw from.
+    seed : int, optional
+        Random seed, by default 0.
+
+    Returns
+    -------
+    list[str]
+        Date strings in DATE_STRING_FORMAT.
+    """
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    pool = [
+        (start + timedelta(days=i)).strftime(tm.DATE_STRING_FORMAT)
+        for i in range(distinct)
+    ]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def write_synthetic_data(
+    tasks: int, users: int, seed: int = 0, today: date | None = None
+):
+    """
+    Write tasks.txt and user.txt files of generated data.
+
+    Tasks are assigned with a skew towards the first users (weight 1/rank),
+    roughly half are completed, and due dates fall within about a year
+    either side of today so some are overdue.
+
+    Parameters
+    ----------
+    tasks : int
+        Number of tasks to write.
+    users : int
+        Number of users to write, including admin.
+    seed : int, optional
+        Random seed, by default 0.
+    today : date | None, optional
+        The date to spread the dates around, by default date.today(). The
+        same seed and date always give the same files.
+    """
+    rng = random.Random(seed)
+    usernames = ["admin"] + [f"user{i}" for i in range(1, users)]
+    weights = [1 / rank for rank in range(1, users + 1)]
+
+    with open("user.txt", "w") as user_file:
+        user_file.write("\n".join(f"{u};password" for u in usernames))
+
+    if today is None:
+        today = date.today()
+    date_strings = [
+        (today + timedelta(days=offset)).strftime(tm.DATE_STRING_FORMAT)
+        for offset in range(-365, 366)
+    ]
+    batch_size = 100_000
+    with open("tasks.txt", "w") as task_file:
+        for batch_start in range(0, tasks, batch_size):
+            batch_count = min(batch_size, tasks - batch_start)
+            task_users = rng.choices(usernames, weights, k=batch_count)
+            lines = []
+            for i, username in enumerate(task_users, start=batch_start):
+                lines.append(
+                    f"{username};Task {i};Description of task {i};"
+                    f"{rng.choice(date_strings)};{date_strings[i % 365]};"
+                    f"{'Yes' if rng.random() < 0.5 else 'No'}\n"
+                )
+            task_file.write("".join(lines))
+
+
+# ====Benchmark Section====
+def bench_dates(tasks: int, distinct: int):
+    """
+    Compare parse_date with datetime.strptime.
+
+    Two dates are parsed per task, as in get_task_list. That both parsers
+    give the same dates is checked by tests/test_dates.py.
+
+    Parameters
+    ----------
+    tasks : int
+        Number of tasks to simulate.
+    distinct : int
+        Number of distinct dates in the data.
+    """
+    date_strings = random_date_strings(count=tasks * 2, distinct=distinct)
+
+    strptime_time, _ = time_call(
+        lambda: [
+            datetime.strptime(d, tm.DATE_STRING_FORMAT).date()
+            for d in date_strings
+        ]
+    )
+    tm.parse_date.cache_clear()
+    parse_date_time, _ = time_call(
+        lambda: [tm.parse_date(d) for d in date_strings]
+    )
+
+    print(f"Dates parsed: \t\t{len(date_strings)} ({distinct} distinct)")
+    print(f"datetime.strptime: \t{strptime_time:.3f}s")
+    print(f"parse_date: \t\t{parse_date_time:.3f}s")
+    print(f"Speedup: \t\t{strptime_time / parse_date_time:.1f}x")
+
+
+def bench_memory(tasks: int, users: int):
+    """
+    Compare the memory used by Task objects and by per-task dicts.
+
+    The dicts are built the way get_task_list built them before Task was
+    introduced: datetime fields and a separate username string per task.
+
+    Parameters
+    ----------
+    tasks : int
+        Number of tasks to create.
+    users : int
+        Number of distinct usernames.
+    """
+    date_strings = random_date_strings(count=tasks * 2, distinct=365)
+    task_data = [
+        f"user{i % users};Task {i};Description of task {i};"
+        f"{date_strings[2 * i]};{date_strings[2 * i + 1]};No"
+        for i in range(tasks)
+    ]
+
+    def dict_tasks() -> list[dict]:
+        task_list = []
+        for t_str in task_data:
+            task_components = t_str.split(";")
+            task_list.append(
+                {
+                    # Copy so each task has its own string, as when read
+                    # from the file
+                    "username": "".join(task_components[0]),
+                    "title": task_components[1],
+                    "description": task_components[2],
+                    "due_date": datetime.strptime(
+                        task_components[3], tm.DATE_STRING_FORMAT
+                    ),
+                    "assigned_date": datetime.strptime(
+                        task_components[4], tm.DATE_STRING_FORMAT
+                    ),
+                    "completed": task_components[5] == "Yes",
+                }
+            )
+        return task_list
+
+    results = {}
+    for name, build in (
+        ("dict", dict_tasks),
+        ("Task", lambda: tm.get_task_list(task_data=task_data)),
+    ):
+        tm.parse_date.cache_clear()
+        tracemalloc.start()
+        task_list = build()
+        results[name] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del task_list
+
+    print(f"Tasks: \t\t\t{tasks} ({users} users)")
+    for name, used in results.items():
+        print(f"{name} bytes per task: \t{used / tasks:.0f}")
+    print(f"Reduction: \t\t{1 - results['Task'] / results['dict']:.1%}")
+
+
+def bench_reports(tasks: int, users: int):
+    """
+    Compare the report count backends and check they agree.
+
+    A synthetic task file is loaded into a TaskStore and a list of Tasks,
+    each counted with the plain Python and NumPy backends, and counted
+    from the task index stats. The rendered reports are checked to be
+    byte-identical.
+
+    Parameters
+    ----------
+    tasks : int
+        Number of tasks to generate.
+    users : int
+        Number of users to generate.
+    """
+    start_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.chdir(data_dir)
+        try:
+            write_synthetic_data(tasks=tasks, users=users)
+            username_password = tm.get_username_password(tm.get_user_data())
+            load_time, task_store = time_call(
+                tm.load_task_list, store="columnar"
+            )
+            task_list = list(task_store)
+            task_index = tm.build_task_index(
+                task_list=task_store, search=False
+            )
+        finally:
+            # Leave the directory so it can be removed
+            os.chdir(start_dir)
+
+    curr_date = date.today()
+    usernames = username_password.keys()
+    backends = {
+        "python": lambda: tm.count_tasks(
+            task_store, usernames, curr_date, backend="python"
+        ),
+        "python list": lambda: tm.count_tasks(
+            task_list, usernames, curr_date, backend="python"
+        ),
+        "stats": lambda: tm.stats_counts(
+            task_index["stats"], usernames, curr_date
+        ),
+    }
+    if tm.np is not None:
+        backends["numpy"] = lambda: tm.count_tasks(
+            task_store, usernames, curr_date, backend="numpy"
+        )
+        backends["numpy list"] = lambda: tm.count_tasks(
+            task_list, usernames, curr_date, backend="numpy"
+        )
+    else:
+        print("NumPy is not installed, skipping the numpy backend")
+
+    print(f"Tasks: \t\t{tasks} ({users} users), loaded in {load_time:.2f}s")
+    reports = {}
+    for name, count in backends.items():
+        count_time, counts = time_call(count)
+        reports[name] = tm.render_reports(
+            counts=counts, user_count=len(username_password)
+        )
+        print(f"{name}: \t\t{count_time:.3f}s")
+
+    # Every backend must give exactly the same report files
+    for name, report in reports.items():
+        if report != reports["python"]:
+            raise AssertionError(f"{name} reports differ from python")
+    print("Reports identical: \tyes")
+
+
+def suite_cases(task_data: list[str], user_data: list[str]) -> list[tuple]:
+    """
+    Build the calls timed by the benchmark suite.
+
+    Each function gets the inputs it would get in the program, built once
+    beforehand so only the function itself is measured.
+
+    Parameters
+    ----------
+    task_data : list[str]
+        Task lines, as returned by get_task_data.
+    user_data : list[str]
+        User lines, as returned by get_user_data.
+
+    Returns
+    -------
+    list[tuple]
+        The function name, number of items it handles and a callable
+        making the call.
+    """
+    task_list = tm.get_task_list(task_data=task_data)
+    username_password = tm.get_username_password(user_data=user_data)
+
+    def view_all_to_null():
+        # Write to a null sink so the terminal is not measured
+        with open(os.devnull, "w") as null_file:
+            with contextlib.redirect_stdout(null_file):
+                tm.view_all(task_list=task_list, page_size=0)
+
+    return [
+        ("get_task_data", len(task_data), tm.get_task_data),
+        (
+            "get_task_list",
+            len(task_data),
+            lambda: tm.get_task_list(task_data=task_data),
+        ),
+        (
+            "get_username_password",
+            len(user_data),
+            lambda: tm.get_username_password(user_data=user_data),
+        ),
+        (
+            "write_task_list",
+            len(task_list),
+            lambda: tm.write_task_list(task_list=task_list),
+        ),
+        (
+            "generate_reports",
+            len(task_list),
+            lambda: tm.generate_reports(
+                task_list=task_list, username_password=username_password
+            ),
+        ),
+        ("view_all", len(task_list), view_all_to_null),
+    ]
+
+
+def bench_suite(
+    task_sizes: list[int],
+    users: int,
+    seed: int = 0,
+    measure_memory: bool = True,
+) -> list[dict]:
+    """
+    Time each public function of the task manager at several data sizes.
+
+    For each size, synthetic data is written to a temporary directory and
+    each function is timed once, then (unless turned off) called again
+    under tracemalloc for its peak memory, as tracing slows it down.
+
+    Parameters
+    ----------
+    task_sizes : list[int]
+        Numbers of tasks to generate, one run per size.
+    users : int
+        Number of users to generate.
+    seed : int, optional
+        Random seed, by default 0.
+    measure_memory : bool, optional
+        Whether to measure peak memory, by default True.
+
+    Returns
+    -------
+    list[dict]
+        One result per function and size, with keys function, tasks,
+        users, seconds, items_per_second and peak_bytes (None when memory
+        is not measured).
+    """
+    results = []
+    start_dir = os.getcwd()
+    print(
+        f"{'Function':<24}{'Tasks':>10}{'Seconds':>10}"
+        f"{'Items/s':>14}{'Peak MiB':>10}"
+    )
+    try:
+        for tasks in task_sizes:
+            with tempfile.TemporaryDirectory() as data_dir:
+                os.chdir(data_dir)
+                write_synthetic_data(tasks=tasks, users=users, seed=seed)
+                task_data = tm.get_task_data()
+                user_data = tm.get_user_data()
+                for name, items, call in suite_cases(
+                    task_data=task_data, user_data=user_data
+                ):
+                    tm.parse_date.cache_clear()
+                    seconds, _ = time_call(call)
+                    peak_bytes = None
+                    if measure_memory:
+                        tm.parse_date.cache_clear()
+                        peak_bytes = peak_memory_call(call)
+                    result = {
+                        "function": name,
+                        "tasks": tasks,
+                        "users": users,
+                        "seconds": seconds,
+                        "items_per_second": items / seconds if seconds else 0,
+                        "peak_bytes": peak_bytes,
+                    }
+                    results.append(result)
+                    print_result(result=result)
+                # Leave the directory so it can be removed
+                os.chdir(start_dir)
+    finally:
+        os.chdir(start_dir)
+    return results
+
+
+def print_result(result: dict):
+    """
+    Print one benchmark suite result as a table row.
+
+    Parameters
+    ----------
+    result : dict
+        A result, see bench_suite.
+    """
+    peak = result["peak_bytes"]
+    peak_str = "-" if peak is None else f"{peak / 2**20:.1f}"
+    print(
+        f"{result['function']:<24}{result['tasks']:>10}"
+        f"{result['seconds']:>10.3f}{result['items_per_second']:>14,.0f}"
+        f"{peak_str:>10}"
+    )
+
+
+def save_results(results: list[dict], file_name: str):
+    """
+    Save benchmark suite results to a JSON file.
+
+    Parameters
+    ----------
+    results : list[dict]
+        Results, see bench_suite.
+    file_name : str
+        The JSON file to write.
+    """
+    with open(file_name, "w") as out_file:
+        json.dump(
+            {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "numpy": tm.np is not None,
+                "results": results,
+            },
+            out_file,
+            indent=2,
+        )
+
+
+def compare_results(
+    results: list[dict], file_name: str, threshold: float = 0.1
+) -> list[dict]:
+    """
+    Compare benchmark suite results with those saved by an earlier run.
+
+    Results are matched on function, tasks and users. A result is a
+    regression if it took more than (1 + threshold) times as long.
+
+    Parameters
+    ----------
+    results : list[dict]
+        Results of this run, see bench_suite.
+    file_name : str
+        JSON file saved by save_results.
+    threshold : float, optional
+        Fraction of slowdown counted as a regression, by default 0.1.
+
+    Returns
+    -------
+    list[dict]
+        The results that regressed.
+    """
+    with open(file_name) as in_file:
+        saved = json.load(in_file)
+    baseline = {
+        (r["function"], r["tasks"], r["users"]): r for r in saved["results"]
+    }
+
+    print(f"\nCompared with {file_name} ({saved['date']})")
+    regressions = []
+    for result in results:
+        old = baseline.get(
+            (result["function"], result["tasks"], result["users"])
+        )
+        if old is None or not old["seconds"]:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(result)
+        print(
+            f"{result['function']:<24}{result['tasks']:>10}"
+            f"{old['seconds']:>10.3f}{result['seconds']:>10.3f}"
+            f"{ratio:>8.2f}x{flag}"
+        )
+    return regressions
+
+
+def bench_writes(tasks: int, commits: int):
+    """
+    Time the safe write paths against plain unlocked writes.
+
+    Rewriting tasks.txt through write_task_list (a temporary file, fsync
+    and os.replace under the storage lock) is compared with writing the
+    same lines straight over the file. Single task changes committed with
+    commit_task_changes (lock and version check) are compared with
+    appending the same journal lines with open and write.
+
+    Parameters
+    ----------
+    tasks : int
+        Number of tasks to write.
+    commits : int
+        Number of single change commits to time.
+    """
+    start_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.chdir(data_dir)
+        try:
+            write_synthetic_data(tasks=tasks, users=100)
+            tm.set_storage(tm.FlatFileStorage())
+            task_list = tm.load_task_list()
+
+            def plain_write():
+                with open("tasks.txt", "w") as task_file:
+                    task_file.write(
+                        "\n".join(tm.format_task(task=t) for t in task_list)
+                    )
+
+            changes = [
+                ("set", i % tasks, "completed", i % 2 == 0)
+                for i in range(commits)
+            ]
+
+            def plain_commits():
+                for _, task_num, field, value in changes:
+                    with open(tm.TASK_JOURNAL_FILE, "a") as journal_file:
+                        field_str = tm.format_task_field(
+                            field=field, value=value
+                        )
+                        journal_file.write(
+                            f"set;{task_num};{field};{field_str}\n"
+                        )
+
+            def safe_commits():
+                for change in changes:
+                    tm.commit_task_changes(
+                        task_list=task_list, changes=[change]
+                    )
+
+            # The safe writes go first, as the plain ones change the files
+            # behind the storage's back and would make its commits stale
+            safe_time, _ = time_call(tm.write_task_list, task_list=task_list)
+            safe_commit_time, _ = time_call(safe_commits)
+            plain_time, _ = time_call(plain_write)
+            plain_commit_time, _ = time_call(plain_commits)
+        finally:
+            # Leave the directory so it can be removed
+            os.chdir(start_dir)
+
+    print(f"Tasks: \t\t\t{tasks}")
+    print(f"Plain rewrite: \t\t{plain_time:.3f}s")
+    print(f"Atomic rewrite: \t{safe_time:.3f}s")
+    print(f"Commits: \t\t{commits}")
+    print(f"Plain append: \t\t{plain_commit_time / commits * 1e6:.1f}us each")
+    print(f"Locked commit: \t\t{safe_commit_time / commits * 1e6:.1f}us each")
+
+
+def stress_worker(worker: int, adds: int) -> int:
+    """
+    Add tasks one commit at a time, as a separate task manager session.
+
+    A commit rejected because another worker saved first reloads the
+    tasks and tries again, as the menu does.
+
+    Parameters
+    ----------
+    worker : int
+        Number of the worker, used in the task titles.
+    adds : int
+        Number of tasks to add.
+
+    Returns
+    -------
+    int
+        Number of commits rejected as stale.
+    """
+    tm.set_storage(tm.FlatFileStorage())
+    task_list = tm.load_task_list()
+    stale = 0
+    for i in range(adds):
+        new_task = tm.Task(
+            username="admin",
+            title=f"w{worker}-{i}",
+            description="Added by the stress test",
+            due_date=date.today(),
+            assigned_date=date.today(),
+            completed=False,
+        )
+        while True:
+            try:
+                tm.append_task(task_list=task_list, task=new_task)
+                break
+            except tm.StaleDataError:
+                stale += 1
+                task_list = tm.load_task_list()
+    return stale
+
+
+def bench_stress(workers: int, adds: int, tasks: int):
+    """
+    Run many writer processes against the same files and check no task is
+    lost or duplicated and the files still parse.
+
+    Parameters
+    ----------
+    workers : int
+        Number of writer processes.
+    adds : int
+        Number of tasks each writer adds, one commit each.
+    tasks : int
+        Number of tasks in the files to start with.
+    """
+    start_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.chdir(data_dir)
+        try:
+            write_synthetic_data(tasks=tasks, users=10)
+            with multiprocessing.Pool(processes=workers) as pool:
+                stress_time, stale_counts = time_call(
+                    pool.starmap,
+                    stress_worker,
+                    [(worker, adds) for worker in range(workers)],
+                )
+            tm.set_storage(tm.FlatFileStorage())
+            task_list = tm.load_task_list()
+        finally:
+            # Leave the directory so it can be removed
+            os.chdir(start_dir)
+
+    # Every task added once, and nothing else lost
+    titles = [t.title for t in task_list]
+    expected = {f"w{w}-{i}" for w in range(workers) for i in range(adds)}
+    added = [title for title in titles if title in expected]
+    if len(task_list) != tasks + len(expected):
+        raise AssertionError(
+            f"expected {tasks + len(expected)} tasks, found {len(task_list)}"
+        )
+    if sorted(added) != sorted(expected):
+        raise AssertionError("added tasks are missing or duplicated")
+
+    commit_count = workers * adds
+    print(f"Writers: \t\t{workers} x {adds} commits")
+    print(f"Time: \t\t\t{stress_time:.2f}s")
+    print(f"Throughput: \t\t{commit_count / stress_time:.0f} commits/s")
+    print(f"Stale retries: \t\t{sum(stale_counts)}")
+    print("Tasks intact: \t\tyes")
+
+
+def bench_parallel(tasks: int, users: int, worker_counts: list[int]):
+    """
+    Time loading and counting tasks.txt with different numbers of worker
+    processes, and check every count gives the same tasks and report
+    counts as a single process.
+
+    Parameters
+    ----------
+    tasks : int
+        Number of tasks to generate.
+    users : int
+        Number of users to generate.
+    worker_counts : list[int]
+        Numbers of worker processes to time.
+    """
+    start_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.chdir(data_dir)
+        try:
+            write_synthetic_data(tasks=tasks, users=users)
+            usernames = list(tm.get_username_password(tm.get_user_data()))
+            serial = tm.FlatFileStorage()
+            expected_lines = list(serial.load_task_store().iter_lines())
+            expected_counts = serial.report_counts(
+                usernames=usernames, curr_date=date.today()
+            )
+
+            chunks = tm.FlatFileStorage(workers=2).split_task_file()
+            print(f"Tasks: \t\t\t{tasks}")
+            print(f"Shares: \t\t{len(chunks)}")
+            print(f"{'Workers':<10}{'Load s':>10}{'Count s':>10}")
+            for workers in worker_counts:
+                storage = tm.FlatFileStorage(workers=workers)
+                load_time, task_store = time_call(storage.load_task_store)
+                count_time, counts = time_call(
+                    storage.report_counts,
+                    usernames=usernames,
+                    curr_date=date.today(),
+                )
+                if list(task_store.iter_lines()) != expected_lines:
+                    raise AssertionError(
+                        f"{workers} workers loaded other tasks"
+                    )
+                if counts != expected_counts:
+                    raise AssertionError(
+                        f"{workers} workers counted differently"
+                    )
+                print(f"{workers:<10}{load_time:>10.2f}{count_time:>10.2f}")
+        finally:
+            # Leave the directory so it can be removed
+            os.chdir(start_dir)
+    print("Results match: \t\tyes")
+
+
+# ====Main code====
+def main():
+    """
+    Parse the command line and run the selected benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    dates_parser = subparsers.add_parser(
+        "dates", help="compare parse_date with datetime.strptime"
+    )
+    dates_parser.add_argument("--tasks", type=int, default=1_000_000)
+    dates_parser.add_argument("--distinct", type=int, default=365)
+
+    memory_parser = subparsers.add_parser(
+        "memory", help="compare memory used by Task objects and dicts"
+    )
+    memory_parser.add_argument("--tasks", type=int, default=100_000)
+    memory_parser.add_argument("--users", type=int, default=100)
+
+    reports_parser = subparsers.add_parser(
+        "reports", help="compare and check the report count backends"
+    )
+    reports_parser.add_argument("--tasks", type=int, default=5_000_000)
+    reports_parser.add_argument("--users", type=int, default=1000)
+
+    generate_parser = subparsers.add_parser(
+        "generate", help="write synthetic tasks.txt and user.txt files"
+    )
+    generate_parser.add_argument("--tasks", type=int, default=1_000_000)
+    generate_parser.add_argument("--users", type=int, default=1000)
+    generate_parser.add_argument("--seed", type=int, default=0)
+    generate_parser.add_argument(
+        "--dir", default=".", help="directory to write the files to"
+    )
+
+    suite_parser = subparsers.add_parser(
+        "suite", help="time the public functions at several data sizes"
+    )
+    suite_parser.add_argument(
+        "--tasks", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    suite_parser.add_argument("--users", type=int, default=1000)
+    suite_parser.add_argument("--seed", type=int, default=0)
+    suite_parser.add_argument(
+        "--skip-memory",
+        action="store_true",
+        help="don't measure peak memory (saves a second run of each call)",
+    )
+    suite_parser.add_argument(
+        "--output", help="save the results to this JSON file"
+    )
+    suite_parser.add_argument(
+        "--compare", help="compare with results saved by an earlier run"
+    )
+    suite_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="slowdown counted as a regression, by default 0.1 (10%%)",
+    )
+
+    writes_parser = subparsers.add_parser(
+        "writes", help="time atomic, locked writes against plain writes"
+    )
+    writes_parser.add_argument("--tasks", type=int, default=100_000)
+    writes_parser.add_argument("--commits", type=int, default=1000)
+
+    stress_parser = subparsers.add_parser(
+        "stress", help="run parallel writer processes and check the tasks"
+    )
+    stress_parser.add_argument("--workers", type=int, default=8)
+    stress_parser.add_argument("--adds", type=int, default=50)
+    stress_parser.add_argument("--tasks", type=int, default=1000)
+
+    parallel_parser = subparsers.add_parser(
+        "parallel", help="time and check loading with worker processes"
+    )
+    parallel_parser.add_argument("--tasks", type=int, default=1_000_000)
+    parallel_parser.add_argument("--users", type=int, default=1000)
+    parallel_parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4]
+    )
+
+    args = parser.parse_args()
+    if args.benchmark == "dates":
+        bench_dates(tasks=args.tasks, distinct=args.distinct)
+    elif args.benchmark == "memory":
+        bench_memory(tasks=args.tasks, users=args.users)
+    elif args.benchmark == "reports":
+        bench_reports(tasks=args.tasks, users=args.users)
+    elif args.benchmark == "generate":
+        os.makedirs(args.dir, exist_ok=True)
+        os.chdir(args.dir)
+        write_synthetic_data(
+            tasks=args.tasks, users=args.users, seed=args.seed
+        )
+        print(f"Wrote {args.tasks} tasks and {args.users} users to {args.dir}")
+    elif args.benchmark == "suite":
+        results = bench_suite(
+            task_sizes=args.tasks,
+            users=args.users,
+            seed=args.seed,
+            measure_memory=not args.skip_memory,
+        )
+        if args.output:
+            save_results(results=results, file_name=args.output)
+            print(f"Results saved to {args.output}")
+        if args.compare:
+            regressions = compare_results(
+                results=results,
+                file_name=args.compare,
+                threshold=args.threshold,
+            )
+            if regressions:
+                sys.exit(1)
+    elif args.benchmark == "writes":
+        bench_writes(tasks=args.tasks, commits=args.commits)
+    elif args.benchmark == "stress":
+        bench_stress(workers=args.workers, adds=args.adds, tasks=args.tasks)
+    elif args.benchmark == "parallel":
+        bench_parallel(
+            tasks=args.tasks, users=args.users, worker_counts=args.workers
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""
+Replay scripted sessions against the task manager menus and report how
+long each menu action takes.
+
+Each session is everything typed from login to exit, so it drives
+launch_task_manager as a user would, without a terminal. Sessions are
+read from a session file (one JSON object per line, e.g. recorded with
+task_manager.py --record) or generated at random. They run against a
+copy of the data files, so the real files are not changed.
+
+Example usage (from the task_manager directory):
+python task_manager.py --record sessions.jsonl
+python session_replay.py --sessions sessions.jsonl --repeat 100
+python session_replay.py --generate 5000 --save-sessions sessions.jsonl
+
+"""
+
+# ====importing libraries====
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+
+import task_manager as tm
+
+# Menu actions a generated session picks from, with their weights
+USER_ACTIONS = {"va": 3, "vm": 3, "a": 2, "r": 1}
+ADMIN_ACTIONS = {**USER_ACTIONS, "gr": 1, "ds": 1}
+# Data files copied for the replay, if they exist
+DATA_FILES = ("tasks.txt", "user.txt", tm.TASK_JOURNAL_FILE)
+
+
+# ====Session Section====
+def load_sessions(file_name: str) -> list[list[str]]:
+    """
+    Read sessions from a session file.
+
+    Parameters
+    ----------
+    file_name : str
+        File with one JSON object per line, each with an "inputs" list.
+
+    Returns
+    -------
+    list[list[str]]
+        The input lines of each session.
+    """
+    with open(file_name) as session_file:
+        return [
+            json.loads(line)["inputs"] for line in session_file if line.strip()
+        ]
+
+
+def save_sessions(sessions: list[list[str]], file_name: str):
+    """
+    Write sessions to a session file, see load_sessions.
+
+    Parameters
+    ----------
+    sessions : list[list[str]]
+        The input lines of each session.
+    file_name : str
+        The session file to write.
+    """
+    with open(file_name, "w") as session_file:
+        for inputs in sessions:
+            session_file.write(json.dumps({"inputs": inputs}) + "\n")
+
+
+def generate_sessions(
+    count: int,
+    username_password: dict,
+    task_list: list[tm.Task],
+    page_size: int = tm.VIEW_PAGE_SIZE,
+    seed: int = 0,
+) -> list[list[str]]:
+    """
+    Generate random sessions that log in, use the menu and exit.
+
+    Sessions are meant to be replayed in order: users and tasks added by
+    one session are known to the ones after it, so every prompt gets an
+    answer (e.g. a task number in view mine only when the user has tasks).
+
+    Parameters
+    ----------
+    count : int
+        Number of sessions to generate.
+    username_password : dict
+        The existing users and their passwords.
+    task_list : list[Task]
+        The existing tasks.
+    page_size : int, optional
+        Page size view all will be run with, by default VIEW_PAGE_SIZE.
+    seed : int, optional
+        Random seed, by default 0.
+
+    Returns
+    -------
+    list[list[str]]
+        The input lines of each session.
+    """
+    rng = random.Random(seed)
+    username_password = dict(username_password)
+    usernames = list(username_password)
+    task_count = len(task_list)
+    user_task_counts = {}
+    for t in task_list:
+        user_task_counts[t.username] = user_task_counts.get(t.username, 0) + 1
+    today = date.today()
+
+    sessions = []
+    for session_num in range(count):
+        # About a third of sessions are by admin
+        if rng.random() < 0.3 and "admin" in username_password:
+            curr_user = "admin"
+            actions = ADMIN_ACTIONS
+        else:
+            curr_user = rng.choice(usernames)
+            actions = USER_ACTIONS
+        inputs = [curr_user, username_password[curr_user]]
+
+        for action_num in range(rng.randint(1, 8)):
+            action = rng.choices(list(actions), list(actions.values()))[0]
+            inputs.append(action)
+            if action == "r":
+                new_username = f"replay{session_num}_{action_num}"
+                inputs += [new_username, "password", "password"]
+                username_password[new_username] = "password"
+                usernames.append(new_username)
+            elif action == "a":
+                task_username = rng.choice(usernames)
+                due_date = today + timedelta(days=rng.randint(-30, 365))
+                inputs += [
+                    task_username,
+                    f"Replay task {session_num}.{action_num}",
+                    "Added by session replay",
+                    due_date.strftime(tm.DATE_STRING_FORMAT),
+                ]
+                task_count += 1
+                user_task_counts[task_username] = (
+                    user_task_counts.get(task_username, 0) + 1
+                )
+            elif action == "va":
+                # Leave the pager if there is more than one page
+                if 0 < page_size < task_count:
+                    inputs.append("q")
+            elif action == "vm":
+                # Return to the menu without editing
+                if user_task_counts.get(curr_user, 0):
+                    inputs.append("-1")
+
+        inputs.append("e")
+        sessions.append(inputs)
+    return sessions
+
+
+def run_session(
+    inputs: list[str], store: str = "list", page_size: int = tm.VIEW_PAGE_SIZE
+) -> tuple[bool, dict]:
+    """
+    Run one session from launch to exit with a ScriptedConsole.
+
+    Parameters
+    ----------
+    inputs : list[str]
+        Everything typed during the session, in order.
+    store : str, optional
+        How tasks are held in memory, see launch_task_manager, by default
+        "list".
+    page_size : int, optional
+        Page size for view all, by default VIEW_PAGE_SIZE.
+
+    Returns
+    -------
+    tuple[bool, dict]
+        Whether the session reached exit before its input ran out, and the
+        seconds taken by each menu action (see ScriptedConsole).
+    """
+    console = tm.ScriptedConsole(inputs=inputs)
+    tm.set_console(console)
+    try:
+        tm.launch_task_manager(store=store, page_size=page_size)
+    except SystemExit:
+        completed = True
+    except EOFError:
+        completed = False
+    finally:
+        # Let reports generated in the background finish in the replay
+        # directory
+        tm.REPORT_WORKER.wait()
+        tm.set_console(tm.Console())
+    return completed, console.action_times
+
+
+# ====Report Section====
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """
+    Get a percentile of sorted values by the nearest rank method.
+
+    Parameters
+    ----------
+    sorted_values : list[float]
+        The values, sorted in ascending order.
+    fraction : float
+        The percentile as a fraction, e.g. 0.99.
+
+    Returns
+    -------
+    float
+        The value at that percentile.
+    """
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_summary(action_times: dict) -> dict:
+    """
+    Summarise the seconds taken by each menu action.
+
+    Parameters
+    ----------
+    action_times : dict
+        Action: list of seconds taken.
+
+    Returns
+    -------
+    dict
+        Action: count and p50, p90, p99 and max in milliseconds.
+    """
+    summary = {}
+    for action, seconds in sorted(action_times.items()):
+        sorted_ms = sorted(s * 1000 for s in seconds)
+        summary[action] = {
+            "count": len(sorted_ms),
+            "p50_ms": percentile(sorted_ms, 0.5),
+            "p90_ms": percentile(sorted_ms, 0.9),
+            "p99_ms": percentile(sorted_ms, 0.99),
+            "max_ms": sorted_ms[-1],
+        }
+    return summary
+
+
+def print_summary(summary: dict):
+    """
+    Print the latency summary as a table.
+
+    Parameters
+    ----------
+    summary : dict
+        As returned by latency_summary.
+    """
+    print(
+        f"{'Action':<10}{'Count':>8}{'p50 ms':>10}{'p90 ms':>10}"
+        f"{'p99 ms':>10}{'max ms':>10}"
+    )
+    for action, stats in summary.items():
+        print(
+            f"{action:<10}{stats['count']:>8}{stats['p50_ms']:>10.2f}"
+            f"{stats['p90_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+            f"{stats['max_ms']:>10.2f}"
+        )
+
+
+# ====Main code====
+def main():
+    """
+    Parse the command line, run the sessions and report latencies.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument(
+        "--sessions", metavar="FILE", help="session file to replay"
+    )
+    parser.add_argument(
+        "--generate",
+        type=int,
+        default=0,
+        metavar="COUNT",
+        help="generate this many random sessions instead",
+    )
+    parser.add_argument(
+        "--save-sessions",
+        metavar="FILE",
+        help="save the generated sessions to replay again later",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="times to run the sessions"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--data", default=".", help="directory with tasks.txt and user.txt"
+    )
+    parser.add_argument(
+        "--store", choices=["list", "columnar"], default="list"
+    )
+    parser.add_argument("--page-size", type=int, default=tm.VIEW_PAGE_SIZE)
+    parser.add_argument("--output", help="save the summary to a JSON file")
+    args = parser.parse_args()
+    if not args.sessions and not args.generate:
+        parser.error("give --sessions FILE or --generate COUNT")
+
+    start_dir = os.getcwd()
+    data_dir = os.path.abspath(args.data)
+    action_times = {}
+    incomplete = 0
+    with tempfile.TemporaryDirectory() as replay_dir:
+        # Work on a copy of the data files
+        for file_name in DATA_FILES:
+            if os.path.exists(os.path.join(data_dir, file_name)):
+                shutil.copy(os.path.join(data_dir, file_name), replay_dir)
+        os.chdir(replay_dir)
+        try:
+            tm.set_storage(tm.FlatFileStorage())
+
+            if args.sessions:
+                sessions = load_sessions(
+                    os.path.join(start_dir, args.sessions)
+                )
+            else:
+                sessions = generate_sessions(
+                    count=args.generate,
+                    username_password=tm.get_username_password(
+                        tm.get_user_data()
+                    ),
+                    task_list=tm.load_task_list(),
+                    page_size=args.page_size,
+                    seed=args.seed,
+                )
+                if args.save_sessions:
+                    save_sessions(
+                        sessions=sessions,
+                        file_name=os.path.join(start_dir, args.save_sessions),
+                    )
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                for inputs in sessions:
+                    completed, session_times = run_session(
+                        inputs=inputs,
+                        store=args.store,
+                        page_size=args.page_size,
+                    )
+                    incomplete += not completed
+                    for action, seconds in session_times.items():
+                        action_times.setdefault(action, []).extend(seconds)
+            elapsed = time.perf_counter() - start
+        finally:
+            # Leave the directory so it can be removed
+            os.chdir(start_dir)
+
+    session_count = len(sessions) * args.repeat
+    print(
+        f"Sessions: \t{session_count} in {elapsed:.2f}s"
+        f" ({session_count / elapsed:.1f}/s), {incomplete} incomplete"
+    )
+    summary = latency_summary(action_times=action_times)
+    print_summary(summary=summary)
+    if args.output:
+        with open(args.output, "w") as out_file:
+            json.dump(
+                {
+                    "sessions": session_count,
+                    "incomplete": incomplete,
+                    "seconds": elapsed,
+                    "actions": summary,
+                },
+                out_file,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -19,645 +19,5927 @@ tm.launch_task_manager()
 """
 
 # ====importing libraries====
+import argparse
+import cProfile
+import csv
+import hashlib
+import io
+import json
+import math
+import mmap
 import os
-from datetime import datetime, date
+import re
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from dataclasses import dataclass
+from datetime import datetime, date, timedelta
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+
+# fcntl is only on Unix-like systems, without it files are not locked
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# NumPy is optional, used to speed up report counts when installed
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # Define constant
 DATE_STRING_FORMAT = "%Y-%m-%d"
+# Task fields in the order they are stored in tasks.txt
+TASK_FIELDS = (
+    "username",
+    "title",
+    "description",
+    "due_date",
+    "assigned_date",
+    "completed",
+)
+# Append-only log of task changes not yet folded into tasks.txt
+TASK_JOURNAL_FILE = "tasks.journal"
+# Number of journal entries after which the journal is compacted
+JOURNAL_COMPACT_THRESHOLD = 1000
+# Lock file shared by every process using the storage files
+LOCK_FILE = "tasks.lock"
+# Report files written by generate_reports
+REPORT_FILES = ("task_overview.txt", "user_overview.txt")
+# Last reports generated, reused while the tasks and users are unchanged
+REPORT_CACHE_FILE = "report_cache.json"
+# Index of user.txt for looking up one user, see UserIndex
+USER_INDEX_FILE = "user.idx"
+USER_INDEX_MAGIC = b"TMUSRIX2"
+# Index header: magic, inode, size and modification time (ns) of user.txt,
+# number of users
+USER_INDEX_HEADER = struct.Struct("<8sQQqQ")
+# Index record: username hash, offset of the user's line in user.txt
+USER_INDEX_RECORD = struct.Struct("<QQ")
+# Bytes appended to user.txt after which the index is rebuilt
+USER_INDEX_TAIL_LIMIT = 64 * 1024
+# Database used by the sqlite storage
+SQLITE_DB_FILE = "tasks.db"
+# Offset of the file change counter in the sqlite database header
+SQLITE_CHANGE_COUNTER_OFFSET = 24
+# Task records and string heap used by the binary storage
+BINARY_TASK_FILE = "tasks.bin"
+BINARY_HEAP_FILE = "tasks.heap"
+BINARY_TASK_MAGIC = b"TMTASKS2"
+BINARY_HEAP_MAGIC = b"TMHEAP01"
+# Binary task file header: the magic and a count of the saves that patched
+# records in place or replaced the file
+BINARY_TASK_HEADER = struct.Struct("<8sQ")
+# Binary task record: heap offset and length of username, title and
+# description, due and assigned date ordinals, completed, padding
+BINARY_RECORD = struct.Struct("<QIQIQIii?3x")
+BINARY_USER_REF = struct.Struct("<QI")
+BINARY_ORDINAL = struct.Struct("<i")
+BINARY_FLAG = struct.Struct("<?")
+BINARY_DUE_DATE_OFFSET = struct.calcsize("<QIQIQI")
+BINARY_COMPLETED_OFFSET = struct.calcsize("<QIQIQIii")
+# Number of distinct dates remembered by parse_date and format_date
+DATE_CACHE_SIZE = 4096
+# Number of tasks shown on each page of view_all, 0 shows every task
+VIEW_PAGE_SIZE = 20
+# Number of tasks formatted per write when view_all shows every task
+VIEW_BATCH_SIZE = 1000
+# Number of formatted tasks kept for pages shown again, see
+# render_task_page
+DISPLAY_CACHE_SIZE = 1000
+# Days after today covered by the upcoming tasks view (vu)
+UPCOMING_DAYS = 7
+# Words in task titles and descriptions indexed for search (s)
+SEARCH_WORD_PATTERN = re.compile(r"\w+")
+# Options of the main menu, each timed separately when metrics are on
+MENU_ACTIONS = (
+    "r",
+    "a",
+    "va",
+    "vm",
+    "vo",
+    "vu",
+    "s",
+    "bu",
+    "gr",
+    "ds",
+    "e",
+)
+# Environment variable naming a metrics file, the same as --metrics
+METRICS_ENV_VAR = "TASK_MANAGER_METRICS"
+# Task fields that can be changed in bulk, see bulk_update_tasks
+BULK_FIELDS = ("username", "due_date", "completed")
+# File formats of the import and export commands
+TRANSFER_FORMATS = ("csv", "jsonl")
+# Number of records read or written at a time by import and export
+TRANSFER_BATCH_SIZE = 5000
+# Share of tasks.txt parsed or counted by each job when the text storage
+# uses worker processes; smaller files are read by one process
+PARALLEL_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+# ====Metrics Section====
+# Opt-in timings, call counts and bytes read/written, see Metrics. Turned on
+# with --metrics FILE or the METRICS_ENV_VAR environment variable.
+class Metrics:
+    """
+    Wall time, call counts and bytes read and written for named parts of
+    the program: the functions marked with @instrumented and each menu
+    action.
+
+    Bytes read or written by the storage and the report files are added
+    to every timer running at the time, e.g. both commit_task_changes and
+    the menu action that called it. The text and binary storages report
+    bytes; the sqlite storage does not.
+
+    When disabled nothing is recorded, so instrumented functions only pay
+    for one attribute check. One menu action can also be run under
+    cProfile, whether or not the metrics are enabled.
+
+    Parameters
+    ----------
+    enabled : bool, optional
+        Whether to record metrics, by default False.
+    profile_action : str | None, optional
+        Menu action to profile, e.g. "vm", by default None.
+    """
+
+    def __init__(
+        self, enabled: bool = False, profile_action: str | None = None
+    ):
+        self.enabled = enabled
+        self.profile_action = profile_action
+        self.profiler = None
+        # Name: {"calls", "seconds", "bytes_read", "bytes_written"}
+        self.stats = {}
+        # Timers running on each thread, see active
+        self.local = threading.local()
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    @property
+    def active(self) -> list:
+        """
+        Stats of the timers running on the current thread, innermost last,
+        so reports generated in the background (see ReportWorker) don't
+        add to the menu action running at the same time.
+        """
+        if not hasattr(self.local, "active"):
+            self.local.active = []
+        return self.local.active
+
+    @contextmanager
+    def timer(self, name: str):
+        """
+        Time a block of code and count it as one call of name.
+
+        Parameters
+        ----------
+        name : str
+            The metric name, e.g. a function name.
+        """
+        if not self.enabled:
+            yield
+            return
+        stats = self.stats.setdefault(
+            name,
+            {"calls": 0, "seconds": 0.0, "bytes_read": 0, "bytes_written": 0},
+        )
+        self.active.append(stats)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats["seconds"] += time.perf_counter() - start
+            stats["calls"] += 1
+            self.active.pop()
+
+    @contextmanager
+    def action(self, action: str):
+        """
+        Time a menu action, profiling it if it is the profiled action.
+
+        Parameters
+        ----------
+        action : str
+            The menu option chosen, e.g. "vm".
+        """
+        name = f"menu_{action}" if action in MENU_ACTIONS else "menu_invalid"
+        with self.timer(name=name):
+            if action != self.profile_action:
+                yield
+                return
+            # Calls of the action add up in one profile
+            if self.profiler is None:
+                self.profiler = cProfile.Profile()
+            self.profiler.enable()
+            try:
+                yield
+            finally:
+                self.profiler.disable()
+
+    def add_bytes(self, read: int = 0, written: int = 0):
+        """
+        Count bytes read from or written to files.
+
+        Parameters
+        ----------
+        read : int, optional
+            Bytes read, by default 0.
+        written : int, optional
+            Bytes written, by default 0.
+        """
+        if not self.enabled:
+            return
+        self.bytes_read += read
+        self.bytes_written += written
+        for stats in self.active:
+            stats["bytes_read"] += read
+            stats["bytes_written"] += written
+
+    def to_json(self) -> str:
+        """
+        Format the metrics as JSON.
+        """
+        return json.dumps(
+            {
+                "metrics": self.stats,
+                "bytes_read": self.bytes_read,
+                "bytes_written": self.bytes_written,
+            },
+            indent=2,
+        )
+
+    def to_prometheus(self) -> str:
+        """
+        Format the metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        for key, help_text in (
+            ("calls", "Number of calls."),
+            ("seconds", "Total wall time in seconds."),
+            ("bytes_read", "Bytes read from files."),
+            ("bytes_written", "Bytes written to files."),
+        ):
+            metric = f"task_manager_{key}_total"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, stats in self.stats.items():
+                lines.append(f'{metric}{{name="{name}"}} {stats[key]}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, file_name: str):
+        """
+        Write the metrics to a file, in the Prometheus text format if the
+        file name ends in .prom and as JSON otherwise.
+
+        Parameters
+        ----------
+        file_name : str
+            The file to write.
+        """
+        if file_name.endswith(".prom"):
+            text = self.to_prometheus()
+        else:
+            text = self.to_json()
+        with open(file_name, "w") as metrics_file:
+            metrics_file.write(text)
+
+    def save_profile(self, file_name: str) -> bool:
+        """
+        Save the profile of the profiled action for pstats or snakeviz.
+
+        Parameters
+        ----------
+        file_name : str
+            The file to write.
+
+        Returns
+        -------
+        bool
+            False if the action was never run, so there is no profile.
+        """
+        if self.profiler is None:
+            return False
+        self.profiler.dump_stats(file_name)
+        return True
+
+
+METRICS = Metrics()
+
+
+def set_metrics(metrics: Metrics):
+    """
+    Choose the metrics recorder, e.g. an enabled one.
+
+    Parameters
+    ----------
+    metrics : Metrics
+        The metrics recorder to use.
+    """
+    global METRICS
+    METRICS = metrics
+
+
+def instrumented(name: str):
+    """
+    Decorator recording the calls of a function under name in METRICS.
+
+    Parameters
+    ----------
+    name : str
+        The metric name.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return func(*args, **kwargs)
+            with METRICS.timer(name=name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def file_size(file_name: str) -> int:
+    """
+    Get the size of a file in bytes, 0 if it doesn't exist.
+    """
+    try:
+        return os.path.getsize(file_name)
+    except OSError:
+        return 0
+
+
+# ====Task Section====
+@dataclass(slots=True)
+class Task:
+    """
+    A single task assigned to a user.
+
+    Uses __slots__ rather than a per-task dict to keep large task lists
+    small. Usernames are interned so tasks share one string per user.
+    Fields can also be read and set by name, as task["title"], for code
+    written against the old dictionary tasks.
+
+    Attributes
+    ----------
+    username : str
+        The user the task is assigned to.
+    title : str
+        Title of the task.
+    description : str
+        Description of the task.
+    due_date : date
+        The date the task is due.
+    assigned_date : date
+        The date the task was assigned.
+    completed : bool
+        Whether the task is complete.
+    """
+
+    username: str
+    title: str
+    description: str
+    due_date: date
+    assigned_date: date
+    completed: bool = False
+
+    def __post_init__(self):
+        self.username = sys.intern(self.username)
+
+    def __getitem__(self, field: str):
+        if field not in TASK_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __setitem__(self, field: str, value):
+        if field not in TASK_FIELDS:
+            raise KeyError(field)
+        setattr(self, field, value)
+
+
+# ====Task Store Section====
+class TaskStore:
+    """
+    Columnar store of tasks for very large task lists.
+
+    An alternative to a list of Task objects that keeps each field in its
+    own contiguous buffer:
+        - usernames as integer codes into a table of usernames
+        - due and assigned dates as day ordinals in array('i')
+        - completion as a bitmap, one bit per task
+        - titles and descriptions packed into one UTF-8 string pool
+
+    It supports the parts of the list interface used by the menu functions
+    (len, iteration, store[i], store[i] = task and append), handing out
+    Task objects built on demand. Counting and serialization read the
+    buffers directly without creating Task objects.
+    """
+
+    def __init__(self):
+        self.usernames = []
+        self.user_codes = {}
+        self.task_users = array("i")
+        self.due_dates = array("i")
+        self.assigned_dates = array("i")
+        self.completed = bytearray()
+        # Start and end offsets into the string pool of each title and
+        # description, title first
+        self.text_offsets = array("q")
+        self.text_pool = bytearray()
+        self.task_count = 0
+
+    @classmethod
+    def from_lines(cls, task_data: Iterable[str]) -> "TaskStore":
+        """
+        Create a store from lines of tasks.txt without building Tasks.
+
+        Parameters
+        ----------
+        task_data : Iterable[str]
+            A list (or generator) of strings representing tasks.
+
+        Returns
+        -------
+        TaskStore
+            A store holding the tasks.
+        """
+        store = cls()
+        for t_str in task_data:
+            task_components = t_str.split(";")
+            store.append_fields(
+                username=task_components[0],
+                title=task_components[1],
+                description=task_components[2],
+                due_ordinal=parse_date(task_components[3]).toordinal(),
+                assigned_ordinal=parse_date(task_components[4]).toordinal(),
+                completed=task_components[5] == "Yes",
+            )
+        return store
+
+    def __len__(self) -> int:
+        return self.task_count
+
+    def __iter__(self) -> Iterator[Task]:
+        for task_num in range(self.task_count):
+            yield self[task_num]
+
+    def __getitem__(self, task_num: int) -> Task:
+        task_num = self.check_task_num(task_num)
+        return Task(
+            username=self.usernames[self.task_users[task_num]],
+            title=self.get_text(2 * task_num),
+            description=self.get_text(2 * task_num + 1),
+            due_date=date.fromordinal(self.due_dates[task_num]),
+            assigned_date=date.fromordinal(self.assigned_dates[task_num]),
+            completed=self.is_completed(task_num),
+        )
+
+    def __setitem__(self, task_num: int, task: Task):
+        task_num = self.check_task_num(task_num)
+        self.task_users[task_num] = self.get_user_code(task.username)
+        self.due_dates[task_num] = task.due_date.toordinal()
+        self.assigned_dates[task_num] = task.assigned_date.toordinal()
+        self.set_completed(task_num, task.completed)
+        # Text is only added to the pool if it has changed
+        if task.title != self.get_text(2 * task_num):
+            self.set_text(2 * task_num, task.title)
+        if task.description != self.get_text(2 * task_num + 1):
+            self.set_text(2 * task_num + 1, task.description)
+
+    def append(self, task: Task):
+        """
+        Add a task to the end of the store.
+
+        Parameters
+        ----------
+        task : Task
+            The task to add.
+        """
+        self.append_fields(
+            username=task.username,
+            title=task.title,
+            description=task.description,
+            due_ordinal=task.due_date.toordinal(),
+            assigned_ordinal=task.assigned_date.toordinal(),
+            completed=task.completed,
+        )
+
+    def append_fields(
+        self,
+        username: str,
+        title: str,
+        description: str,
+        due_ordinal: int,
+        assigned_ordinal: int,
+        completed: bool,
+    ):
+        """
+        Add a task to the end of the store from its field values.
+
+        Parameters
+        ----------
+        username : str
+            The user the task is assigned to.
+        title : str
+            Title of the task.
+        description : str
+            Description of the task.
+        due_ordinal : int
+            Due date as a day ordinal (date.toordinal()).
+        assigned_ordinal : int
+            Assigned date as a day ordinal.
+        completed : bool
+            Whether the task is complete.
+        """
+        task_num = self.task_count
+        self.task_count += 1
+        self.task_users.append(self.get_user_code(username))
+        self.due_dates.append(due_ordinal)
+        self.assigned_dates.append(assigned_ordinal)
+        if task_num % 8 == 0:
+            self.completed.append(0)
+        self.set_completed(task_num, completed)
+        self.text_offsets.extend((0, 0, 0, 0))
+        self.set_text(2 * task_num, title)
+        self.set_text(2 * task_num + 1, description)
+
+    def extend(self, other: "TaskStore"):
+        """
+        Add the tasks of another store to the end of this one, e.g. one
+        loaded from another part of tasks.txt.
+
+        The other store's buffers are copied whole, with its user codes,
+        string pool offsets and completed bits moved to fit this store.
+
+        Parameters
+        ----------
+        other : TaskStore
+            The store to add the tasks of.
+        """
+        code_map = [self.get_user_code(user) for user in other.usernames]
+        pool_start = len(self.text_pool)
+        if np is not None:
+            task_users = np.asarray(code_map, dtype=np.intc)[
+                np.frombuffer(other.task_users, dtype=np.intc)
+            ]
+            self.task_users.frombytes(task_users.tobytes())
+            text_offsets = (
+                np.frombuffer(other.text_offsets, dtype=np.int64) + pool_start
+            )
+            self.text_offsets.frombytes(text_offsets.tobytes())
+        else:
+            self.task_users.extend(map(code_map.__getitem__, other.task_users))
+            self.text_offsets.extend(
+                offset + pool_start for offset in other.text_offsets
+            )
+        self.due_dates.extend(other.due_dates)
+        self.assigned_dates.extend(other.assigned_dates)
+        self.text_pool += other.text_pool
+
+        # Shift the other completed bits along by the bits already used in
+        # this store's last byte
+        shift = self.task_count % 8
+        if shift == 0:
+            self.completed += other.completed
+        else:
+            for bits in other.completed:
+                self.completed[-1] |= (bits << shift) & 0xFF
+                self.completed.append(bits >> (8 - shift))
+        self.task_count += other.task_count
+        del self.completed[(self.task_count + 7) // 8 :]
+
+    def check_task_num(self, task_num: int) -> int:
+        """
+        Check a task number is in range, allowing negative numbers.
+
+        Returns
+        -------
+        int
+            The task number counted from the start of the store.
+        """
+        if task_num < 0:
+            task_num += self.task_count
+        if not 0 <= task_num < self.task_count:
+            raise IndexError("task number out of range")
+        return task_num
+
+    def get_user_code(self, username: str) -> int:
+        """
+        Get the code for a username, adding it to the user table if new.
+        """
+        code = self.user_codes.get(username)
+        if code is None:
+            code = len(self.usernames)
+            self.usernames.append(sys.intern(username))
+            self.user_codes[username] = code
+        return code
+
+    def is_completed(self, task_num: int) -> bool:
+        """
+        Check the completed bit of a task.
+        """
+        return bool(self.completed[task_num >> 3] & (1 << (task_num & 7)))
+
+    def set_completed(self, task_num: int, completed: bool):
+        """
+        Set or clear the completed bit of a task.
+        """
+        if completed:
+            self.completed[task_num >> 3] |= 1 << (task_num & 7)
+        else:
+            self.completed[task_num >> 3] &= ~(1 << (task_num & 7)) & 0xFF
+
+    def get_text(self, text_num: int) -> str:
+        """
+        Read a title (2 * task_num) or description (2 * task_num + 1).
+        """
+        start = self.text_offsets[2 * text_num]
+        end = self.text_offsets[2 * text_num + 1]
+        return self.text_pool[start:end].decode()
+
+    def set_text(self, text_num: int, text: str):
+        """
+        Add text to the end of the string pool and point to it.
+        """
+        start = len(self.text_pool)
+        self.text_pool += text.encode()
+        self.text_offsets[2 * text_num] = start
+        self.text_offsets[2 * text_num + 1] = len(self.text_pool)
+
+    def iter_lines(self) -> Iterator[str]:
+        """
+        Yield each task formatted as a line of tasks.txt.
+
+        Dates are formatted once per distinct day rather than once per task.
+        """
+        date_strings = {}
+        for ordinal in set(self.due_dates) | set(self.assigned_dates):
+            date_strings[ordinal] = date.fromordinal(ordinal).strftime(
+                DATE_STRING_FORMAT
+            )
+
+        for task_num in range(self.task_count):
+            yield ";".join(
+                (
+                    self.usernames[self.task_users[task_num]],
+                    self.get_text(2 * task_num),
+                    self.get_text(2 * task_num + 1),
+                    date_strings[self.due_dates[task_num]],
+                    date_strings[self.assigned_dates[task_num]],
+                    "Yes" if self.is_completed(task_num) else "No",
+                )
+            )
+
+    def count_tasks(
+        self, usernames: Iterable[str], curr_date: date
+    ) -> tuple[int, int, int, dict]:
+        """
+        Count total, completed and overdue tasks overall and for each user.
+
+        See count_tasks for the returned values.
+        """
+        curr_ordinal = curr_date.toordinal()
+        code_counts = [[0, 0, 0] for _ in self.usernames]
+        for task_num, (code, due_ordinal) in enumerate(
+            zip(self.task_users, self.due_dates)
+        ):
+            counts = code_counts[code]
+            counts[0] += 1
+            if self.completed[task_num >> 3] & (1 << (task_num & 7)):
+                counts[1] += 1
+            elif due_ordinal < curr_ordinal:
+                counts[2] += 1
+
+        user_dict = {
+            user: {"task_count": 0, "completed": 0, "overdue": 0}
+            for user in usernames
+        }
+        for code, (task_count, completed, overdue) in enumerate(code_counts):
+            # Skip users missing from the user list who have no tasks left
+            if self.usernames[code] not in user_dict and not task_count:
+                continue
+            user_dict[self.usernames[code]] = {
+                "task_count": task_count,
+                "completed": completed,
+                "overdue": overdue,
+            }
+        total_completed = sum(counts[1] for counts in code_counts)
+        total_overdue = sum(counts[2] for counts in code_counts)
+        return self.task_count, total_completed, total_overdue, user_dict
+
+
+# ====Parallel Loading Section====
+# Very large tasks.txt files can be split into shares of whole lines that
+# are parsed or counted in worker processes, see FlatFileStorage.workers.
+# These run in the workers, so take and return only picklable values.
+def read_chunk_lines(
+    file_name: str, start: int, end: int, task_changes: dict
+) -> Iterator[str]:
+    """
+    Yield the tasks in a share of tasks.txt, as read_task_data does.
+
+    Parameters
+    ----------
+    file_name : str
+        The tasks file.
+    start : int
+        Byte offset of the first line of the share.
+    end : int
+        Byte offset just after the last line of the share.
+    task_changes : dict
+        Journalled field changes by task number, counted from the first
+        task in the share, see FlatFileStorage.read_journal.
+
+    Yields
+    ------
+    str
+        A string representing a task, fields separated by semicolons.
+    """
+    with open(file_name, "rb") as task_file:
+        task_file.seek(start)
+        data = task_file.read(end - start)
+
+    task_num = 0
+    # Decoded and split into lines as the file opened as text would be
+    for t_str in io.TextIOWrapper(io.BytesIO(data)):
+        t_str = t_str.rstrip("\n")
+        # Gets rid of the blank lines in the task file
+        if t_str == "":
+            continue
+        yield apply_task_changes(t_str, task_changes.get(task_num))
+        task_num += 1
+
+
+def count_chunk_lines(file_name: str, start: int, end: int) -> int:
+    """
+    Count the tasks in a share of tasks.txt, see read_chunk_lines.
+    """
+    return sum(
+        1
+        for _ in read_chunk_lines(
+            file_name=file_name, start=start, end=end, task_changes={}
+        )
+    )
+
+
+def load_task_chunk(
+    file_name: str, start: int, end: int, task_changes: dict
+) -> TaskStore:
+    """
+    Load the tasks in a share of tasks.txt into a TaskStore, see
+    read_chunk_lines.
+    """
+    return TaskStore.from_lines(
+        read_chunk_lines(
+            file_name=file_name,
+            start=start,
+            end=end,
+            task_changes=task_changes,
+        )
+    )
+
+
+def count_task_chunk(
+    file_name: str,
+    start: int,
+    end: int,
+    task_changes: dict,
+    curr_ordinal: int,
+) -> dict[str, list[int]]:
+    """
+    Count the tasks in a share of tasks.txt for each user, see
+    read_chunk_lines and count_task_lines.
+    """
+    return count_task_lines(
+        task_data=read_chunk_lines(
+            file_name=file_name,
+            start=start,
+            end=end,
+            task_changes=task_changes,
+        ),
+        curr_ordinal=curr_ordinal,
+    )
+
+
+def count_task_lines(
+    task_data: Iterable[str], curr_ordinal: int
+) -> dict[str, list[int]]:
+    """
+    Count total, completed and overdue tasks for each user, straight from
+    lines of tasks.txt.
+
+    Parameters
+    ----------
+    task_data : Iterable[str]
+        A list (or generator) of strings representing tasks.
+    curr_ordinal : int
+        Tasks due before this day ordinal are overdue.
+
+    Returns
+    -------
+    dict[str, list[int]]
+        The task count, completed count and overdue count of each user
+        with tasks, keyed by username.
+    """
+    user_counts = {}
+    for t_str in task_data:
+        task_components = t_str.split(";")
+        counts = user_counts.get(task_components[0])
+        if counts is None:
+            counts = user_counts[task_components[0]] = [0, 0, 0]
+        counts[0] += 1
+        # Only overdue if not completed
+        if task_components[5] == "Yes":
+            counts[1] += 1
+        elif parse_date(task_components[3]).toordinal() < curr_ordinal:
+            counts[2] += 1
+    return user_counts
+
+
+def merge_task_counts(
+    chunk_counts: Iterable[dict[str, list[int]]], usernames: Iterable[str]
+) -> tuple[int, int, int, dict]:
+    """
+    Add up the counts of each share of the tasks, see count_task_lines.
+
+    Parameters
+    ----------
+    chunk_counts : Iterable[dict[str, list[int]]]
+        The counts for each user in each share.
+    usernames : Iterable[str]
+        Usernames to include in the per user counts.
+
+    Returns
+    -------
+    tuple[int, int, int, dict]
+        See count_tasks.
+    """
+    user_dict = {
+        user: {"task_count": 0, "completed": 0, "overdue": 0}
+        for user in usernames
+    }
+    for user_counts in chunk_counts:
+        for user, (task_count, completed, overdue) in user_counts.items():
+            stats = user_dict.setdefault(
+                user, {"task_count": 0, "completed": 0, "overdue": 0}
+            )
+            stats["task_count"] += task_count
+            stats["completed"] += completed
+            stats["overdue"] += overdue
+    return (
+        sum(stats["task_count"] for stats in user_dict.values()),
+        sum(stats["completed"] for stats in user_dict.values()),
+        sum(stats["overdue"] for stats in user_dict.values()),
+        user_dict,
+    )
+
+
+# ====Storage Section====
+# Tasks and users are read and written through a storage object, so the
+# text files can be swapped for another backend. Every storage has:
+#   iter_task_data()       - yield task lines as stored in tasks.txt
+#   load_task_store()      - load the tasks into a TaskStore
+#   write_tasks(task_list) - replace all stored tasks
+#   commit(task_list, changes) - save task changes, see commit_task_changes
+#   get_user_data()        - list of "username;password" strings
+#   write_users(user_data) - replace all stored users
+#   add_user(username, password)
+#   report_counts(usernames, curr_date) - counts as returned by count_tasks
+class StaleDataError(Exception):
+    """
+    Raised when saving changes made to tasks or users that another session
+    has changed since they were loaded. Reload and try again.
+    """
+
+
+class FileLock:
+    """
+    Advisory lock on a file, shared by every task manager process using
+    the same storage files.
+
+    Uses fcntl.flock, so does nothing where fcntl is not available (e.g.
+    Windows). Holds can be nested within a process; only the outermost
+    takes and releases the lock, and nested holds keep its mode. An
+    exclusive hold can't be nested in a shared one and raises
+    RuntimeError: flock can't upgrade a lock without letting go of it
+    first, and two sessions upgrading at once would wait on each other.
+
+    Readers let go of it before yielding anything, so one stopped part
+    way can't leave it held.
+
+    Parameters
+    ----------
+    file_name : str
+        The lock file, created if it doesn't exist.
+    """
+
+    def __init__(self, file_name: str):
+        self.file_name = file_name
+        self.lock_file = None
+        self.depth = 0
+        # Whether the outermost hold is shared
+        self.shared = False
+
+    @contextmanager
+    def hold(self, shared: bool = False):
+        """
+        Hold the lock for the duration of a with block.
+
+        Parameters
+        ----------
+        shared : bool, optional
+            Take a shared (read) lock rather than an exclusive (write)
+            lock, by default False.
+
+        Raises
+        ------
+        RuntimeError
+            If an exclusive hold is nested in a shared one.
+        """
+        if self.depth == 0:
+            if fcntl is not None:
+                self.lock_file = open(self.file_name, "a")
+                fcntl.flock(
+                    self.lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+                )
+            self.shared = shared
+        elif self.shared and not shared:
+            raise RuntimeError(
+                "The storage lock can't be held exclusive inside a shared"
+                " hold"
+            )
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            if self.depth == 0 and self.lock_file is not None:
+                fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+                self.lock_file.close()
+                self.lock_file = None
+
+
+# Readers take it shared and writers exclusive, so nothing is read part
+# way through a change, e.g. between replacing tasks.txt and clearing the
+# task journal
+STORAGE_LOCK = FileLock(LOCK_FILE)
+
+
+@contextmanager
+def atomic_open(file_name: str, mode: str = "w"):
+    """
+    Open a file for writing that replaces file_name in one step once the
+    with block finishes.
+
+    The data is written to a temporary file in the same directory, flushed
+    to disk with fsync and moved over file_name with os.replace, so other
+    sessions and crashes see either the old file or the new one, never a
+    part written one. If the block raises, file_name is left as it was.
+
+    Parameters
+    ----------
+    file_name : str
+        The file to replace.
+    mode : str, optional
+        "w" for text or "wb" for binary, by default "w".
+    """
+    directory = os.path.dirname(os.path.abspath(file_name))
+    temp_fd, temp_name = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(file_name)}."
+    )
+    try:
+        with open(temp_fd, mode) as temp_file:
+            yield temp_file
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        # Keep the permissions of the file being replaced
+        if os.path.exists(file_name):
+            os.chmod(temp_name, os.stat(file_name).st_mode & 0o777)
+        else:
+            os.chmod(temp_name, 0o644)
+        os.replace(temp_name, file_name)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+
+
+def file_signature(file_name: str) -> tuple | None:
+    """
+    Get the inode, size and modification time of a file, which change when
+    it is written or replaced. None if the file doesn't exist.
+    """
+    try:
+        file_stat = os.stat(file_name)
+    except OSError:
+        return None
+    return file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns
+
+
+class UserIndex:
+    """
+    On-disk index of user.txt, to look up one user without reading and
+    splitting the whole file.
+
+    user.idx holds USER_INDEX_MAGIC, the inode, size and modification time
+    of user.txt when it was indexed and the number of users (see
+    USER_INDEX_HEADER), then
+    one USER_INDEX_RECORD per user sorted by hash: a 64-bit hash of the
+    username and the offset of the user's line in user.txt. A lookup
+    binary searches the mapped records and reads one line of user.txt.
+
+    Users appended to user.txt since it was indexed are found by reading
+    just the new bytes: appends by add_user record the new modification
+    time in the header (see record_append). The index is rebuilt when
+    user.txt is replaced, changed any other way (e.g. edited in place,
+    which changes its modification time but maybe not its size) or more
+    than USER_INDEX_TAIL_LIMIT bytes have been appended since.
+
+    The caller holds STORAGE_LOCK, as a lookup may rebuild the index.
+
+    Parameters
+    ----------
+    user_file : str, optional
+        The user file, by default "user.txt".
+    index_file : str, optional
+        The index file, by default USER_INDEX_FILE.
+    """
+
+    def __init__(
+        self, user_file: str = "user.txt", index_file: str = USER_INDEX_FILE
+    ):
+        self.user_file = user_file
+        self.index_file = index_file
+
+    @staticmethod
+    def hash_username(username: str) -> int:
+        """
+        Hash a username to 64 bits, the same in every process (unlike the
+        built-in hash).
+        """
+        digest = hashlib.blake2b(username.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
+    def build(self):
+        """
+        Index every user in user.txt, replacing the index file.
+        """
+        file_stat = os.stat(self.user_file)
+        records = []
+        with open(self.user_file, "rb") as user_file:
+            user_bytes = user_file.read()
+        METRICS.add_bytes(read=len(user_bytes))
+        offset = 0
+        for line in user_bytes.split(b"\n"):
+            if line:
+                username = line.split(b";", 1)[0].decode()
+                records.append((self.hash_username(username), offset))
+            offset += len(line) + 1
+        # Sorted by hash, and by offset within a hash so the last line
+        # for a username is found last
+        records.sort()
+
+        with atomic_open(self.index_file, "wb") as index_file:
+            index_file.write(
+                USER_INDEX_HEADER.pack(
+                    USER_INDEX_MAGIC,
+                    file_stat.st_ino,
+                    file_stat.st_size,
+                    file_stat.st_mtime_ns,
+                    len(records),
+                )
+            )
+            index_file.write(
+                b"".join(USER_INDEX_RECORD.pack(*record) for record in records)
+            )
+
+    def read_header(self) -> tuple | None:
+        """
+        Read the inode, size and modification time of user.txt when indexed
+        and the number of users, or None if there is no valid index.
+        """
+        try:
+            with open(self.index_file, "rb") as index_file:
+                header = index_file.read(USER_INDEX_HEADER.size)
+        except OSError:
+            return None
+        if len(header) < USER_INDEX_HEADER.size:
+            return None
+        magic, *details = USER_INDEX_HEADER.unpack(header)
+        if magic != USER_INDEX_MAGIC:
+            return None
+        return tuple(details)
+
+    def record_append(self, old_stat: os.stat_result):
+        """
+        Record in the header that user.txt was only appended to since
+        old_stat was taken, so the new lines are read as its tail rather
+        than the index rebuilt. Nothing is recorded if the index was out
+        of date already, so the next lookup rebuilds it.
+
+        Parameters
+        ----------
+        old_stat : os.stat_result
+            Status of user.txt before the append.
+        """
+        header = self.read_header()
+        if header is None:
+            return
+        indexed_ino, indexed_size, indexed_mtime, count = header
+        if (indexed_ino, indexed_mtime) != (
+            old_stat.st_ino,
+            old_stat.st_mtime_ns,
+        ):
+            return
+        new_mtime = os.stat(self.user_file).st_mtime_ns
+        with open(self.index_file, "r+b") as index_file:
+            index_file.write(
+                USER_INDEX_HEADER.pack(
+                    USER_INDEX_MAGIC,
+                    indexed_ino,
+                    indexed_size,
+                    new_mtime,
+                    count,
+                )
+            )
+
+    def find_offsets(self, username_hash: int, count: int) -> list[int]:
+        """
+        Binary search the index for the offsets of lines whose username
+        has the given hash, in ascending order.
+        """
+        offsets = []
+        if count == 0:
+            return offsets
+        with open(self.index_file, "rb") as index_file:
+            with mmap.mmap(
+                index_file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as index_mmap:
+
+                def record_at(position: int) -> tuple[int, int]:
+                    return USER_INDEX_RECORD.unpack_from(
+                        index_mmap,
+                        USER_INDEX_HEADER.size
+                        + position * USER_INDEX_RECORD.size,
+                    )
+
+                low, high = 0, count
+                while low < high:
+                    middle = (low + high) // 2
+                    if record_at(middle)[0] < username_hash:
+                        low = middle + 1
+                    else:
+                        high = middle
+                while low < count:
+                    record_hash, offset = record_at(low)
+                    if record_hash != username_hash:
+                        break
+                    offsets.append(offset)
+                    low += 1
+        return offsets
+
+    def lookup(self, username: str) -> str | None:
+        """
+        Look up a user's password, rebuilding the index if needed.
+
+        As when user.txt is read into a dictionary, the last line for a
+        username wins.
+
+        Parameters
+        ----------
+        username : str
+            The username to look up.
+
+        Returns
+        -------
+        str | None
+            The password, or None if there is no such user.
+        """
+        file_stat = os.stat(self.user_file)
+        header = self.read_header()
+        if (
+            header is None
+            or header[0] != file_stat.st_ino
+            or header[1] > file_stat.st_size
+            or header[2] != file_stat.st_mtime_ns
+            or file_stat.st_size - header[1] > USER_INDEX_TAIL_LIMIT
+        ):
+            self.build()
+            header = self.read_header()
+        _, indexed_size, _, count = header
+
+        prefix = f"{username};".encode()
+        with open(self.user_file, "rb") as user_file:
+            # Lines added since indexing are the newest, so checked first
+            user_file.seek(indexed_size)
+            tail = user_file.read()
+            METRICS.add_bytes(read=len(tail))
+            for line in reversed(tail.split(b"\n")):
+                if line.startswith(prefix):
+                    return line[len(prefix) :].decode()
+
+            offsets = self.find_offsets(
+                username_hash=self.hash_username(username), count=count
+            )
+            for offset in reversed(offsets):
+                user_file.seek(offset)
+                line = user_file.readline().rstrip(b"\n")
+                METRICS.add_bytes(read=len(line))
+                if line.startswith(prefix):
+                    return line[len(prefix) :].decode()
+        return None
+
+
+class FlatFileStorage:
+    """
+    Storage in the tasks.txt and user.txt text files.
+
+    Task changes are appended to a journal file rather than rewriting the
+    whole of tasks.txt. Entries are one per line, either:
+        add;<task line>
+        set;<task number>;<field>;<value>
+    The journal is replayed over tasks.txt when tasks are read, and folded
+    back into tasks.txt once it reaches JOURNAL_COMPACT_THRESHOLD entries.
+
+    Reads hold STORAGE_LOCK shared and writes hold it exclusive, and
+    tasks.txt and user.txt are replaced atomically (see atomic_open). The
+    version of the files when tasks were loaded is remembered: commit and
+    write_tasks raise StaleDataError if another session has changed them
+    since, rather than overwrite its changes.
+
+    With more than one worker, load_task_store and report_counts split a
+    tasks.txt of over PARALLEL_CHUNK_BYTES into shares of whole lines,
+    parsed or counted in that many processes and combined in file order.
+    The results are the same as reading the file in one process.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Number of processes parsing and counting tasks.txt, by default 1.
+    """
+
+    def __init__(
+        self,
+        task_file: str = "tasks.txt",
+        user_file: str = "user.txt",
+        journal_file: str = TASK_JOURNAL_FILE,
+        user_index_file: str = USER_INDEX_FILE,
+        workers: int = 1,
+    ):
+        self.task_file = task_file
+        self.user_file = user_file
+        self.journal_file = journal_file
+        self.user_index = UserIndex(
+            user_file=user_file, index_file=user_index_file
+        )
+        # Number of entries currently in the task journal
+        self.journal_length = 0
+        # Version of the files the tasks were loaded from, see data_version
+        self.version = None
+        self.workers = workers
+
+    def iter_task_data(self) -> Iterator[str]:
+        """
+        Yield the tasks in tasks.txt file one line at a time, see
+        read_task_data.
+
+        The version of the files read is remembered, so changes made by
+        other sessions after this are noticed when saving.
+
+        Yields
+        ------
+        str
+            A string representing a task, fields separated by semicolons.
+        """
+        with STORAGE_LOCK.hold(shared=True):
+            # Creating a missing tasks.txt is not a change by another
+            # session, so is done before the version is taken
+            self.create_task_file()
+            self.version = self.data_version()
+            task_data = self.read_task_data()
+        yield from task_data
+
+    def create_task_file(self):
+        """
+        Create a blank tasks.txt file if it doesn't exist.
+        """
+        if not os.path.exists(self.task_file):
+            with open(self.task_file, "w"):
+                pass
+
+    def read_task_data(self) -> Iterator[str]:
+        """
+        Get the tasks in tasks.txt file one line at a time.
+
+        - Create blank tasks.txt file if doesn't exist.
+        - The file is read line by line, so only one task is held in memory.
+        - Blank lines are skipped.
+        - Changes recorded in the task journal are applied as lines are
+          read, and tasks added in the journal are yielded after the file.
+
+        The journal is read and tasks.txt opened under the storage lock,
+        which is then let go. tasks.txt is only ever replaced or appended
+        to, so reading the open file up to its size then gives the tasks
+        as they were, however long the caller takes.
+
+        Returns
+        -------
+        Iterator[str]
+            Strings representing tasks, fields separated by semicolons.
+        """
+        with STORAGE_LOCK.hold(shared=True):
+            # Create tasks.txt if it doesn't exist
+            self.create_task_file()
+
+            # Get changes logged since tasks.txt was last written
+            added_tasks, task_changes = self.read_journal()
+            task_file = open(self.task_file, "rb")
+            task_size = os.fstat(task_file.fileno()).st_size
+            METRICS.add_bytes(read=task_size + file_size(self.journal_file))
+
+        return self.apply_journal(
+            task_file=task_file,
+            task_size=task_size,
+            added_tasks=added_tasks,
+            task_changes=task_changes,
+        )
+
+    @staticmethod
+    def apply_journal(
+        task_file, task_size: int, added_tasks: list[str], task_changes: dict
+    ) -> Iterator[str]:
+        """
+        Yield the tasks in the open tasks.txt with the journal applied, see
+        read_task_data.
+        """
+        task_num = 0
+        with task_file:
+            for line in task_file:
+                # Stop at lines appended after the journal was read
+                task_size -= len(line)
+                if task_size < 0:
+                    break
+                t_str = line.decode().rstrip("\r\n")
+                # Gets rid of the blank lines in the task file
+                if t_str == "":
+                    continue
+                yield apply_task_changes(t_str, task_changes.get(task_num))
+                task_num += 1
+
+        # Tasks added since tasks.txt was last written come after it
+        for t_str in added_tasks:
+            yield apply_task_changes(t_str, task_changes.get(task_num))
+            task_num += 1
+
+    def load_task_store(self) -> TaskStore:
+        """
+        Load the tasks into a TaskStore, parsing shares of a large
+        tasks.txt in the worker processes.
+        """
+        with STORAGE_LOCK.hold(shared=True):
+            self.create_task_file()
+            self.version = self.data_version()
+            chunks = self.split_task_file()
+            if len(chunks) < 2:
+                return TaskStore.from_lines(self.read_task_data())
+            chunk_stores, added_tasks = self.read_task_chunks(
+                chunks=chunks, chunk_func=load_task_chunk
+            )
+
+        # Put the shares back together in file order
+        task_store = chunk_stores[0]
+        for chunk_store in chunk_stores[1:]:
+            task_store.extend(chunk_store)
+        task_store.extend(TaskStore.from_lines(added_tasks))
+        return task_store
+
+    def load_task_count(self) -> int:
+        """
+        Count the stored tasks without parsing them, remembering the
+        version of the files as loading does, so tasks numbered on from
+        the count can be committed straight after (see import_tasks).
+        """
+        with STORAGE_LOCK.hold(shared=True):
+            self.create_task_file()
+            self.version = self.data_version()
+            added_tasks, _ = self.read_journal()
+            with open(self.task_file, "rb") as task_file:
+                task_count = sum(
+                    1 for line in task_file if line.rstrip(b"\r\n")
+                )
+            METRICS.add_bytes(
+                read=file_size(self.task_file) + file_size(self.journal_file)
+            )
+        return task_count + len(added_tasks)
+
+    def split_task_file(self) -> list[tuple[int, int]]:
+        """
+        Split tasks.txt into shares of about PARALLEL_CHUNK_BYTES, each
+        starting at the beginning of a line.
+
+        Returns
+        -------
+        list[tuple[int, int]]
+            The start and end byte offsets of each share, just one share
+            for the whole file with a single worker.
+        """
+        size = file_size(self.task_file)
+        chunk_count = math.ceil(size / PARALLEL_CHUNK_BYTES)
+        if self.workers < 2 or chunk_count < 2:
+            return [(0, size)]
+
+        bounds = [0]
+        with open(self.task_file, "rb") as task_file:
+            for chunk_num in range(1, chunk_count):
+                offset = size * chunk_num // chunk_count
+                if offset <= bounds[-1]:
+                    # The line before was longer than a share
+                    continue
+                # Move to the start of the line after the offset
+                task_file.seek(offset - 1)
+                task_file.readline()
+                bounds.append(task_file.tell())
+        bounds.append(size)
+        # The last line may reach past the final offsets
+        return [
+            (start, end)
+            for start, end in zip(bounds, bounds[1:])
+            if end > start
+        ]
+
+    def read_task_chunks(
+        self, chunks: list[tuple[int, int]], chunk_func, **kwargs
+    ) -> tuple[list, list[str]]:
+        """
+        Run a chunk function (e.g. load_task_chunk) over each share of
+        tasks.txt in the worker processes. Called holding STORAGE_LOCK.
+
+        Journalled changes are given to the share holding their task. They
+        are numbered from the start of the file, so when there are any the
+        tasks in each share are counted first.
+
+        Parameters
+        ----------
+        chunks : list[tuple[int, int]]
+            The shares, see split_task_file.
+        chunk_func : callable
+            Called with the file name, the start and end of a share, its
+            task changes and kwargs.
+
+        Returns
+        -------
+        tuple[list, list[str]]
+            - The result of chunk_func for each share, in file order.
+            - Lines of the tasks added in the journal, changes applied.
+        """
+        METRICS.add_bytes(
+            read=file_size(self.task_file) + file_size(self.journal_file)
+        )
+        added_tasks, task_changes = self.read_journal()
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            chunk_changes = [{} for _ in chunks]
+            task_count = 0
+            if task_changes:
+                line_counts = executor.map(
+                    count_chunk_lines,
+                    [self.task_file] * len(chunks),
+                    [start for start, _ in chunks],
+                    [end for _, end in chunks],
+                )
+                for changes, line_count in zip(chunk_changes, line_counts):
+                    for task_num, fields in task_changes.items():
+                        if task_count <= task_num < task_count + line_count:
+                            changes[task_num - task_count] = fields
+                    task_count += line_count
+
+            jobs = [
+                executor.submit(
+                    chunk_func,
+                    file_name=self.task_file,
+                    start=start,
+                    end=end,
+                    task_changes=changes,
+                    **kwargs,
+                )
+                for (start, end), changes in zip(chunks, chunk_changes)
+            ]
+            results = [job.result() for job in jobs]
+
+        # Tasks added since tasks.txt was last written come after it
+        added_tasks = [
+            apply_task_changes(t_str, task_changes.get(task_count + add_num))
+            for add_num, t_str in enumerate(added_tasks)
+        ]
+        return results, added_tasks
+
+    def write_tasks(self, task_list: Iterable[Task]):
+        """
+        Write all tasks to tasks.txt.
+
+        The whole file is replaced, so any task journal is folded in and
+        removed.
+
+        Parameters
+        ----------
+        task_list : Iterable[Task]
+            List (or generator) of Task objects, or a TaskStore.
+
+        Raises
+        ------
+        StaleDataError
+            If another session changed the tasks since they were loaded.
+        """
+        # Get tasks as lines
+        if isinstance(task_list, TaskStore):
+            task_lines = task_list.iter_lines()
+        else:
+            task_lines = (format_task(task=t) for t in task_list)
+
+        with STORAGE_LOCK.hold():
+            self.check_version()
+
+            # Write out tasks, one per line
+            with atomic_open(self.task_file) as task_file:
+                for task_num, t_str in enumerate(task_lines):
+                    task_file.write(t_str if task_num == 0 else f"\n{t_str}")
+            METRICS.add_bytes(written=file_size(self.task_file))
+
+            # tasks.txt now holds every change, so the journal is no longer
+            # needed
+            self.clear_journal()
+            self.version = self.data_version()
+
+    def commit(
+        self, task_list: list[Task] | None, changes: list[tuple]
+    ):
+        """
+        Append task changes to the task journal in a single write.
+
+        Parameters
+        ----------
+        task_list : list[Task] | None
+            The full list of tasks, with the changes already applied. Used
+            to compact the journal into tasks.txt when it gets too long,
+            or None to leave that to the next session that loads them.
+        changes : list[tuple]
+            The changes, see commit_task_changes.
+
+        Raises
+        ------
+        StaleDataError
+            If another session changed the tasks since they were loaded.
+        """
+        entries = []
+        for action, task_num, *details in changes:
+            if action == "add":
+                entries.append(f"add;{format_task(task=details[0])}\n")
+            else:
+                field, value = details
+                str_value = format_task_field(field=field, value=value)
+                entries.append(f"set;{task_num};{field};{str_value}\n")
+
+        journal_text = "".join(entries)
+        with STORAGE_LOCK.hold():
+            self.check_version()
+            with open(self.journal_file, "a") as journal_file:
+                journal_file.write(journal_text)
+            if METRICS.enabled:
+                METRICS.add_bytes(written=len(journal_text.encode()))
+            self.journal_length += len(entries)
+            self.version = self.data_version()
+
+            # Fold the journal back into tasks.txt once it gets too long
+            if (
+                task_list is not None
+                and self.journal_length >= JOURNAL_COMPACT_THRESHOLD
+            ):
+                self.write_tasks(task_list=task_list)
+
+    def data_version(self) -> tuple:
+        """
+        Get the version of the task files: the signature of tasks.txt and
+        the length of the task journal, which only grows until cleared.
+        """
+        return file_signature(self.task_file), file_size(self.journal_file)
+
+    def data_fingerprint(self) -> tuple:
+        """
+        Get a fingerprint of the stored tasks and users, the same in any
+        process while they are unchanged: the signatures of the files.
+        Changes either grow a file or replace it with a new inode.
+        """
+        file_names = (self.task_file, self.journal_file, self.user_file)
+        return tuple(file_signature(file_name) for file_name in file_names)
+
+    def data_signature(self) -> tuple:
+        """
+        Get a cheap signature of the stored tasks and users, which changes
+        whenever they do: here the same as data_fingerprint.
+        """
+        return self.data_fingerprint()
+
+    def tasks_current(self) -> bool:
+        """
+        Check the tasks in memory are the same as the stored tasks, i.e.
+        the task files are unchanged since they were last read or written.
+        """
+        return (
+            self.version is not None and self.data_version() == self.version
+        )
+
+    def check_version(self):
+        """
+        Check the task files have not changed since tasks were loaded.
+
+        Raises
+        ------
+        StaleDataError
+            If another session changed them.
+        """
+        if self.version is not None and self.data_version() != self.version:
+            raise StaleDataError(
+                "The tasks have been changed by another session"
+            )
+
+    def read_changes(self, task_count: int) -> list[tuple] | None:
+        """
+        Read the task changes saved by other sessions since the tasks were
+        loaded, without reading the whole of tasks.txt again.
+
+        Only the bytes added to the end of the task journal are read, and
+        the end of tasks.txt if it was appended to while there was no
+        journal. If tasks.txt was rewritten (e.g. the journal compacted)
+        the changes can't be told apart, so None is returned.
+
+        Parameters
+        ----------
+        task_count : int
+            Number of tasks loaded, to number the added tasks.
+
+        Returns
+        -------
+        list[tuple] | None
+            The changes (see commit_task_changes) in the order they were
+            saved, or None if the tasks need to be loaded again in full.
+        """
+        with STORAGE_LOCK.hold(shared=True):
+            if self.version is None:
+                return None
+            old_signature, journal_offset = self.version
+            new_signature = file_signature(self.task_file)
+            journal_size = file_size(self.journal_file)
+            if (new_signature, journal_size) == self.version:
+                return []
+
+            changes = []
+            # Added tasks are numbered on from the tasks loaded
+            new_task_num = task_count
+            if new_signature != old_signature:
+                # Lines appended to tasks.txt, same inode and grown, can
+                # only be numbered if they come before any journal
+                if (
+                    old_signature is None
+                    or new_signature is None
+                    or new_signature[0] != old_signature[0]
+                    or new_signature[1] < old_signature[1]
+                    or journal_offset > 0
+                ):
+                    return None
+                new_text = self.read_tail(
+                    file_name=self.task_file, offset=old_signature[1]
+                )
+                for t_str in new_text.split("\n"):
+                    if t_str:
+                        new_task = parse_task(t_str)
+                        changes.append(("add", new_task_num, new_task))
+                        new_task_num += 1
+
+            if journal_size < journal_offset:
+                return None
+            new_entries = ""
+            if journal_size > journal_offset:
+                new_entries = self.read_tail(
+                    file_name=self.journal_file, offset=journal_offset
+                )
+            # Only whole entries; one still being written is read next time
+            new_entries = new_entries[: new_entries.rfind("\n") + 1]
+            for entry in new_entries.splitlines():
+                action, _, details = entry.partition(";")
+                if action == "add":
+                    changes.append(("add", new_task_num, parse_task(details)))
+                    new_task_num += 1
+                elif action == "set":
+                    task_num, field, value = details.split(";", 2)
+                    changes.append(
+                        (
+                            "set",
+                            int(task_num),
+                            field,
+                            parse_task_field(field=field, str_value=value),
+                        )
+                    )
+                self.journal_length += 1
+
+            self.version = (
+                new_signature,
+                journal_offset + len(new_entries.encode()),
+            )
+            return changes
+
+    @staticmethod
+    def read_tail(file_name: str, offset: int) -> str:
+        """
+        Read a file from a byte offset to its end.
+        """
+        with open(file_name, "rb") as tail_file:
+            tail_file.seek(offset)
+            tail = tail_file.read()
+        METRICS.add_bytes(read=len(tail))
+        return tail.decode()
+
+    def read_journal(self) -> tuple[list[str], dict[int, dict[str, str]]]:
+        """
+        Read the entries in the task journal.
+
+        A final entry without a newline was not fully written and is
+        skipped.
+
+        Returns
+        -------
+        tuple[list[str], dict[int, dict[str, str]]]
+            - Lines of the tasks added since tasks.txt was last written.
+            - Field changes for each task number, mapping field name to the
+              new value as stored in tasks.txt.
+        """
+        added_tasks = []
+        task_changes = {}
+        self.journal_length = 0
+        if not os.path.exists(self.journal_file):
+            return added_tasks, task_changes
+
+        with open(self.journal_file, "r") as journal_file:
+            for entry in journal_file:
+                # Skip an entry that was cut off part way through writing
+                if not entry.endswith("\n"):
+                    break
+                action, _, details = entry[:-1].partition(";")
+                if action == "add":
+                    added_tasks.append(details)
+                elif action == "set":
+                    task_num, field, value = details.split(";", 2)
+                    task_changes.setdefault(int(task_num), {})[field] = value
+                self.journal_length += 1
+
+        return added_tasks, task_changes
+
+    def clear_journal(self):
+        """
+        Remove the task journal once its changes are stored in tasks.txt.
+        """
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self.journal_length = 0
+
+    def get_user_data(self) -> list[str]:
+        """
+        Reads usernames and password from the user.txt file.
+
+         - If user.txt file doesn't exist, a default admin account is
+           written to the file: "admin;password".
+         - The function then reads the contents of the file, and splits
+           them into user data, to return a list.
+
+        Returns
+        -------
+        list[str]
+            A list containing user data. Each element of the list is a
+            string representing a user with the format: username;password.
+        """
+        # If no user.txt file, write one with a default account
+        self.create_user_file()
+
+        # Read in user_data
+        with open(self.user_file, "r") as user_file:
+            user_data = user_file.read().split("\n")
+        METRICS.add_bytes(read=file_size(self.user_file))
+        return user_data
+
+    def write_users(self, user_data: list[str]):
+        """
+        Write all users to user.txt, one "username;password" per line.
+        """
+        with STORAGE_LOCK.hold():
+            with atomic_open(self.user_file) as out_file:
+                out_file.write("\n".join(user_data))
+        METRICS.add_bytes(written=file_size(self.user_file))
+
+    def create_user_file(self):
+        """
+        Write user.txt with a default account if it doesn't exist.
+        """
+        if not os.path.exists(self.user_file):
+            with open(self.user_file, "w") as default_file:
+                default_file.write("admin;password")
+
+    def get_user(self, username: str) -> str | None:
+        """
+        Look up one user's password with the user index, see UserIndex.
+
+        Returns
+        -------
+        str | None
+            The password, or None if there is no such user.
+        """
+        with STORAGE_LOCK.hold():
+            self.create_user_file()
+            return self.user_index.lookup(username=username)
+
+    def add_user(self, username: str, password: str):
+        """
+        Add a user to the end of user.txt, writing just the new line.
+
+        Raises
+        ------
+        StaleDataError
+            If another session has already added the username.
+        """
+        self.add_users(users=[(username, password)])
+
+    def add_users(self, users: list[tuple[str, str]]):
+        """
+        Add users to the end of user.txt, writing just the new lines, which
+        the user index reads as its tail.
+
+        Parameters
+        ----------
+        users : list[tuple[str, str]]
+            The username and password of each new user.
+
+        Raises
+        ------
+        StaleDataError
+            If another session has already added one of the usernames.
+        """
+        with STORAGE_LOCK.hold():
+            for username, _ in users:
+                if self.get_user(username=username) is not None:
+                    raise StaleDataError(
+                        f"User {username} has been added by another session"
+                    )
+            # Lines are separated, not ended, by newlines
+            old_stat = os.stat(self.user_file)
+            separator = "\n" if old_stat.st_size else ""
+            new_lines = separator + "\n".join(
+                f"{username};{password}" for username, password in users
+            )
+            with open(self.user_file, "a") as user_file:
+                user_file.write(new_lines)
+            METRICS.add_bytes(written=len(new_lines.encode()))
+            self.user_index.record_append(old_stat=old_stat)
+
+    def report_counts(
+        self, usernames: Iterable[str], curr_date: date
+    ) -> tuple[int, int, int, dict]:
+        """
+        Count tasks for the reports in a single pass over the file, or
+        with shares of a large file counted in the worker processes.
+
+        See count_tasks for the returned values.
+        """
+        with STORAGE_LOCK.hold(shared=True):
+            self.create_task_file()
+            chunks = self.split_task_file()
+            if len(chunks) < 2:
+                return count_tasks(
+                    task_list=(
+                        parse_task(t_str) for t_str in self.read_task_data()
+                    ),
+                    usernames=usernames,
+                    curr_date=curr_date,
+                )
+            chunk_counts, added_tasks = self.read_task_chunks(
+                chunks=chunks,
+                chunk_func=count_task_chunk,
+                curr_ordinal=curr_date.toordinal(),
+            )
+
+        chunk_counts.append(
+            count_task_lines(
+                task_data=added_tasks, curr_ordinal=curr_date.toordinal()
+            )
+        )
+        return merge_task_counts(
+            chunk_counts=chunk_counts, usernames=usernames
+        )
+
+
+class SQLiteStorage:
+    """
+    Storage in an SQLite database.
+
+    Tasks are rows of a tasks table keyed by task number, with indexes on
+    username, due_date and completed. Dates are stored as YYYY-MM-DD text
+    so they sort and compare in order. Changes update single rows and
+    report counts are worked out with SQL aggregates.
+
+    Changes are saved in write transactions. As with the text storage,
+    they raise StaleDataError if another session has saved changes since
+    the tasks were loaded.
+    """
+
+    def __init__(self, db_file: str = SQLITE_DB_FILE):
+        self.db_file = db_file
+        # The task server saves changes from its writer thread, one batch
+        # at a time
+        self.connection = sqlite3.connect(db_file, check_same_thread=False)
+        # Database version the tasks were loaded at, see data_version
+        self.version = None
+        with self.connection:
+            self.connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    task_num INTEGER PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    due_date TEXT NOT NULL,
+                    assigned_date TEXT NOT NULL,
+                    completed INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS tasks_username
+                    ON tasks (username);
+                CREATE INDEX IF NOT EXISTS tasks_due_date
+                    ON tasks (due_date);
+                CREATE INDEX IF NOT EXISTS tasks_completed
+                    ON tasks (completed);
+                CREATE TABLE IF NOT EXISTS users (
+                    username TEXT PRIMARY KEY,
+                    password TEXT NOT NULL
+                );
+                """
+            )
+
+    @staticmethod
+    def task_row(task_num: int, task: Task) -> tuple:
+        """
+        Convert a task into a row of the tasks table.
+        """
+        return (
+            task_num,
+            task.username,
+            task.title,
+            task.description,
+            task.due_date.strftime(DATE_STRING_FORMAT),
+            task.assigned_date.strftime(DATE_STRING_FORMAT),
+            int(task.completed),
+        )
+
+    def iter_task_data(self) -> Iterator[str]:
+        """
+        Yield the tasks in task number order as lines of tasks.txt.
+        """
+        self.version = self.data_version()
+        rows = self.connection.execute(
+            "SELECT username, title, description, due_date, assigned_date,"
+            " completed FROM tasks ORDER BY task_num"
+        )
+        for *fields, completed in rows:
+            yield ";".join(fields + ["Yes" if completed else "No"])
+
+    def load_task_store(self) -> TaskStore:
+        """
+        Load the tasks into a TaskStore.
+        """
+        return TaskStore.from_lines(self.iter_task_data())
+
+    def load_task_count(self) -> int:
+        """
+        Count the stored tasks, remembering the database version, see
+        FlatFileStorage.load_task_count.
+        """
+        self.version = self.data_version()
+        (task_count,) = self.connection.execute(
+            "SELECT COUNT(*) FROM tasks"
+        ).fetchone()
+        return task_count
+
+    def write_tasks(self, task_list: Iterable[Task]):
+        """
+        Replace all tasks in the database.
+        """
+        with self.connection:
+            self.begin_write()
+            self.connection.execute("DELETE FROM tasks")
+            self.connection.executemany(
+                "INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.task_row(task_num=task_num, task=t)
+                    for task_num, t in enumerate(task_list)
+                ),
+            )
+
+    def commit(
+        self, task_list: list[Task] | None, changes: list[tuple]
+    ):
+        """
+        Save task changes in a single transaction.
+
+        Parameters
+        ----------
+        task_list : list[Task] | None
+            The full list of tasks, with the changes already applied, or
+            None. Not used by this storage.
+        changes : list[tuple]
+            The changes, see commit_task_changes.
+
+        Raises
+        ------
+        StaleDataError
+            If another session changed the tasks since they were loaded.
+        """
+        with self.connection:
+            self.begin_write()
+            for action, task_num, *details in changes:
+                if action == "add":
+                    self.connection.execute(
+                        "INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        self.task_row(task_num=task_num, task=details[0]),
+                    )
+                    continue
+                field, value = details
+                if field not in TASK_FIELDS:
+                    raise ValueError(f"Unknown task field: {field}")
+                if field == "completed":
+                    value = int(value)
+                else:
+                    value = format_task_field(field=field, value=value)
+                self.connection.execute(
+                    f"UPDATE tasks SET {field} = ? WHERE task_num = ?",
+                    (value, task_num),
+                )
+
+    def data_version(self) -> int:
+        """
+        Get the database version, which changes whenever another
+        connection commits.
+        """
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def data_fingerprint(self) -> tuple:
+        """
+        Get a fingerprint of the stored tasks and users, the same in any
+        process while they are unchanged: the file change counter in the
+        database header, which every committed write increments, and the
+        signatures of the database and its write-ahead log, if any.
+        """
+        with open(self.db_file, "rb") as db_file:
+            db_file.seek(SQLITE_CHANGE_COUNTER_OFFSET)
+            change_counter = db_file.read(4)
+        return (
+            change_counter.hex(),
+            file_signature(self.db_file),
+            file_signature(f"{self.db_file}-wal"),
+        )
+
+    def data_signature(self) -> tuple:
+        """
+        Get a cheap signature of the stored tasks and users, which changes
+        whenever they do: the signatures of the database and its log. Safe
+        to call from any thread, unlike data_version.
+        """
+        return (
+            file_signature(self.db_file),
+            file_signature(f"{self.db_file}-wal"),
+        )
+
+    def tasks_current(self) -> bool:
+        """
+        Check the tasks in memory are the same as the stored tasks, i.e.
+        no other connection committed since they were last read.
+        """
+        return (
+            self.version is not None and self.data_version() == self.version
+        )
+
+    def begin_write(self):
+        """
+        Start a write transaction, checking the database has not changed
+        since the tasks were loaded.
+
+        Raises
+        ------
+        StaleDataError
+            If another session changed it.
+        """
+        self.connection.execute("BEGIN IMMEDIATE")
+        if self.version is not None and self.data_version() != self.version:
+            raise StaleDataError(
+                "The tasks have been changed by another session"
+            )
+
+    def read_changes(self, task_count: int) -> list[tuple] | None:
+        """
+        Check for task changes saved by other sessions since the tasks were
+        loaded, see FlatFileStorage.read_changes.
+
+        The database version only says whether anything changed, not what,
+        so any change by another session needs a full reload.
+
+        Parameters
+        ----------
+        task_count : int
+            Number of tasks loaded.
+
+        Returns
+        -------
+        list[tuple] | None
+            No changes, or None if the tasks need to be loaded again.
+        """
+        if self.version is None or self.data_version() != self.version:
+            return None
+        return []
+
+    def get_user_data(self) -> list[str]:
+        """
+        Read the users in the order they were added.
+
+        A default admin account is added if there are no users.
+        """
+        self.add_default_user()
+        rows = self.connection.execute(
+            "SELECT username, password FROM users ORDER BY rowid"
+        )
+        return [f"{username};{password}" for username, password in rows]
+
+    def add_default_user(self):
+        """
+        Add a default admin account if there are no users.
+        """
+        if self.connection.execute("SELECT 1 FROM users").fetchone() is None:
+            self.add_user("admin", "password")
+
+    def get_user(self, username: str) -> str | None:
+        """
+        Look up one user's password.
+
+        Returns
+        -------
+        str | None
+            The password, or None if there is no such user.
+        """
+        self.add_default_user()
+        row = self.connection.execute(
+            "SELECT password FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def write_users(self, user_data: list[str]):
+        """
+        Replace all users, given as "username;password" strings.
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM users")
+            self.connection.executemany(
+                "INSERT INTO users VALUES (?, ?)",
+                (user.split(";") for user in user_data),
+            )
+
+    def add_user(self, username: str, password: str):
+        """
+        Add a user to the users table.
+
+        Raises
+        ------
+        StaleDataError
+            If another session has already added the username.
+        """
+        self.add_users(users=[(username, password)])
+
+    def add_users(self, users: list[tuple[str, str]]):
+        """
+        Add users to the users table in one transaction.
+
+        Parameters
+        ----------
+        users : list[tuple[str, str]]
+            The username and password of each new user.
+
+        Raises
+        ------
+        StaleDataError
+            If another session has already added one of the usernames.
+        """
+        try:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT INTO users VALUES (?, ?)", users
+                )
+        except sqlite3.IntegrityError:
+            raise StaleDataError(
+                "A user has been added by another session"
+            ) from None
+
+    def report_counts(
+        self, usernames: Iterable[str], curr_date: date
+    ) -> tuple[int, int, int, dict]:
+        """
+        Count tasks for the reports with an SQL aggregate query.
+
+        See count_tasks for the returned values.
+        """
+        rows = self.connection.execute(
+            "SELECT username, COUNT(*), SUM(completed),"
+            " SUM(completed = 0 AND due_date < ?)"
+            " FROM tasks GROUP BY username",
+            (curr_date.strftime(DATE_STRING_FORMAT),),
+        )
+        user_dict = {
+            user: {"task_count": 0, "completed": 0, "overdue": 0}
+            for user in usernames
+        }
+        for username, task_count, completed, overdue in rows:
+            user_dict[username] = {
+                "task_count": task_count,
+                "completed": completed,
+                "overdue": overdue,
+            }
+        return (
+            sum(stats["task_count"] for stats in user_dict.values()),
+            sum(stats["completed"] for stats in user_dict.values()),
+            sum(stats["overdue"] for stats in user_dict.values()),
+            user_dict,
+        )
+
+
+class BinaryStorage:
+    """
+    Storage in a fixed-width binary task file with a separate string heap.
+
+    tasks.bin holds a header (see BINARY_TASK_HEADER) then one fixed-width
+    record per task (see BINARY_RECORD): the offset and length in the heap
+    of the username, title and description, the due and assigned dates as
+    day ordinals and the completed flag. tasks.heap holds a
+    BINARY_HEAP_MAGIC header then the UTF-8 text, only ever appended to.
+
+    Both files are opened with mmap. Marking a task complete or changing
+    its due date or username patches the bytes of its record in place.
+    Titles and descriptions are only decoded when needed: load_task_store
+    hands the heap to a TaskStore as its string pool without decoding it.
+    Users are kept in user.txt as for the text storage.
+
+    Files are locked and replaced as for the text storage, and tasks added
+    or rewritten by another session since loading raise StaleDataError.
+    Fields patched in place by another session are not checked: like rows
+    in the sqlite storage, each patch only changes its own field. Each
+    save that patches records adds one to the change count in the header,
+    which tells other sessions their tasks must be loaded again.
+    """
+
+    def __init__(
+        self,
+        task_file: str = BINARY_TASK_FILE,
+        heap_file: str = BINARY_HEAP_FILE,
+        user_file: str = "user.txt",
+    ):
+        self.task_file = task_file
+        self.heap_file = heap_file
+        self.user_storage = FlatFileStorage(user_file=user_file)
+        # Heap positions of usernames already written, to share them,
+        # and the usernames already decoded from each position
+        self.username_refs = {}
+        self.ref_usernames = {}
+        self.task_mmap = None
+        self.heap_mmap = None
+        # Version of the files the tasks were loaded from, see data_version
+        self.version = None
+        # Change count of the task file when the tasks in memory were last
+        # the same as the stored ones, see tasks_current
+        self.synced_changes = None
+        self.open_files()
+
+    def open_files(self):
+        """
+        Map the task and heap files, creating them if they don't exist.
+        """
+        self.close_files()
+        for file_name, magic, header in (
+            (
+                self.task_file,
+                BINARY_TASK_MAGIC,
+                BINARY_TASK_HEADER.pack(BINARY_TASK_MAGIC, 0),
+            ),
+            (self.heap_file, BINARY_HEAP_MAGIC, BINARY_HEAP_MAGIC),
+        ):
+            if not os.path.exists(file_name):
+                with open(file_name, "wb") as new_file:
+                    new_file.write(header)
+            with open(file_name, "rb") as check_file:
+                if check_file.read(len(magic)) != magic:
+                    raise ValueError(f"{file_name} is not a task manager file")
+
+        with open(self.task_file, "r+b") as task_file:
+            self.task_mmap = mmap.mmap(task_file.fileno(), 0)
+        with open(self.heap_file, "r+b") as heap_file:
+            self.heap_mmap = mmap.mmap(heap_file.fileno(), 0)
+
+    def close_files(self):
+        """
+        Flush and unmap the task and heap files.
+        """
+        for mapped in (self.task_mmap, self.heap_mmap):
+            if mapped is not None:
+                mapped.flush()
+                mapped.close()
+        self.task_mmap = None
+        self.heap_mmap = None
+
+    def task_count(self) -> int:
+        """
+        Get the number of task records in the task file.
+        """
+        records_size = len(self.task_mmap) - BINARY_TASK_HEADER.size
+        return records_size // BINARY_RECORD.size
+
+    def read_change_count(self) -> int:
+        """
+        Read the change count from the header of the task file on disk,
+        which may be newer than the mapped one, see BINARY_TASK_HEADER.
+        """
+        with open(self.task_file, "rb") as task_file:
+            header = task_file.read(BINARY_TASK_HEADER.size)
+        return BINARY_TASK_HEADER.unpack(header)[1]
+
+    def iter_records(self, first: int = 0) -> Iterator[tuple]:
+        """
+        Yield the unpacked record of each task, see BINARY_RECORD.
+
+        Parameters
+        ----------
+        first : int, optional
+            Task number to start from, by default 0.
+        """
+        start = BINARY_TASK_HEADER.size + first * BINARY_RECORD.size
+        end = BINARY_TASK_HEADER.size + self.task_count() * BINARY_RECORD.size
+        METRICS.add_bytes(read=end - start)
+        yield from BINARY_RECORD.iter_unpack(self.task_mmap[start:end])
+
+    def read_text(self, offset: int, length: int) -> str:
+        """
+        Decode a string from the heap.
+        """
+        return self.heap_mmap[offset : offset + length].decode()
+
+    def read_username(self, offset: int, length: int) -> str:
+        """
+        Decode a username from the heap, reusing ones already decoded.
+        """
+        username = self.ref_usernames.get((offset, length))
+        if username is None:
+            username = sys.intern(self.read_text(offset, length))
+            self.ref_usernames[(offset, length)] = username
+            self.username_refs[username] = (offset, length)
+        return username
+
+    def reload_files(self):
+        """
+        Map the files again before loading tasks, in case another session
+        has grown or replaced them, and remember their version.
+        """
+        self.open_files()
+        self.username_refs = {}
+        self.ref_usernames = {}
+        self.version = self.data_version()
+        self.synced_changes = BINARY_TASK_HEADER.unpack_from(self.task_mmap)[1]
+
+    def data_fingerprint(self) -> tuple:
+        """
+        Get a fingerprint of the stored tasks and users, the same in any
+        process while they are unchanged: a hash of the task records, as
+        they are patched in place, and the signatures of the other files.
+        """
+        task_hash = hashlib.blake2b(digest_size=16)
+        with open(self.task_file, "rb") as task_file:
+            for chunk in iter(lambda: task_file.read(1 << 20), b""):
+                task_hash.update(chunk)
+        return (
+            task_hash.hexdigest(),
+            file_signature(self.heap_file),
+            self.user_storage.data_fingerprint()[-1],
+        )
+
+    def data_signature(self) -> tuple:
+        """
+        Get a cheap signature of the stored tasks and users, which changes
+        whenever they do: the signatures of the files and the change count
+        of the task file, which goes up when records are patched in place.
+        """
+        file_names = (self.task_file, self.heap_file)
+        return tuple(map(file_signature, file_names)) + (
+            self.read_change_count(),
+            self.user_storage.data_fingerprint()[-1],
+        )
+
+    def tasks_current(self) -> bool:
+        """
+        Check the tasks in memory are the same as the stored tasks, i.e.
+        no tasks were added since they were loaded and the change count is
+        the same as when they were last loaded in full or saved by this
+        session.
+        """
+        return (
+            self.synced_changes is not None
+            and self.data_version() == self.version
+            and self.read_change_count() == self.synced_changes
+        )
+
+    def data_version(self) -> tuple:
+        """
+        Get the version of the files: the inode and size of each, which
+        change when tasks are added or the files replaced.
+        """
+        return tuple(
+            (file_stat.st_ino, file_stat.st_size)
+            for file_stat in map(os.stat, (self.task_file, self.heap_file))
+        )
+
+    def check_version(self):
+        """
+        Check no tasks were added or rewritten since tasks were loaded.
+
+        Raises
+        ------
+        StaleDataError
+            If another session changed them.
+        """
+        if self.version is not None and self.data_version() != self.version:
+            raise StaleDataError(
+                "The tasks have been changed by another session"
+            )
+
+    def read_changes(self, task_count: int) -> list[tuple] | None:
+        """
+        Read the tasks added by other sessions since the tasks were loaded,
+        see FlatFileStorage.read_changes.
+
+        Only the records added to the end of the task file are read. If
+        another session patched records in place, as shown by the change
+        count, the tasks must be loaded again in full.
+
+        Parameters
+        ----------
+        task_count : int
+            Number of tasks loaded, the first new record.
+
+        Returns
+        -------
+        list[tuple] | None
+            The added tasks, or None if the files were replaced or records
+            patched and the tasks need to be loaded again in full.
+        """
+        with STORAGE_LOCK.hold(shared=True):
+            if (
+                self.version is None
+                or self.read_change_count() != self.synced_changes
+            ):
+                return None
+            new_version = self.data_version()
+            if new_version == self.version:
+                return []
+            # Replaced (new inode) or shrunk files can't be followed
+            for (old_ino, old_size), (new_ino, new_size) in zip(
+                self.version, new_version
+            ):
+                if new_ino != old_ino or new_size < old_size:
+                    return None
+
+            # Both files only grew, so the mapped usernames still hold
+            self.open_files()
+            changes = [
+                ("add", task_num, parse_task(t_str))
+                for task_num, t_str in enumerate(
+                    self.read_task_data(first=task_count), start=task_count
+                )
+            ]
+            self.version = new_version
+            return changes
+
+    def iter_task_data(self) -> Iterator[str]:
+        """
+        Yield the tasks in task number order as lines of tasks.txt.
+        """
+        # Read under the lock, then let go of it before yielding
+        with STORAGE_LOCK.hold(shared=True):
+            self.reload_files()
+            task_data = list(self.read_task_data())
+        yield from task_data
+
+    def read_task_data(self, first: int = 0) -> Iterator[str]:
+        """
+        Yield the tasks from the files as mapped, see iter_task_data.
+
+        Parameters
+        ----------
+        first : int, optional
+            Task number to start from, by default 0.
+        """
+        date_strings = {}
+        for (
+            user_offset,
+            user_length,
+            title_offset,
+            title_length,
+            description_offset,
+            description_length,
+            due_ordinal,
+            assigned_ordinal,
+            completed,
+        ) in self.iter_records(first=first):
+            for ordinal in (due_ordinal, assigned_ordinal):
+                if ordinal not in date_strings:
+                    date_strings[ordinal] = date.fromordinal(ordinal).strftime(
+                        DATE_STRING_FORMAT
+                    )
+            yield ";".join(
+                (
+                    self.read_username(user_offset, user_length),
+                    self.read_text(title_offset, title_length),
+                    self.read_text(description_offset, description_length),
+                    date_strings[due_ordinal],
+                    date_strings[assigned_ordinal],
+                    "Yes" if completed else "No",
+                )
+            )
+
+    def load_task_store(self) -> TaskStore:
+        """
+        Load the tasks into a TaskStore without decoding titles or
+        descriptions.
+
+        The heap is copied in as the store's string pool, so titles and
+        descriptions are only decoded when a task is displayed.
+
+        Returns
+        -------
+        TaskStore
+            A store holding the tasks.
+        """
+        with STORAGE_LOCK.hold(shared=True):
+            self.reload_files()
+            return self.read_task_store()
+
+    def load_task_count(self) -> int:
+        """
+        Count the task records, remembering the version of the files, see
+        FlatFileStorage.load_task_count.
+        """
+        with STORAGE_LOCK.hold(shared=True):
+            self.reload_files()
+            # No tasks are in memory to be kept in step with the files
+            self.synced_changes = None
+            return self.task_count()
+
+    def read_task_store(self) -> TaskStore:
+        """
+        Load the files as mapped into a TaskStore, see load_task_store.
+        """
+        store = TaskStore()
+        store.text_pool = bytearray(self.heap_mmap)
+        METRICS.add_bytes(read=len(store.text_pool))
+        for task_num, (
+            user_offset,
+            user_length,
+            title_offset,
+            title_length,
+            description_offset,
+            description_length,
+            due_ordinal,
+            assigned_ordinal,
+            completed,
+        ) in enumerate(self.iter_records()):
+            store.task_users.append(
+                store.get_user_code(
+                    self.read_username(user_offset, user_length)
+                )
+            )
+            store.due_dates.append(due_ordinal)
+            store.assigned_dates.append(assigned_ordinal)
+            if task_num % 8 == 0:
+                store.completed.append(0)
+            store.set_completed(task_num, completed)
+            store.text_offsets.extend(
+                (
+                    title_offset,
+                    title_offset + title_length,
+                    description_offset,
+                    description_offset + description_length,
+                )
+            )
+            store.task_count += 1
+        return store
+
+    def pack_task(self, task: Task, heap_file) -> bytes:
+        """
+        Write a task's text to the end of the heap and pack its record.
+
+        Parameters
+        ----------
+        task : Task
+            The task to pack.
+        heap_file : file
+            The heap file, open for appending.
+
+        Returns
+        -------
+        bytes
+            The task's fixed-width record.
+        """
+        user_ref = self.username_refs.get(task.username)
+        if user_ref is None:
+            user_ref = self.append_text(task.username, heap_file)
+            self.username_refs[task.username] = user_ref
+        return BINARY_RECORD.pack(
+            *user_ref,
+            *self.append_text(task.title, heap_file),
+            *self.append_text(task.description, heap_file),
+            task.due_date.toordinal(),
+            task.assigned_date.toordinal(),
+            task.completed,
+        )
+
+    @staticmethod
+    def append_text(text: str, heap_file) -> tuple[int, int]:
+        """
+        Write text to the end of the heap, returning its offset and length.
+        """
+        encoded = text.encode()
+        offset = heap_file.tell()
+        heap_file.write(encoded)
+        return offset, len(encoded)
+
+    def write_tasks(self, task_list: Iterable[Task]):
+        """
+        Replace all tasks with new task and heap files.
+
+        Both files are written in full and then replaced, the heap first,
+        under the storage lock so no session reads one without the other.
+
+        Raises
+        ------
+        StaleDataError
+            If another session changed the tasks since they were loaded.
+        """
+        with STORAGE_LOCK.hold():
+            self.check_version()
+            # The count carries on in the new file, so it never repeats
+            change_count = self.read_change_count() + 1
+            self.close_files()
+            self.username_refs = {}
+            self.ref_usernames = {}
+            with atomic_open(self.task_file, "wb") as task_file:
+                with atomic_open(self.heap_file, "wb") as heap_file:
+                    task_file.write(
+                        BINARY_TASK_HEADER.pack(
+                            BINARY_TASK_MAGIC, change_count
+                        )
+                    )
+                    heap_file.write(BINARY_HEAP_MAGIC)
+                    for t in task_list:
+                        record = self.pack_task(task=t, heap_file=heap_file)
+                        task_file.write(record)
+            self.open_files()
+            METRICS.add_bytes(
+                written=len(self.task_mmap) + len(self.heap_mmap)
+            )
+            self.version = self.data_version()
+            self.synced_changes = change_count
+
+    def commit(
+        self, task_list: list[Task] | None, changes: list[tuple]
+    ):
+        """
+        Save task changes, patching existing records in place.
+
+        New tasks are appended to the task file; changed fields of existing
+        tasks are written straight into their records.
+
+        Parameters
+        ----------
+        task_list : list[Task] | None
+            The full list of tasks, with the changes already applied, or
+            None. Not used by this storage.
+        changes : list[tuple]
+            The changes, see commit_task_changes.
+
+        Raises
+        ------
+        StaleDataError
+            If another session changed the tasks since they were loaded.
+        """
+        with STORAGE_LOCK.hold():
+            self.check_version()
+            # Patches by other sessions since are still not in memory
+            synced = self.tasks_current()
+            self.write_changes(changes=changes)
+            self.version = self.data_version()
+            self.synced_changes = (
+                self.read_change_count() if synced else None
+            )
+
+    def write_changes(self, changes: list[tuple]):
+        """
+        Write task changes to the files, see commit.
+        """
+        # New tasks and new usernames grow the files, so are written first
+        # and the files mapped again
+        new_usernames = {
+            details[1]
+            for action, _, *details in changes
+            if action == "set" and details[0] == "username"
+        } - self.username_refs.keys()
+        added_tasks = [
+            details[0] for action, _, *details in changes if action == "add"
+        ]
+        if added_tasks or new_usernames:
+            old_size = len(self.task_mmap) + len(self.heap_mmap)
+            self.close_files()
+            with open(self.task_file, "ab") as task_file, open(
+                self.heap_file, "ab"
+            ) as heap_file:
+                for username in new_usernames:
+                    user_ref = self.append_text(username, heap_file)
+                    self.username_refs[username] = user_ref
+                for t in added_tasks:
+                    record = self.pack_task(task=t, heap_file=heap_file)
+                    task_file.write(record)
+            self.open_files()
+            METRICS.add_bytes(
+                written=len(self.task_mmap) + len(self.heap_mmap) - old_size
+            )
+
+        # Patch changed fields in place
+        patched = False
+        for action, task_num, *details in changes:
+            if action == "add":
+                continue
+            patched = True
+            field, value = details
+            record_start = (
+                BINARY_TASK_HEADER.size + task_num * BINARY_RECORD.size
+            )
+            if field == "username":
+                BINARY_USER_REF.pack_into(
+                    self.task_mmap, record_start, *self.username_refs[value]
+                )
+            elif field == "due_date":
+                BINARY_ORDINAL.pack_into(
+                    self.task_mmap,
+                    record_start + BINARY_DUE_DATE_OFFSET,
+                    value.toordinal(),
+                )
+            elif field == "completed":
+                BINARY_FLAG.pack_into(
+                    self.task_mmap,
+                    record_start + BINARY_COMPLETED_OFFSET,
+                    value,
+                )
+            else:
+                raise ValueError(f"Field cannot be changed in place: {field}")
+        if patched:
+            _, change_count = BINARY_TASK_HEADER.unpack_from(self.task_mmap)
+            BINARY_TASK_HEADER.pack_into(
+                self.task_mmap, 0, BINARY_TASK_MAGIC, change_count + 1
+            )
+        self.task_mmap.flush()
+
+    def get_user_data(self) -> list[str]:
+        """
+        Read the users from user.txt, see FlatFileStorage.get_user_data.
+        """
+        return self.user_storage.get_user_data()
+
+    def write_users(self, user_data: list[str]):
+        """
+        Write all users to user.txt.
+        """
+        self.user_storage.write_users(user_data)
+
+    def get_user(self, username: str) -> str | None:
+        """
+        Look up one user's password in user.txt.
+        """
+        return self.user_storage.get_user(username=username)
+
+    def add_user(self, username: str, password: str):
+        """
+        Add a user to user.txt.
+        """
+        self.user_storage.add_user(username=username, password=password)
+
+    def add_users(self, users: list[tuple[str, str]]):
+        """
+        Add users to user.txt, see FlatFileStorage.add_users.
+        """
+        self.user_storage.add_users(users=users)
+
+    def report_counts(
+        self, usernames: Iterable[str], curr_date: date
+    ) -> tuple[int, int, int, dict]:
+        """
+        Count tasks for the reports from the records alone, without
+        decoding any titles or descriptions.
+
+        See count_tasks for the returned values.
+        """
+        curr_ordinal = curr_date.toordinal()
+        user_dict = {
+            user: {"task_count": 0, "completed": 0, "overdue": 0}
+            for user in usernames
+        }
+        total_tasks = total_completed = total_overdue = 0
+        for user_offset, user_length, *_, due_ordinal, _, completed in (
+            self.iter_records()
+        ):
+            username = self.read_username(user_offset, user_length)
+            user_stats = user_dict.setdefault(
+                username, {"task_count": 0, "completed": 0, "overdue": 0}
+            )
+            total_tasks += 1
+            user_stats["task_count"] += 1
+            # Only overdue if not completed
+            if completed:
+                total_completed += 1
+                user_stats["completed"] += 1
+            elif due_ordinal < curr_ordinal:
+                total_overdue += 1
+                user_stats["overdue"] += 1
+        return total_tasks, total_completed, total_overdue, user_dict
+
+
+# Storage backends by name, as chosen with --storage
+STORAGE_TYPES = {
+    "text": FlatFileStorage,
+    "sqlite": SQLiteStorage,
+    "binary": BinaryStorage,
+}
+
+# The storage used by the task manager functions
+STORAGE = FlatFileStorage()
+
+
+def set_storage(storage):
+    """
+    Choose the storage used by the task manager functions.
+
+    Parameters
+    ----------
+    storage : FlatFileStorage | SQLiteStorage | BinaryStorage
+        The storage to use.
+    """
+    global STORAGE
+    STORAGE = storage
+
+
+def migrate_storage(source, target) -> tuple[int, int]:
+    """
+    Copy all tasks and users from one storage to another.
+
+    Anything already in the target is replaced. Tasks are streamed, so the
+    source is never held in memory all at once.
+
+    Parameters
+    ----------
+    source : FlatFileStorage | SQLiteStorage
+        The storage to copy from.
+    target : FlatFileStorage | SQLiteStorage
+        The storage to copy to.
+
+    Returns
+    -------
+    tuple[int, int]
+        The number of tasks and users copied.
+    """
+    task_count = 0
+
+    def counted_tasks() -> Iterator[Task]:
+        nonlocal task_count
+        for t_str in source.iter_task_data():
+            task_count += 1
+            yield parse_task(t_str)
+
+    target.write_tasks(counted_tasks())
+    user_data = [user for user in source.get_user_data() if user != ""]
+    target.write_users(user_data)
+    return task_count, len(user_data)
+
+
+# ====Console Section====
+# Every prompt and message goes through CONSOLE, so the menus can be driven
+# by a script instead of a terminal, e.g. by session_replay.py.
+class Console:
+    """
+    Console input and output for the menus, using the terminal.
+
+    Use set_console to swap in another console such as ScriptedConsole.
+    """
+
+    def input(self, prompt: str = "") -> str:
+        """
+        Prompt for and read a line of input, as the built-in input does.
+        """
+        return input(prompt)
+
+    def print(self, *values, end: str = "\n"):
+        """
+        Print values, as the built-in print does.
+        """
+        print(*values, end=end)
+
+    def write(self, text: str):
+        """
+        Write text in one go, e.g. a page of tasks.
+        """
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    def record_action(self, action: str, seconds: float):
+        """
+        Called by launch_menu with the time taken by each menu action.
+        The terminal console ignores it.
+        """
+
+
+class ScriptedConsole(Console):
+    """
+    A console that reads its input from a list of lines, with no terminal.
+
+    Output is discarded unless an output file is given. The time taken by
+    each menu action is kept in action_times.
+
+    Parameters
+    ----------
+    inputs : Iterable[str]
+        The lines to return from input, in order.
+    output : file, optional
+        Where to write output, by default None (discarded).
+    """
+
+    def __init__(self, inputs: Iterable[str], output=None):
+        self.inputs = iter(inputs)
+        self.output = output
+        # Action: list of seconds taken, in order
+        self.action_times = {}
+
+    def input(self, prompt: str = "") -> str:
+        """
+        Return the next scripted line.
+
+        Raises
+        ------
+        EOFError
+            If there are no lines left, as input does at end of file.
+        """
+        self.write(prompt)
+        try:
+            return next(self.inputs)
+        except StopIteration:
+            raise EOFError("No scripted input left") from None
+
+    def print(self, *values, end: str = "\n"):
+        """
+        Print values to the output, if any.
+        """
+        if self.output is not None:
+            print(*values, end=end, file=self.output)
+
+    def write(self, text: str):
+        """
+        Write text to the output, if any.
+        """
+        if self.output is not None:
+            self.output.write(text)
+
+    def record_action(self, action: str, seconds: float):
+        """
+        Keep the time taken by a menu action.
+        """
+        self.action_times.setdefault(action, []).append(seconds)
+
+
+class RecordingConsole(Console):
+    """
+    A terminal console that keeps every line typed, so the session can be
+    saved and replayed with session_replay.py.
+    """
+
+    def __init__(self):
+        self.inputs = []
+
+    def input(self, prompt: str = "") -> str:
+        """
+        Read a line from the terminal and keep it.
+        """
+        line = input(prompt)
+        self.inputs.append(line)
+        return line
+
+    def save(self, file_name: str):
+        """
+        Append the session to a session file, one JSON object per line.
+
+        Parameters
+        ----------
+        file_name : str
+            The session file.
+        """
+        with open(file_name, "a") as session_file:
+            session_file.write(json.dumps({"inputs": self.inputs}) + "\n")
+
+
+CONSOLE = Console()
+
+
+def set_console(console: Console):
+    """
+    Choose the console used for all prompts and messages.
+
+    Parameters
+    ----------
+    console : Console
+        The console to use.
+    """
+    global CONSOLE
+    CONSOLE = console
+
+
+# ====Get Task Section====
+@instrumented(name="get_task_data")
+def get_task_data() -> list[str]:
+    """
+    Create list of tasks from tasks.txt file.
+
+    - Create blank tasks.txt file if doesn't exist.
+    - Read the tasks.txt file.
+    - Creates a list of tasks in tasks.txt file, each line in the file
+      is an element in the list.
+    - Blank lines are removed from the list.
+    - Changes recorded in the task journal are applied to the list.
+
+    Returns
+    -------
+    list[str]
+        Contains data of each users tasks.
+    """
+    return list(iter_task_data())
+
+
+def iter_task_data() -> Iterator[str]:
+    """
+    Yield the stored tasks one line at a time.
+
+    With the default text storage, tasks.txt is read line by line and the
+    task journal applied as it goes, so only one task is held in memory.
+
+    Yields
+    ------
+    str
+        A string representing a task, fields separated by semicolons.
+    """
+    return STORAGE.iter_task_data()
+
+
+@instrumented(name="get_task_list")
+def get_task_list(task_data: Iterable[str]) -> list[Task]:
+    """
+    Create a list of Task objects for tasks.
+
+    Each element in the list will be a Task containing all the
+    information for a task.
+
+    Parameters
+    ----------
+    task_data : Iterable[str]
+        A list (or generator, see iter_task_data) of strings representing
+        tasks. Fields within the task are separated by semicolons.
+
+    Returns
+    -------
+    list[Task]
+        A list of Task objects representing tasks.
+    """
+    return [parse_task(t_str) for t_str in task_data]
+
+
+@instrumented(name="load_task_list")
+def load_task_list(store: str = "list") -> list[Task] | TaskStore:
+    """
+    Load the tasks from tasks.txt file into the chosen kind of task list.
+
+    Parameters
+    ----------
+    store : str, optional
+        "list" for a list of Task objects, or "columnar" for a TaskStore,
+        by default "list".
+
+    Returns
+    -------
+    list[Task] | TaskStore
+        The loaded tasks.
+    """
+    if store == "columnar":
+        return STORAGE.load_task_store()
+    return get_task_list(task_data=iter_task_data())
+
+
+def iter_tasks() -> Iterator[Task]:
+    """
+    Yield the tasks in tasks.txt file one task at a time.
+
+    Allows callers that only need totals, such as generate_reports, to
+    read the tasks without holding them all in memory.
+
+    Yields
+    ------
+    Task
+        A task read from the file.
+    """
+    for t_str in iter_task_data():
+        yield parse_task(t_str)
+
+
+def parse_task(t_str: str) -> Task:
+    """
+    Create a Task from a line of tasks.txt.
+
+    Parameters
+    ----------
+    t_str : str
+        A string representing a task, fields separated by semicolons.
+
+    Returns
+    -------
+    Task
+        The task described by the line.
+    """
+    # Split by semicolon and manually add each component
+    task_components = t_str.split(";")
+    return Task(
+        username=task_components[0],
+        title=task_components[1],
+        description=task_components[2],
+        due_date=parse_date(task_components[3]),
+        assigned_date=parse_date(task_components[4]),
+        completed=True if task_components[5] == "Yes" else False,
+    )
+
+
+# Tasks share a small set of dates, so parsed dates are cached
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(date_str: str) -> date:
+    """
+    Convert a date string in DATE_STRING_FORMAT (YYYY-MM-DD) to a date.
+
+    Gives the same result as datetime.strptime(...).date(), but reads the
+    fixed YYYY-MM-DD layout directly and remembers recently parsed strings.
+    Anything not in that exact layout is left to strptime.
+
+    Parameters
+    ----------
+    date_str : str
+        The date string to convert.
+
+    Returns
+    -------
+    date
+        A date object representing the date.
+
+    Raises
+    ------
+    ValueError
+        If the string is not a valid date in DATE_STRING_FORMAT.
+    """
+    year, month, day = date_str[:4], date_str[5:7], date_str[8:]
+    if (
+        len(date_str) == 10
+        and date_str[4] == "-"
+        and date_str[7] == "-"
+        and date_str.isascii()
+        and year.isdigit()
+        and month.isdigit()
+        and day.isdigit()
+    ):
+        return date(int(year), int(month), int(day))
+    # Unpadded or otherwise unusual input, e.g. 2024-3-7
+    return datetime.strptime(date_str, DATE_STRING_FORMAT).date()
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def format_date(value: date) -> str:
+    """
+    Convert a date to a string in DATE_STRING_FORMAT (YYYY-MM-DD).
+
+    Recently formatted dates are remembered, as tasks share few dates.
+
+    Parameters
+    ----------
+    value : date
+        The date to convert.
+
+    Returns
+    -------
+    str
+        The date as a string.
+    """
+    return value.strftime(DATE_STRING_FORMAT)
+
+
+# ====Get User Section====
+@instrumented(name="get_user_data")
+def get_user_data() -> list[str]:
+    """
+    Reads usernames and password from the user storage.
+
+     - With the default text storage this is the user.txt file.
+     - If there are no users, a default admin account is written:
+       "admin;password".
+
+    Returns
+    -------
+    list[str]
+        A list containing user data. Each element of the list is a string
+        representing a user with the format: username;password.
+    """
+    return STORAGE.get_user_data()
+
+
+@instrumented(name="get_user")
+def get_user(username: str) -> str | None:
+    """
+    Look up one user's password in the user storage, without reading
+    every user.
+
+    Parameters
+    ----------
+    username : str
+        The username to look up.
+
+    Returns
+    -------
+    str | None
+        The password, or None if there is no such user.
+    """
+    # Such usernames can't be stored, so there is nothing to look up
+    if not username or ";" in username or "\n" in username:
+        return None
+    return STORAGE.get_user(username=username)
+
+
+class UserDirectory(Mapping):
+    """
+    The users and their passwords, read from the user storage one user at
+    a time with get_user.
+
+    Used in place of the username_password dictionary, so logging in and
+    checks such as `username in username_password` read a single user
+    rather than the whole user file. Iterating (e.g. for the reports)
+    reads every user. Users found are remembered, as are users registered
+    with `username_password[username] = password`.
+    """
+
+    def __init__(self):
+        # Users already looked up or registered: username -> password
+        self.found = {}
+
+    def __getitem__(self, username: str) -> str:
+        password = self.found.get(username)
+        if password is None:
+            password = get_user(username=username)
+            if password is None:
+                raise KeyError(username)
+            self.found[username] = password
+        return password
+
+    def __setitem__(self, username: str, password: str):
+        self.found[username] = password
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(get_username_password(get_user_data()))
+
+    def __len__(self) -> int:
+        return len(get_username_password(get_user_data()))
+
+    def clear(self):
+        """
+        Forget the users found, so they are read again from the storage.
+        """
+        self.found = {}
+
+
+# Convert user_data to a dictionary
+def get_username_password(user_data: list[str]) -> dict:
+    """
+    Create a dictionary of username-password pairs from a list of user data.
+
+    Parameters
+    ----------
+    user_data : list[str]
+        A list containing user data. Each element of the list is a string
+        representing a user with the format: "username;password".
+
+    Returns
+    -------
+    dict
+        A dictionary where the keys are usernames and the values are passwords.
+    """
+    username_password = {}
+    for user in user_data:
+        username, password = user.split(";")
+        # Set key to username, set value to password
+        username_password[username] = password
+    return username_password
+
+
+# ====Login Section====
+# User input function: username/password
+def get_user_login(username_password: dict) -> str:
+    """
+    Prompt the user for login details and validate against existing data
+    in file.
+
+    Parameters
+    ----------
+    username_password : dict
+        A dictionary where the keys are usernames and the values are passwords.
+
+    Returns
+    -------
+    str
+        A str containing the username of each successfully logged-in user.
+    """
+    # Loop until successful
+    while True:
+        # Get user username and password
+        CONSOLE.print("LOGIN")
+        curr_user = CONSOLE.input("Username: ")
+        curr_pass = CONSOLE.input("Password: ")
+        # Check user exists
+        if curr_user not in username_password.keys():
+            CONSOLE.print("\nUser does not exist")
+            continue
+        # Check password if correct
+        elif username_password[curr_user] != curr_pass:
+            CONSOLE.print("\nWrong password")
+            continue
+        else:
+            # Success - return username
+            CONSOLE.print("\nLogin Successful!")
+            return curr_user
+
+
+# ====Main Menu Functions Section====
+# Function that is called when the user selects ‘r’ to register a user.
+def reg_user(username_password: dict):
+    """
+    Register a new user by adding their login details to the existing
+    user data.
+
+    Parameters
+    ----------
+    username_password : dict
+        A dictionary where the keys are usernames and the values are passwords.
+    """
+    new_username = CONSOLE.input("New Username: ")
+
+    # Check if the username already exists
+    if new_username in username_password:
+        CONSOLE.print(
+            "\nUsername already exists. Please choose a different username."
+        )
+        return
+
+    # Get password
+    new_password = CONSOLE.input("New Password: ")
+    confirm_password = CONSOLE.input("Confirm Password: ")
+
+    # Confirm match
+    if new_password == confirm_password:
+        CONSOLE.print("\nNew user added")
+        username_password[new_username] = new_password
+
+        # Save the new user to the user storage
+        STORAGE.add_user(username=new_username, password=new_password)
+    else:
+        CONSOLE.print("Passwords do not match")
+
+
+# Function for turning a Task into a line of tasks.txt
+def format_task(task: Task) -> str:
+    """
+    Format a task as a semicolon separated line for 'tasks.txt'.
+
+    Parameters
+    ----------
+    task : Task
+        The task to format.
+
+    Returns
+    -------
+    str
+        The task fields joined by semicolons.
+    """
+    return ";".join(
+        format_task_field(field=field, value=getattr(task, field))
+        for field in TASK_FIELDS
+    )
+
+
+def format_task_field(field: str, value) -> str:
+    """
+    Format a single task field as it is stored in 'tasks.txt'.
+
+    Parameters
+    ----------
+    field : str
+        Name of the task field, one of TASK_FIELDS.
+    value
+        Value of the field.
+
+    Returns
+    -------
+    str
+        The field value as a string.
+    """
+    if field in ("due_date", "assigned_date"):
+        return format_date(value)
+    elif field == "completed":
+        return "Yes" if value else "No"
+    return value
+
+
+def parse_task_field(field: str, str_value: str):
+    """
+    Parse a single task field as it is stored in 'tasks.txt', the reverse
+    of format_task_field.
+
+    Parameters
+    ----------
+    field : str
+        Name of the task field, one of TASK_FIELDS.
+    str_value : str
+        The field value as a string.
+
+    Returns
+    -------
+    The value of the field.
+    """
+    if field in ("due_date", "assigned_date"):
+        return parse_date(str_value)
+    elif field == "completed":
+        return str_value == "Yes"
+    elif field == "username":
+        return sys.intern(str_value)
+    return str_value
+
+
+# Function for turning Task objects into lines and writing to file
+@instrumented(name="write_task_list")
+def write_task_list(task_list: list[Task]):
+    """
+    Write a list of tasks to 'tasks.txt' (or the chosen storage).
+
+    All stored tasks are replaced. With the default text storage the whole
+    file is rewritten, so any task journal is folded in and removed.
+
+    Parameters
+    ----------
+    task_list : list[Task]
+        List of Task objects (or a TaskStore) with fields:
+        - username (str)
+        - title (str)
+        - description (str)
+        - due_date (date)
+        - assigned_date (date)
+        - completed (bool)
+    """
+    STORAGE.write_tasks(task_list=task_list)
+
+
+# ====Task Changes Section====
+def apply_task_changes(t_str: str, changes: dict[str, str] | None) -> str:
+    """
+    Apply journalled field changes to a line of tasks.txt.
+
+    Parameters
+    ----------
+    t_str : str
+        A string representing a task, fields separated by semicolons.
+    changes : dict[str, str] | None
+        New field values keyed by field name, or None if unchanged.
+
+    Returns
+    -------
+    str
+        The task line with the changes applied.
+    """
+    if not changes:
+        return t_str
+    task_components = t_str.split(";")
+    for field, value in changes.items():
+        task_components[TASK_FIELDS.index(field)] = value
+    return ";".join(task_components)
+
+
+def append_task(
+    task_list: list[Task],
+    task: Task,
+    task_index: dict | None = None,
+    commit: bool = True,
+) -> tuple:
+    """
+    Add a new task to the task list and save it to the storage.
+
+    Parameters
+    ----------
+    task_list : list[Task]
+        List of Task objects.
+    task : Task
+        The new task.
+    task_index : dict | None, optional
+        Task indexes to update, see build_task_index, by default None.
+    commit : bool, optional
+        Whether to save the change now. If False the caller saves the
+        returned change with commit_task_changes, by default True.
+
+    Returns
+    -------
+    tuple
+        The change, see commit_task_changes.
+    """
+    task_list.append(task)
+    task_num = len(task_list) - 1
+    if task_index is not None:
+        index_add_task(task_index=task_index, task_num=task_num, task=task)
+    change = ("add", task_num, task)
+    if commit:
+        commit_task_changes(task_list=task_list, changes=[change])
+    return change
+
+
+def update_task(
+    task_list: list[Task],
+    task_num: int,
+    field: str,
+    value,
+    task_index: dict | None = None,
+    commit: bool = True,
+) -> tuple:
+    """
+    Change one field of a task and save the change to the storage.
+
+    Parameters
+    ----------
+    task_list : list[Task]
+        List of Task objects.
+    task_num : int
+        Position of the task in the task list.
+    field : str
+        Name of the field to change, one of TASK_FIELDS.
+    value
+        New value of the field.
+    task_index : dict | None, optional
+        Task indexes to update, see build_task_index, by default None.
+    commit : bool, optional
+        Whether to save the change now. If False the caller saves the
+        returned change with commit_task_changes, by default True.
+
+    Returns
+    -------
+    tuple
+        The change, see commit_task_changes.
+    """
+    if field == "username":
+        value = sys.intern(value)
+    # Assign the task back so a TaskStore sees the change too
+    task = task_list[task_num]
+    old_value = getattr(task, field)
+    setattr(task, field, value)
+    task_list[task_num] = task
+    if task_index is not None:
+        index_update_task(
+            task_index=task_index,
+            task_num=task_num,
+            task=task,
+            field=field,
+            old_value=old_value,
+        )
+    change = ("set", task_num, field, value)
+    if commit:
+        commit_task_changes(task_list=task_list, changes=[change])
+    return change
+
+
+@instrumented(name="commit_task_changes")
+def commit_task_changes(task_list: list[Task], changes: list[tuple]):
+    """
+    Save changes already made to the task list to the storage.
+
+    All the changes are saved together, e.g. as one write to the task
+    journal or one database transaction.
+
+    Parameters
+    ----------
+    task_list : list[Task]
+        The full list of tasks, with the changes already applied.
+    changes : list[tuple]
+        The changes, each one of:
+        - ("add", task number, task)
+        - ("set", task number, field, new value)
+    """
+    STORAGE.commit(task_list=task_list, changes=changes)
+
+
+@instrumented(name="refresh_task_list")
+def refresh_task_list(
+    task_list: list[Task], task_index: dict, full: bool = False
+) -> tuple[list[Task], dict]:
+    """
+    Bring the task list up to date with changes saved by other sessions.
+
+    Only the changes saved since the tasks were loaded are read and applied
+    (see FlatFileStorage.read_changes), which costs a couple of file stats
+    when nothing has changed. The tasks are loaded again in full when the
+    storage can't tell what changed, e.g. tasks.txt was rewritten.
+
+    Parameters
+    ----------
+    task_list : list[Task]
+        List of Task objects, or a TaskStore.
+    task_index : dict
+        Task indexes kept up to date with the task list, see
+        build_task_index.
+    full : bool, optional
+        Load the tasks again in full, by default False.
+
+    Returns
+    -------
+    tuple[list[Task], dict]
+        The task list and task indexes, new ones if loaded in full.
+    """
+    changes = None
+    if not full:
+        changes = STORAGE.read_changes(task_count=len(task_list))
+
+    if changes is None:
+        store = "columnar" if isinstance(task_list, TaskStore) else "list"
+        task_list = load_task_list(store=store)
+        # Only build a search index if the old indexes had one
+        return task_list, build_task_index(
+            task_list=task_list, search=task_index["search"] is not None
+        )
+
+    for action, task_num, *details in changes:
+        if action == "add":
+            append_task(
+                task_list=task_list,
+                task=details[0],
+                task_index=task_index,
+                commit=False,
+            )
+        else:
+            update_task(
+                task_list=task_list,
+                task_num=task_num,
+                field=details[0],
+                value=details[1],
+                task_index=task_index,
+                commit=False,
+            )
+    return task_list, task_index
+
+
+# ====Task Index Section====
+# Indexes over the task list, built once at load and kept up to date by
+# append_task and update_task. Held in one dictionary:
+#   "by_user": username -> sorted list of that user's task numbers
+#   "due_dates": sorted list of the due date ordinals of uncompleted tasks
+#   "by_due": due date ordinal -> sorted list of its uncompleted task
+#             numbers
+#   "stats": running totals for generate_reports, see new_task_stats
+#   "display": task number -> display string of the tasks last shown, see
+#              render_task_page
+#   "search": word index over titles and descriptions, see the Task Search
+#             Section
+def build_task_index(task_list: list[Task], search: bool = True) -> dict:
+    """
+    Build the indexes over a task list.
+
+    Parameters
+    ----------
+    task_list : list[Task]
+        List of Task objects, or a TaskStore.
+    search : bool, optional
+        Also build the search index, by default True. With False it is
+        built by the first search instead (see get_search_index), for
+        indexes that are not searched or to start up sooner.
+
+    Returns
+    -------
+    dict
+        The task indexes, see the Task Index Section.
+    """
+    by_user = {}
+    by_due = {}
+    stats = new_task_stats(curr_date=date.today())
+    for task_num, (username, due_ordinal, completed) in enumerate(
+        iter_index_fields(task_list=task_list)
+    ):
+        # Task numbers are added in order, so each list is already sorted
+        by_user.setdefault(username, []).append(task_num)
+        if not completed:
+            by_due.setdefault(due_ordinal, []).append(task_num)
+        stats_add_task(
+            stats=stats,
+            username=username,
+            due_ordinal=due_ordinal,
+            completed=completed,
+        )
+
+    # Display strings are cached as pages of tasks are shown
+    return {
+        "by_user": by_user,
+        "due_dates": sorted(by_due),
+        "by_due": by_due,
+        "stats": stats,
+        "display": OrderedDict(),
+        "search": build_search_index(task_list=task_list) if search else None,
+    }
+
+
+def iter_index_fields(task_list: list[Task]) -> Iterator[tuple]:
+    """
+    Yield the fields of each task that the indexes are built from.
+
+    A TaskStore gives these straight from its buffers without building
+    Task objects.
+
+    Parameters
+    ----------
+    task_list : list[Task]
+        List of Task objects, or a TaskStore.
+
+    Yields
+    ------
+    tuple
+        The username, due date ordinal and completed flag of a task.
+    """
+    if isinstance(task_list, TaskStore):
+        for task_num, (code, due_ordinal) in enumerate(
+            zip(task_list.task_users, task_list.due_dates)
+        ):
+            yield (
+                task_list.usernames[code],
+                due_ordinal,
+                task_list.is_completed(task_num),
+            )
+    else:
+        for t in task_list:
+            yield t.username, t.due_date.toordinal(), t.completed
+
+
+def index_add_task(task_index: dict, task_num: int, task: Task):
+    """
+    Add a new task to the task indexes.
+
+    Parameters
+    ----------
+    task_index : dict
+        The task indexes, see build_task_index.
+    task_num : int
+        Position of the new task in the task list.
+    task : Task
+        The new task.
+    """
+    insort(task_index["by_user"].setdefault(task.username, []), task_num)
+    if task_index["search"] is not None:
+        search_index_add(
+            search_index=task_index["search"],
+            task_num=task_num,
+            words=task_words(title=task.title, description=task.description),
+        )
+    if not task.completed:
+        index_add_due(
+            task_index=task_index,
+            task_num=task_num,
+            due_ordinal=task.due_date.toordinal(),
+        )
+    stats_add_task(
+        stats=task_index["stats"],
+        username=task.username,
+        due_ordinal=task.due_date.toordinal(),
+        completed=task.completed,
+    )
+
+
+def index_update_task(
+    task_index: dict, task_num: int, task: Task, field: str, old_value
+):
+    """
+    Update the task indexes for a change to one field of a task.
+
+    Parameters
+    ----------
+    task_index : dict
+        The task indexes, see build_task_index.
+    task_num : int
+        Position of the task in the task list.
+    task : Task
+        The task, with the change already made.
+    field : str
+        Name of the changed field, one of TASK_FIELDS.
+    old_value
+        Value of the field before the change.
+    """
+    # The task's cached display string is out of date
+    task_index["display"].pop(task_num, None)
+
+    # Get the task as it was before the change
+    old_username = old_value if field == "username" else task.username
+    old_due_date = old_value if field == "due_date" else task.due_date
+    old_completed = old_value if field == "completed" else task.completed
+
+    if old_username != task.username:
+        # Move the task from the old user's list to the new user's
+        old_user_tasks = task_index["by_user"][old_username]
+        del old_user_tasks[bisect_left(old_user_tasks, task_num)]
+        insort(task_index["by_user"].setdefault(task.username, []), task_num)
+
+    if field in ("title", "description") and task_index["search"] is not None:
+        # Only the words that came or went change
+        old_title = old_value if field == "title" else task.title
+        old_description = (
+            old_value if field == "description" else task.description
+        )
+        old_words = task_words(title=old_title, description=old_description)
+        new_words = task_words(title=task.title, description=task.description)
+        search_index_remove(
+            search_index=task_index["search"],
+            task_num=task_num,
+            words=old_words - new_words,
+        )
+        search_index_add(
+            search_index=task_index["search"],
+            task_num=task_num,
+            words=new_words - old_words,
+        )
+
+    if old_due_date != task.due_date or old_completed != task.completed:
+        # Move the task to its new due date, if still uncompleted
+        if not old_completed:
+            index_remove_due(
+                task_index=task_index,
+                task_num=task_num,
+                due_ordinal=old_due_date.toordinal(),
+            )
+        if not task.completed:
+            index_add_due(
+                task_index=task_index,
+                task_num=task_num,
+                due_ordinal=task.due_date.toordinal(),
+            )
+
+    # Take the old task out of the stats and put the new one in
+    stats_add_task(
+        stats=task_index["stats"],
+        username=old_username,
+        due_ordinal=old_due_date.toordinal(),
+        completed=old_completed,
+        count=-1,
+    )
+    stats_add_task(
+        stats=task_index["stats"],
+        username=task.username,
+        due_ordinal=task.due_date.toordinal(),
+        completed=task.completed,
+    )
+
+
+def get_user_task_nums(task_index: dict, username: str) -> list[int]:
+    """
+    Get the numbers of the tasks assigned to a user.
+
+    Parameters
+    ----------
+    task_index : dict
+        The task indexes, see build_task_index.
+    username : str
+        The username to look up.
+
+    Returns
+    -------
+    list[int]
+        The user's task numbers in ascending order.
+    """
+    return task_index["by_user"].get(username, [])
+
+
+def index_add_due(task_index: dict, task_num: int, due_ordinal: int):
+    """
+    Add an uncompleted task to the due date index.
+
+    Parameters
+    ----------
+    task_index : dict
+        The task indexes, see build_task_index.
+    task_num : int
+        Position of the task in the task list.
+    due_ordinal : int
+        The task's due date as a day ordinal.
+    """
+    due_tasks = task_index["by_due"].get(due_ordinal)
+    if due_tasks is None:
+        task_index["by_due"][due_ordinal] = [task_num]
+        insort(task_index["due_dates"], due_ordinal)
+    else:
+        insort(due_tasks, task_num)
+
+
+def index_remove_due(task_index: dict, task_num: int, due_ordinal: int):
+    """
+    Take a task out of the due date index, e.g. once completed.
+
+    Parameters
+    ----------
+    task_index : dict
+        The task indexes, see build_task_index.
+    task_num : int
+        Position of the task in the task list.
+    due_ordinal : int
+        The due date the task is indexed under, as a day ordinal.
+    """
+    due_tasks = task_index["by_due"][due_ordinal]
+    del due_tasks[bisect_left(due_tasks, task_num)]
+    # Drop dates with no uncompleted tasks left
+    if not due_tasks:
+        del task_index["by_due"][due_ordinal]
+        due_dates = task_index["due_dates"]
+        del due_dates[bisect_left(due_dates, due_ordinal)]
+
+
+def get_due_task_nums(
+    task_index: dict,
+    due_from: date | None = None,
+    due_to: date | None = None,
+) -> list[int]:
+    """
+    Get the numbers of the uncompleted tasks due between two dates.
+
+    The dates are found by binary search, so the time taken depends on
+    the number of tasks found rather than the number of tasks.
+
+    Parameters
+    ----------
+    task_index : dict
+        The task indexes, see build_task_index.
+    due_from : date | None, optional
+        Only tasks due on or after this date, by default None.
+    due_to : date | None, optional
+        Only tasks due on or before this date, by default None.
+
+    Returns
+    -------
+    list[int]
+        The task numbers, earliest due first and in ascending order for
+        the same due date.
+    """
+    due_dates = task_index["due_dates"]
+    start = 0
+    if due_from is not None:
+        start = bisect_left(due_dates, due_from.toordinal())
+    stop = len(due_dates)
+    if due_to is not None:
+        stop = bisect_right(due_dates, due_to.toordinal())
+
+    task_nums = []
+    for date_num in range(start, stop):
+        task_nums.extend(task_index["by_due"][due_dates[date_num]])
+    return task_nums
+
+
+# ====Task Search Section====
+# An inverted index from each word in the task titles and descriptions to
+# the tasks using it. Held in the task index as "search":
+#   "postings": word -> sorted list of the numbers of tasks using it
+#   "words": sorted list of the words, to find those starting with a prefix
+# Words are found with SEARCH_WORD_PATTERN and compared case-insensitively.
+def task_words(title: str, description: str) -> set[str]:
+    """
+    Get the distinct words in a task's title and description.
+
+    Parameters
+    ----------
+    title : str
+        Title of the task.
+    description : str
+        Description of the task.
+
+    Returns
+    -------
+    set[str]
+        The words, casefolded.
+    """
+    text = f"{title} {description}".casefold()
+    return set(SEARCH_WORD_PATTERN.findall(text))
+
+
+def build_search_index(task_list: list[Task]) -> dict:
+    """
+    Build the search index over a task list.
+
+    Parameters
+    ----------
+    task_list : list[Task]
+        List of Task objects, or a TaskStore.
+
+    Returns
+    -------
+    dict
+        The search index, see the Task Search Section.
+    """
+    # A TaskStore gives its text without building Task objects
+    if isinstance(task_list, TaskStore):
+        texts = (
+            (
+                task_list.get_text(2 * task_num),
+                task_list.get_text(2 * task_num + 1),
+            )
+            for task_num in range(len(task_list))
+        )
+    else:
+        texts = ((t.title, t.description) for t in task_list)
+
+    postings = {}
+    for task_num, (title, description) in enumerate(texts):
+        # Task numbers are added in order, so each list is already sorted
+        for word in task_words(title=title, description=description):
+            task_nums = postings.get(word)
+            if task_nums is None:
+                postings[word] = [task_num]
+            else:
+                task_nums.append(task_num)
+    return {"postings": postings, "words": sorted(postings)}
+
+
+def get_search_index(task_list: list[Task], task_index: dict) -> dict:
+    """
+    Get the search index, building it if build_task_index was asked not
+    to and this is the first search. From then on index_add_task and
+    index_update_task keep it up to date.
+
+    Parameters
+    ----------
+    task_list : list[Task]
+        List of Task objects, or a TaskStore.
+    task_index : dict
+        The task indexes, see build_task_index.
+
+    Returns
+    -------
+    dict
+        The search index, see the Task Search Section.
+    """
+    if task_index["search"] is None:
+        task_index["search"] = build_search_index(task_list=task_list)
+    return task_index["search"]
+
+
+def search_index_add(search_index: dict, task_num: int, words: set[str]):
+    """
+    Add words used by a task to the search index.
+
+    Parameters
+    ----------
+    search_index : dict
+        The search index, see build_search_index.
+    task_num : int
+        Position of the task in the task list.
+    words : set[str]
+        The words, see task_words.
+    """
+    for word in words:
+        task_nums = search_index["postings"].get(word)
+        if task_nums is None:
+            search_index["postings"][word] = [task_num]
+            insort(search_index["words"], word)
+        else:
+            insort(task_nums, task_num)
+
+
+def search_index_remove(search_index: dict, task_num: int, words: set[str]):
+    """
+    Take words no longer used by a task out of the search index.
+
+    Parameters
+    ----------
+    search_index : dict
+        The search index, see build_search_index.
+    task_num : int
+        Position of the task in the task list.
+    words : set[str]
+        The words, see task_words.
+    """
+    for word in words:
+        task_nums = search_index["postings"][word]
+        del task_nums[bisect_left(task_nums, task_num)]
+        # Drop words no task uses any more
+        if not task_nums:
+            del search_index["postings"][word]
+            all_words = search_index["words"]
+            del all_words[bisect_left(all_words, word)]
+
+
+def search_task_nums(
+    task_list: list[Task],
+    task_index: dict,
+    query: str,
+    username: str | None = None,
+) -> list[int]:
+    """
+    Find the tasks whose title or description has every word in a query.
+
+    Each query word matches any word starting with it, e.g. "plumb"
+    matches "plumbing". The words starting with a query word are found by
+    binary search in the sorted word list. The query word matching the
+    fewest tasks is looked up first, and later ones only check the tasks
+    still matching.
+
+    Parameters
+    ----------
+    task_list : list[Task]
+        List of Task objects, or a TaskStore.
+    task_index : dict
+        The task indexes, see build_task_index.
+    query : str
+        The words to search for, separated by spaces.
+    username : str | None, optional
+        Only search the tasks assigned to this user, by default None.
+
+    Returns
+    -------
+    list[int]
+        The matching task numbers in ascending order.
+    """
+    search_index = get_search_index(task_list=task_list, task_index=task_index)
+    query_words = SEARCH_WORD_PATTERN.findall(query.casefold())
+    if not query_words:
+        return []
+
+    # The task number lists of the words starting with each query word,
+    # which sort together. No word has U+10FFFF in it, so it sorts after
+    # every word starting with the query word.
+    all_words = search_index["words"]
+    postings = search_index["postings"]
+    word_postings = []
+    for query_word in set(query_words):
+        start = bisect_left(all_words, query_word)
+        stop = bisect_right(all_words, query_word + "\U0010ffff")
+        word_postings.append(
+            [postings[all_words[word_num]] for word_num in range(start, stop)]
+        )
+    word_postings.sort(key=lambda lists: sum(map(len, lists)))
+
+    matches = None
+    if username is not None:
+        matches = set(
+            get_user_task_nums(task_index=task_index, username=username)
+        )
+    for task_num_lists in word_postings:
+        word_matches = set()
+        for task_nums in task_num_lists:
+            if matches is None:
+                word_matches.update(task_nums)
+            elif len(matches) < len(task_nums) // 16:
+                # Look the few matches up in a long sorted list
+                word_matches.update(
+                    task_num
+                    for task_num in matches
+                    if sorted_contains(task_nums, task_num)
+                )
+            else:
+                word_matches.update(matches.intersection(task_nums))
+        matches = word_matches
+        if not matches:
+            return []
+    return sorted(matches)
+
+
+def sorted_contains(values: list[int], value: int) -> bool:
+    """
+    Check whether a sorted list holds a value, by binary search.
+    """
+    index = bisect_left(values, value)
+    return index < len(values) and values[index] == value
+
+
+# ====Task Stats Section====
+# Running totals behind generate_reports. Overdue counts depend on the
+# date, so uncompleted tasks are also counted by due date ("uncompleted":
+# due date ordinal -> username -> count). The overdue totals are correct
+# as of the "as_of" date ordinal and are moved forward (or back) to the
+# current date by stats_set_date before each report.
+def new_task_stats(curr_date: date) -> dict:
+    """
+    Create empty task stats.
+
+    Parameters
+    ----------
+    curr_date : date
+        The date overdue counts are worked out for.
+
+    Returns
+    -------
+    dict
+        Empty task stats, see the Task Stats Section.
+    """
+    return {
+        "total": 0,
+        "completed": 0,
+        "overdue": 0,
+        "users": {},
+        "uncompleted": {},
+        "as_of": curr_date.toordinal(),
+    }
+
+
+def stats_add_task(
+    stats: dict,
+    username: str,
+    due_ordinal: int,
+    completed: bool,
+    count: int = 1,
+):
+    """
+    Add a task to (or with count=-1, remove a task from) the task stats.
+
+    Parameters
+    ----------
+    stats : dict
+        The task stats, see new_task_stats.
+    username : str
+        The user the task is assigned to.
+    due_ordinal : int
+        The task's due date as a day ordinal.
+    completed : bool
+        Whether the task is complete.
+    count : int, optional
+        1 to add the task, -1 to remove it, by default 1.
+    """
+    user_stats = stats["users"].get(username)
+    if user_stats is None:
+        user_stats = {"task_count": 0, "completed": 0, "overdue": 0}
+        stats["users"][username] = user_stats
+
+    stats["total"] += count
+    user_stats["task_count"] += count
+
+    # Only overdue if not completed
+    if completed:
+        stats["completed"] += count
+        user_stats["completed"] += count
+        return
+
+    due_users = stats["uncompleted"].setdefault(due_ordinal, {})
+    due_users[username] = due_users.get(username, 0) + count
+    if due_users[username] == 0:
+        del due_users[username]
+        if not due_users:
+            del stats["uncompleted"][due_ordinal]
+
+    if due_ordinal < stats["as_of"]:
+        stats["overdue"] += count
+        user_stats["overdue"] += count
+
+
+def stats_set_date(stats: dict, curr_date: date):
+    """
+    Move the overdue counts in the task stats to a new date.
+
+    Only the uncompleted tasks due between the old and new dates are
+    looked at, grouped by due date.
+
+    Parameters
+    ----------
+    stats : dict
+        The task stats, see new_task_stats.
+    curr_date : date
+        The date overdue counts are worked out for.
+    """
+    curr_ordinal = curr_date.toordinal()
+    if curr_ordinal == stats["as_of"]:
+        return
+
+    # Tasks due in between become overdue going forward, or stop being
+    # overdue going back
+    if curr_ordinal > stats["as_of"]:
+        low, high, count = stats["as_of"], curr_ordinal, 1
+    else:
+        low, high, count = curr_ordinal, stats["as_of"], -1
+
+    for due_ordinal, due_users in stats["uncompleted"].items():
+        if low <= due_ordinal < high:
+            for username, user_count in due_users.items():
+                stats["overdue"] += count * user_count
+                stats["users"][username]["overdue"] += count * user_count
+    stats["as_of"] = curr_ordinal
+
+
+def stats_counts(
+    stats: dict, usernames: Iterable[str], curr_date: date
+) -> tuple[int, int, int, dict]:
+    """
+    Get the report counts from the task stats.
+
+    Gives the same result as count_tasks, but takes time proportional to
+    the number of users rather than the number of tasks.
+
+    Parameters
+    ----------
+    stats : dict
+        The task stats, see new_task_stats.
+    usernames : Iterable[str]
+        Usernames to include in the per user counts.
+    curr_date : date
+        Tasks due before this date are overdue.
+
+    Returns
+    -------
+    tuple[int, int, int, dict]
+        See count_tasks.
+    """
+    stats_set_date(stats=stats, curr_date=curr_date)
+
+    user_dict = {}
+    for user in usernames:
+        user_dict[user] = dict(
+            stats["users"].get(
+                user, {"task_count": 0, "completed": 0, "overdue": 0}
+            )
+        )
+    # Tasks may still be assigned to users missing from the user list
+    for user, user_stats in stats["users"].items():
+        if user not in user_dict and user_stats["task_count"]:
+            user_dict[user] = dict(user_stats)
+
+    return stats["total"], stats["completed"], stats["overdue"], user_dict
+
+
+def stats_snapshot(stats: dict, curr_date: date) -> dict:
+    """
+    Copy the report totals out of the task stats, so the report counts can
+    be taken from them later (e.g. on another thread, see ReportWorker)
+    while the task stats keep changing.
+
+    Parameters
+    ----------
+    stats : dict
+        The task stats, see new_task_stats.
+    curr_date : date
+        The date overdue counts are worked out for.
+
+    Returns
+    -------
+    dict
+        Task stats with the totals of each user as at curr_date and no
+        uncompleted tasks by due date, to pass to stats_counts with the
+        same date.
+    """
+    stats_set_date(stats=stats, curr_date=curr_date)
+    return {
+        "total": stats["total"],
+        "completed": stats["completed"],
+        "overdue": stats["overdue"],
+        "users": {
+            user: dict(user_stats)
+            for user, user_stats in stats["users"].items()
+        },
+        "uncompleted": {},
+        "as_of": stats["as_of"],
+    }
+
+
+# Function that is called when a user selects ‘a’ to add a new task.
+def add_task(
+    task_list: list[Task],
+    username_password: dict,
+    task_index: dict | None = None,
+):
+    """
+    Allow a user to add a new task to task.txt file.
+
+    Prompt a user for the following:
+        - A username of the person whom the task is assigned to.
+        - A title of a task.
+        - A description of the task
+        - The due date of the task in set format: YYYY-MM-DD
+
+    Parameters
+    ----------
+    task_list : list[Task]
+        List of Task objects (or a TaskStore) with fields:
+        - username (str)
+        - title (str)
+        - description (str)
+        - due_date (date)
+        - assigned_date (date)
+        - completed (bool)
+    username_password : dict
+        A dictionary where the keys are usernames and the values are passwords.
+    task_index : dict | None, optional
+        Task indexes to update, see build_task_index, by default None.
+    """
+    # Get user inputs
+    task_username = CONSOLE.input("\nName of person assigned to task: ")
+    if task_username not in username_password.keys():
+        CONSOLE.print("\nUser does not exist. Please enter a valid username")
+        return
+    task_title = CONSOLE.input("\nTitle of Task: ")
+    task_description = CONSOLE.input("\nDescription of Task: ")
+    due_date_time = user_input_date("\nDue date of task (YYYY-MM-DD): ")
+
+    # Then get the current date.
+    curr_date = date.today()
+
+    # Add the data to the file task.txt
+    # Include completed: False
+    new_task = Task(
+        username=task_username,
+        title=task_title,
+        description=task_description,
+        due_date=due_date_time,
+        assigned_date=curr_date,
+        completed=False,
+    )
+    append_task(task_list=task_list, task=new_task, task_index=task_index)
+    CONSOLE.print("\nTask successfully added.")
+
+
+# user input function: date
+def user_input_date(
+    msg: str = "\nPlease enter a date (YYYY-MM-DD): ",
+) -> date:
+    """
+    Prompt user for a date in the specified format.
+
+    Re-prompt if date is entered in an invalid format.
+
+    Parameters
+    ----------
+    msg : str, optional
+        Prompt message, by default "Please enter a date:"
+
+    Returns
+    -------
+    date
+        A date object representing the entered date.
+    """
+    while True:
+        try:
+            # Get input
+            user_date = CONSOLE.input(msg)
+            # Cast to date
+            user_date = parse_date(user_date)
+            return user_date
+        # On error loop
+        except ValueError:
+            CONSOLE.print(
+                "\nInvalid date format. Please use the format specified."
+            )
+
+
+# user input function: optional date
+def user_input_optional_date(
+    msg: str = "\nPlease enter a date (YYYY-MM-DD): ",
+) -> date | None:
+    """
+    Prompt user for a date in the specified format, or nothing.
+
+    Re-prompt if date is entered in an invalid format.
+
+    Parameters
+    ----------
+    msg : str, optional
+        Prompt message, by default "Please enter a date:"
+
+    Returns
+    -------
+    date | None
+        The entered date, or None if left blank.
+    """
+    while True:
+        user_date = CONSOLE.input(msg)
+        if not user_date:
+            return None
+        try:
+            return parse_date(user_date)
+        except ValueError:
+            CONSOLE.print(
+                "\nInvalid date format. Please use the format specified."
+            )
+
+
+# user input function: int
+def user_input_int(msg: str = "\nPlease enter an int:") -> int:
+    """
+    Prompt user for an integer input.
+
+    Re-prompt if the input is not a valid integer.
+
+    Parameters
+    ----------
+    msg : str, optional
+        Prompt message, by default "Please enter an integer:"
+
+    Returns
+    -------
+    int
+    """
+    while True:
+        try:
+            # Get input
+            user_int = CONSOLE.input(msg)
+            # Cast to int
+            user_int = int(user_int)
+            return user_int
+        # On error loop
+        except ValueError:
+            CONSOLE.print("\nInvalid input, please input an integer.")
+
+
+# User input function: y/n
+def user_input_yes_no(msg: str = "\nPlease enter y/n: ") -> str:
+    """
+    Prompt user for a y/n input.
+
+    Re-prompt if value is not 'y' or 'n'.
+
+    Parameters
+    ----------
+    msg : str, optional
+        Prompt message, by default "Please enter y/n: "
+
+    Returns
+    -------
+    str
+        The entered response, 'y' for yes or 'n' for no.
+    """
+    while True:
+        # Get input
+        user_yn = CONSOLE.input(msg).lower()
+        # Check y/n else loop
+        if user_yn in ["y", "n"]:
+            return user_yn
+        else:
+            CONSOLE.print("\nInvalid input, please enter 'y' or 'n'.")
+
+
+# Allow the user to select either a speciﬁc task (by entering a number) or
+# input ‘-1’ to return to the main menu
+def user_task_num_select(
+    task_list: list[Task], curr_user: str, task_index: dict | None = None
+) -> int:
+    """
+    Prompt user for a task number.
+
+    Task must belong to user.
+
+    Parameters
+    ----------
+    task_list : list[Task]
+        List of Task objects (or a TaskStore) with fields:
+        - username (str)
+        - title (str)
+        - description (str)
+        - due_date (date)
+        - assigned_date (date)
+        - completed (bool)
+    curr_user : str
+        The username of the current user.
+    task_index : dict | None, optional
+        Task indexes, see build_task_index. Built from the task list if
+        not given, by default None.
+
+    Returns
+    -------
+    int
+        The selected task number, or -1 to return to the menu.
+    """
+    if task_index is None:
+        task_index = build_task_index(task_list=task_list, search=False)
+    user_task_nums = get_user_task_nums(
+        task_index=task_index, username=curr_user
+    )
+
+    while True:
+        # Get an int from user
+        user_int = user_input_int(
+            msg=(
+                "Select a task number to update,"
+                " or input -1 to return to menu: "
+            )
+        )
 
+        # If -1 then exit
+        if user_int == -1:
+            return -1
+        # if less than 1 then not a valid list index number
+        elif user_int < -1:
+            CONSOLE.print("\nThis is not a valid task number.")
+            continue
+        # if greater/equal-to the list len then nt valid index number
+        elif user_int >= len(task_list):
+            CONSOLE.print("\nThis is not a valid task number.")
+            continue
 
-# ====Get Task Section====
-def get_task_data() -> list[str]:
+        # check this task is assigned to user
+        user_pos = bisect_left(user_task_nums, user_int)
+        if user_pos < len(user_task_nums) and (
+            user_task_nums[user_pos] == user_int
+        ):
+            return user_int
+
+        # If not assigned to user, give error message and then loop
+        CONSOLE.print("\nThis task is not assigned to you.")
+
+
+# Display task function used in va and vm
+def format_display_task(task: Task, task_num: int) -> str:
     """
-    Create list of tasks from tasks.txt file.
+    Format the information for a task as it is shown to the user.
 
-    - Create blank tasks.txt file if doesn't exist.
-    - Read the tasks.txt file.
-    - Creates a list of tasks in tasks.txt file, each line in the file
-      is an element in the list.
-    - Blank lines are removed from the list.
+    Parameters
+    ----------
+    task : Task
+        The task to format.
+    task_num : int
+        Task number.
 
     Returns
     -------
-    list[str]
-        Contains data of each users tasks.
+    str
+        The task details, one field per line.
     """
-    # Create tasks.txt if it doesn't exist
-    if not os.path.exists("tasks.txt"):
-        with open("tasks.txt", "w"):
-            pass
+    return (
+        f"Task Number: \t {task_num}\n"
+        f"Task: \t\t {task.title}\n"
+        f"Assigned to: \t {task.username}\n"
+        f"Date Assigned: \t {format_date(task.assigned_date)}\n"
+        f"Due Date: \t {format_date(task.due_date)}\n"
+        f"Complete: \t {'Yes' if task.completed else 'No'}\n"
+        f"Task Description: \n\t{task.description}\n"
+    )
+
 
-    with open("tasks.txt", "r") as task_file:
-        task_data = task_file.read().split("\n")
+def display_task(task: Task, task_num: int):
+    """
+    Display the information for a task.
 
-    # Gets rid of the blank line in the task
-    task_data = [t for t in task_data if t != ""]
-    return task_data
+    Parameters
+    ----------
+    task : Task
+        The task to display.
+    task_num : int
+        Task number.
+    """
+    CONSOLE.print(format_display_task(task=task, task_num=task_num))
 
 
-def get_task_list(task_data: list[str]) -> list[dict]:
+def render_task_page(
+    task_list: list[Task],
+    task_nums: Iterable[int],
+    task_index: dict | None = None,
+) -> str:
     """
-    Create a list of dictionaries for tasks.
+    Format a page of tasks into a single string ready to be written.
 
-    Each element in the list will be a dictionary containing all the
-    information for a task.
+    Display strings are kept in the task index so a page shown again is
+    not formatted again, up to DISPLAY_CACHE_SIZE of the most recently
+    shown. update_task drops a task's string when it changes.
 
     Parameters
     ----------
-    task_data : list[str]
-        A list of strings representing tasks.
-        Fields within the task are separated by semicolons.
+    task_list : list[Task]
+        List of Task objects, or a TaskStore.
+    task_nums : Iterable[int]
+        Numbers of the tasks on the page.
+    task_index : dict | None, optional
+        Task indexes holding the cached display strings, see
+        build_task_index. Nothing is cached if not given, by default None.
 
     Returns
     -------
-    list[dict]
-        A list of dictionaries representing tasks.
+    str
+        The tasks as display_task shows them.
     """
-    task_list = []
-    for t_str in task_data:
-        curr_t = {}
-
-        # Split by semicolon and manually add each component
-        task_components = t_str.split(";")
-        curr_t["username"] = task_components[0]
-        curr_t["title"] = task_components[1]
-        curr_t["description"] = task_components[2]
-        curr_t["due_date"] = datetime.strptime(
-            task_components[3], DATE_STRING_FORMAT
-        )
-        curr_t["assigned_date"] = datetime.strptime(
-            task_components[4], DATE_STRING_FORMAT
-        )
-        curr_t["completed"] = True if task_components[5] == "Yes" else False
+    display_cache = (
+        OrderedDict() if task_index is None else task_index["display"]
+    )
+    page = []
+    for task_num in task_nums:
+        display_str = display_cache.get(task_num)
+        if display_str is None:
+            display_str = format_display_task(
+                task=task_list[task_num], task_num=task_num
+            )
+            display_cache[task_num] = display_str
+            # Forget the least recently shown task once full
+            if len(display_cache) > DISPLAY_CACHE_SIZE:
+                display_cache.popitem(last=False)
+        else:
+            display_cache.move_to_end(task_num)
+        page.append(display_str)
+        page.append("\n")
+    return "".join(page)
 
-        task_list.append(curr_t)
-    return task_list
 
+def write_page(text: str):
+    """
+    Write a page of output to the console in one go.
 
-# ====Get User Section====
-def get_user_data() -> list[str]:
+    Parameters
+    ----------
+    text : str
+        The text to write.
     """
-    Reads usernames and password from the user.txt file.
+    CONSOLE.write(text)
 
-     - If user.txt file doesn't exist, a default admin account is written to
-       the file: "admin;password".
-     - The function then reads the contents of the file, and splits them into
-       user data, to return a list.
 
-    Returns
-    -------
-    list[str]
-        A list containing user data. Each element of the list is a string
-        representing a user with the format: username;password.
+# Function that is called when users type ‘va’ to view all the tasks listed
+# in ‘tasks.txt’.
+def view_all(
+    task_list: list[Task],
+    task_index: dict | None = None,
+    page_size: int = VIEW_PAGE_SIZE,
+):
     """
-    # If no user.txt file, write one with a default account
-    if not os.path.exists("user.txt"):
-        with open("user.txt", "w") as default_file:
-            default_file.write("admin;password")
+    Print formatted task list to the console, one page at a time.
 
-    # Read in user_data
-    with open("user.txt", "r") as user_file:
-        user_data = user_file.read().split("\n")
-    return user_data
+    Only the page being shown is formatted. Between pages the user can go
+    to the next or previous page, jump to a page or return to the menu.
+    With a page size of 0 every task is written, VIEW_BATCH_SIZE tasks at
+    a time, e.g. when piping the output to a file.
 
+    Parameters
+    ----------
+    task_list : list[Task]
+        List of Task objects (or a TaskStore) with fields:
+        - username (str)
+        - title (str)
+        - description (str)
+        - due_date (date)
+        - assigned_date (date)
+        - completed (bool)
+    task_index : dict | None, optional
+        Task indexes holding the cached display strings, see
+        build_task_index, by default None.
+    page_size : int, optional
+        Number of tasks on each page, by default VIEW_PAGE_SIZE.
+    """
+    if len(task_list) == 0:
+        CONSOLE.print("\nThere are no tasks.")
+        return
+    view_pages(
+        task_list=task_list,
+        task_nums=range(len(task_list)),
+        task_index=task_index,
+        page_size=page_size,
+    )
 
-# Convert user_data to a dictionary
-def get_username_password(user_data: list[str]) -> dict:
+
+# Functions that are called when users type ‘vo’ or ‘vu’ to view the
+# uncompleted tasks that are overdue or due soon, earliest due first.
+def view_overdue(
+    task_list: list[Task],
+    task_index: dict | None = None,
+    page_size: int = VIEW_PAGE_SIZE,
+):
     """
-    Create a dictionary of username-password pairs from a list of user data.
+    Print the uncompleted tasks due before today, a page at a time.
 
     Parameters
     ----------
-    user_data : list[str]
-        A list containing user data. Each element of the list is a string
-        representing a user with the format: "username;password".
+    task_list : list[Task]
+        List of Task objects, or a TaskStore.
+    task_index : dict | None, optional
+        Task indexes, see build_task_index. Built from the task list if
+        not given, by default None.
+    page_size : int, optional
+        Number of tasks on each page, by default VIEW_PAGE_SIZE.
+    """
+    if task_index is None:
+        task_index = build_task_index(task_list=task_list, search=False)
 
-    Returns
-    -------
-    dict
-        A dictionary where the keys are usernames and the values are passwords.
+    task_nums = get_due_task_nums(
+        task_index=task_index, due_to=date.today() - timedelta(days=1)
+    )
+    if not task_nums:
+        CONSOLE.print("\nThere are no overdue tasks.")
+        return
+    CONSOLE.print(f"\n{len(task_nums)} overdue tasks, earliest due first:\n")
+    view_pages(
+        task_list=task_list,
+        task_nums=task_nums,
+        task_index=task_index,
+        page_size=page_size,
+    )
+
+
+def view_upcoming(
+    task_list: list[Task],
+    task_index: dict | None = None,
+    page_size: int = VIEW_PAGE_SIZE,
+    days: int = UPCOMING_DAYS,
+):
     """
-    username_password = {}
-    for user in user_data:
-        username, password = user.split(";")
-        # Set key to username, set value to password
-        username_password[username] = password
-    return username_password
+    Print the uncompleted tasks due from today to a number of days ahead,
+    a page at a time.
+
+    Parameters
+    ----------
+    task_list : list[Task]
+        List of Task objects, or a TaskStore.
+    task_index : dict | None, optional
+        Task indexes, see build_task_index. Built from the task list if
+        not given, by default None.
+    page_size : int, optional
+        Number of tasks on each page, by default VIEW_PAGE_SIZE.
+    days : int, optional
+        Number of days after today to include, by default UPCOMING_DAYS.
+    """
+    if task_index is None:
+        task_index = build_task_index(task_list=task_list, search=False)
+
+    today = date.today()
+    task_nums = get_due_task_nums(
+        task_index=task_index,
+        due_from=today,
+        due_to=today + timedelta(days=days),
+    )
+    if not task_nums:
+        CONSOLE.print(f"\nNo tasks are due in the next {days} days.")
+        return
+    CONSOLE.print(
+        f"\n{len(task_nums)} tasks due in the next {days} days, earliest"
+        " due first:\n"
+    )
+    view_pages(
+        task_list=task_list,
+        task_nums=task_nums,
+        task_index=task_index,
+        page_size=page_size,
+    )
 
 
-# ====Login Section====
-# User input function: username/password
-def get_user_login(username_password: dict) -> str:
+# Function that is called when users type ‘s’ to search the task titles and
+# descriptions.
+def search_tasks(
+    task_list: list[Task],
+    curr_user: str,
+    task_index: dict | None = None,
+    page_size: int = VIEW_PAGE_SIZE,
+):
     """
-    Prompt the user for login details and validate against existing data
-    in file.
+    Prompt for words to search for and print the matching tasks, a page at
+    a time.
+
+    Tasks match when their title or description has a word starting with
+    each word searched for, see search_task_nums. The search can be kept
+    to the user's own tasks.
 
     Parameters
     ----------
-    username_password : dict
-        A dictionary where the keys are usernames and the values are passwords.
+    task_list : list[Task]
+        List of Task objects, or a TaskStore.
+    curr_user : str
+        The username of the current user.
+    task_index : dict | None, optional
+        Task indexes, see build_task_index. Built from the task list if
+        not given, by default None.
+    page_size : int, optional
+        Number of tasks on each page, by default VIEW_PAGE_SIZE.
+    """
+    if task_index is None:
+        task_index = build_task_index(task_list=task_list)
 
-    Returns
-    -------
-    str
-        A str containing the username of each successfully logged-in user.
+    query = CONSOLE.input("\nSearch task titles and descriptions for: ")
+    own_tasks = user_input_yes_no(msg="\nOnly search your tasks? (y/n): ")
+    task_nums = search_task_nums(
+        task_list=task_list,
+        task_index=task_index,
+        query=query,
+        username=curr_user if own_tasks == "y" else None,
+    )
+    if not task_nums:
+        CONSOLE.print("\nNo tasks match your search.")
+        return
+    CONSOLE.print(f"\n{len(task_nums)} tasks match your search:\n")
+    view_pages(
+        task_list=task_list,
+        task_nums=task_nums,
+        task_index=task_index,
+        page_size=page_size,
+    )
+
+
+def view_pages(
+    task_list: list[Task],
+    task_nums: list[int] | range,
+    task_index: dict | None = None,
+    page_size: int = VIEW_PAGE_SIZE,
+):
     """
-    # Loop until successful
+    Print tasks a page at a time, for view_all and the other task views.
+
+    Parameters
+    ----------
+    task_list : list[Task]
+        List of Task objects, or a TaskStore.
+    task_nums : list[int] | range
+        Numbers of the tasks to show, in the order to show them.
+    task_index : dict | None, optional
+        Task indexes holding the cached display strings, see
+        build_task_index, by default None.
+    page_size : int, optional
+        Number of tasks on each page, 0 for no pages, by default
+        VIEW_PAGE_SIZE.
+    """
+    task_count = len(task_nums)
+
+    # No pages, write every task in batches without caching them
+    if page_size <= 0:
+        for start in range(0, task_count, VIEW_BATCH_SIZE):
+            stop = min(start + VIEW_BATCH_SIZE, task_count)
+            write_page(
+                text=render_task_page(
+                    task_list=task_list, task_nums=task_nums[start:stop]
+                )
+            )
+        return
+
+    # Round up so a part page at the end still counts
+    page_count = -(-task_count // page_size)
+    page_num = 0
     while True:
-        # Get user username and password
-        print("LOGIN")
-        curr_user = input("Username: ")
-        curr_pass = input("Password: ")
-        # Check user exists
-        if curr_user not in username_password.keys():
-            print("\nUser does not exist")
-            continue
-        # Check password if correct
-        elif username_password[curr_user] != curr_pass:
-            print("\nWrong password")
-            continue
+        start = page_num * page_size
+        stop = min(start + page_size, task_count)
+        write_page(
+            text=render_task_page(
+                task_list=task_list,
+                task_nums=task_nums[start:stop],
+                task_index=task_index,
+            )
+        )
+
+        # Nothing more to show
+        if page_count == 1:
+            return
+
+        choice = CONSOLE.input(
+            f"Page {page_num + 1} of {page_count}"
+            f" (tasks {start} to {stop - 1} of {task_count}).\n"
+            "n - next, p - previous, j - jump to page, q - back to menu: "
+        ).lower()
+        CONSOLE.print()
+        if choice == "n":
+            # Past the last page goes back to the menu
+            if page_num == page_count - 1:
+                return
+            page_num += 1
+        elif choice == "p":
+            page_num = max(page_num - 1, 0)
+        elif choice == "j":
+            jump_page = user_input_int(
+                msg=f"Page number (1 to {page_count}): "
+            )
+            CONSOLE.print()
+            if 1 <= jump_page <= page_count:
+                page_num = jump_page - 1
+            else:
+                CONSOLE.print("Invalid page number. Please Try again\n")
+        elif choice == "q":
+            return
         else:
-            # Success - return username
-            print("\nLogin Successful!")
-            return curr_user
+            CONSOLE.print("Invalid choice. Please Try again\n")
 
 
-# ====Main Menu Functions Section====
-# Function that is called when the user selects ‘r’ to register a user.
-def reg_user(username_password: dict):
+# Function that is called when users type ‘vm’ to view all the tasks that have
+# been assigned to them. Allows for update of user tasks.
+def view_mine(
+    task_list: list[Task],
+    curr_user: str,
+    username_password: dict,
+    task_index: dict | None = None,
+):
     """
-    Register a new user by adding their login details to the existing
-    user data.
+    Print formatted task list to the console for tasks belonging to the user.
 
     Parameters
     ----------
+    task_list : list[Task]
+        List of Task objects (or a TaskStore) with fields:
+        - username (str)
+        - title (str)
+        - description (str)
+        - due_date (date)
+        - assigned_date (date)
+        - completed (bool)
+    curr_user : str
+        The username of the current user.
     username_password : dict
-        A dictionary where the keys are usernames and the values are passwords.
+        A dictionary containing username as key and password as values
+    task_index : dict | None, optional
+        Task indexes, see build_task_index. Built from the task list if
+        not given, by default None.
     """
-    new_username = input("New Username: ")
+    if task_index is None:
+        task_index = build_task_index(task_list=task_list, search=False)
 
-    # Check if the username already exists
-    if new_username in username_password:
-        print("\nUsername already exists. Please choose a different username.")
+    # Look up the tasks that belong to user
+    user_task_nums = get_user_task_nums(
+        task_index=task_index, username=curr_user
+    )
+
+    # If no tasks then exit
+    if not user_task_nums:
+        CONSOLE.print("\nYou have no tasks assigned to you.")
         return
 
-    # Get password
-    new_password = input("New Password: ")
-    confirm_password = input("Confirm Password: ")
+    # List all of the task that belong to user
+    write_page(
+        text=render_task_page(
+            task_list=task_list,
+            task_nums=user_task_nums,
+            task_index=task_index,
+        )
+    )
 
-    # Confirm match
-    if new_password == confirm_password:
-        print("\nNew user added")
-        username_password[new_username] = new_password
+    # Get user task number (if they want to edit)
+    user_task_num = user_task_num_select(
+        task_list=task_list, curr_user=curr_user, task_index=task_index
+    )
+
+    # Exit if user selected -1
+    if user_task_num == -1:
+        return
+
+    # Get user task to update
+    user_task = task_list[user_task_num]
+
+    # If complete then cannot change, go to main menu
+    if user_task.completed:
+        CONSOLE.print("\nThis task is complete and cannot be edited.")
+        return
+
+    # Check if want mark complete
+    mark_task_complete = user_input_yes_no(
+        msg="\nWould you like to mark the task as complete? (y/n): "
+    )
+
+    # If so update task, write out file and go to main menu
+    if mark_task_complete == "y":
+        update_task(
+            task_list=task_list,
+            task_num=user_task_num,
+            field="completed",
+            value=True,
+            task_index=task_index,
+        )
+        CONSOLE.print("\nTask successfully marked as complete.")
+        return
+
+    # Changes to the username and due date are saved together at the end
+    changes = []
+
+    # Check if they want to edit the username
+    update_username = user_input_yes_no(
+        msg="\nWould you like update the username? (y/n): "
+    )
+
+    if update_username == "y":
+        # Get new username
+        new_username = CONSOLE.input("\nProvide updated username: ")
+        # Check username exists, else exit to main menu
+        if new_username not in username_password:
+            CONSOLE.print("\nUsername not recognised. Exiting.")
+            return
+
+        # Update task with new username
+        changes.append(
+            update_task(
+                task_list=task_list,
+                task_num=user_task_num,
+                field="username",
+                value=new_username,
+                task_index=task_index,
+                commit=False,
+            )
+        )
+        CONSOLE.print("\nTask username successfully updated.")
+
+    # Check if they want to edit the due date
+    update_due_date = user_input_yes_no(
+        msg="\nWould you like update the due date? (y/n): "
+    )
+
+    if update_due_date == "y":
+        # Get new due date
+        new_due_date = user_input_date(
+            "\nProvide updated due date (YYYY-MM-DD): "
+        )
+        # Update task
+        changes.append(
+            update_task(
+                task_list=task_list,
+                task_num=user_task_num,
+                field="due_date",
+                value=new_due_date,
+                task_index=task_index,
+                commit=False,
+            )
+        )
+        CONSOLE.print("\nTask due date successfully updated.")
+
+    # Write both changes out at once
+    if changes:
+        commit_task_changes(task_list=task_list, changes=changes)
+
+
+def select_task_nums(
+    task_list: list[Task],
+    task_index: dict,
+    username: str | None = None,
+    due_from: date | None = None,
+    due_to: date | None = None,
+    completed: bool | None = None,
+) -> list[int]:
+    """
+    Find the tasks matching a filter. Filters left as None match any task.
+
+    Parameters
+    ----------
+    task_list : list[Task]
+        List of Task objects, or a TaskStore.
+    task_index : dict
+        Task indexes, see build_task_index.
+    username : str | None, optional
+        Only tasks assigned to this user, by default None.
+    due_from : date | None, optional
+        Only tasks due on or after this date, by default None.
+    due_to : date | None, optional
+        Only tasks due on or before this date, by default None.
+    completed : bool | None, optional
+        Only completed (True) or uncompleted (False) tasks, by default
+        None.
+
+    Returns
+    -------
+    list[int]
+        The matching task numbers in ascending order.
+    """
+    # Uncompleted tasks by due date are already indexed
+    if completed is False and username is None:
+        return sorted(
+            get_due_task_nums(
+                task_index=task_index, due_from=due_from, due_to=due_to
+            )
+        )
 
-        # Format output string
-        user_data = []
-        for key in username_password:
-            user_data.append(f"{key};{username_password[key]}")
-
-        # Write out to user file
-        # The code is opening a file named "user.txt" in write mode
-        # and then writing the contents of the `user_data` list to the file,
-        # with each element of the list on a new line.
-        with open("user.txt", "w") as out_file:
-            out_file.write("\n".join(user_data))
+    if username is not None:
+        task_nums = get_user_task_nums(
+            task_index=task_index, username=username
+        )
     else:
-        print("Passwords do not match")
+        task_nums = range(len(task_list))
 
+    # Read a TaskStore's columns directly rather than building each Task
+    if isinstance(task_list, TaskStore):
+        due_ordinals = task_list.due_dates.__getitem__
+        is_completed = task_list.is_completed
+    else:
 
-# Function for taking dict turning to list and writing to file
-def write_task_list(task_list: list[dict]):
+        def due_ordinals(task_num: int) -> int:
+            return task_list[task_num].due_date.toordinal()
+
+        def is_completed(task_num: int) -> bool:
+            return task_list[task_num].completed
+
+    from_ordinal = due_from.toordinal() if due_from is not None else None
+    to_ordinal = due_to.toordinal() if due_to is not None else None
+    return [
+        task_num
+        for task_num in task_nums
+        if (from_ordinal is None or due_ordinals(task_num) >= from_ordinal)
+        and (to_ordinal is None or due_ordinals(task_num) <= to_ordinal)
+        and (completed is None or is_completed(task_num) == completed)
+    ]
+
+
+def bulk_update_tasks(
+    task_list: list[Task],
+    task_nums: Iterable[int],
+    field: str,
+    value,
+    task_index: dict | None = None,
+    dry_run: bool = False,
+) -> int:
     """
-    Write a list of tasks to 'tasks.txt'.
+    Set one field of many tasks, saving every change in a single commit.
+
+    Tasks that already have the value are left alone.
 
     Parameters
     ----------
-    task_list : list[dict]
-        List of dictionaries representing tasks with keys:
-        - username (str)
-        - title (str)
-        - description (str)
-        - due_date (datetime)
-        - assigned_date (datetime)
-        - completed (bool)
-    """
-    # Get tasks into list
-    task_list_to_write = []
-    for t in task_list:
-        str_attrs = [
-            t["username"],
-            t["title"],
-            t["description"],
-            t["due_date"].strftime(DATE_STRING_FORMAT),
-            t["assigned_date"].strftime(DATE_STRING_FORMAT),
-            "Yes" if t["completed"] else "No",
-        ]
-        task_list_to_write.append(";".join(str_attrs))
+    task_list : list[Task]
+        List of Task objects, or a TaskStore.
+    task_nums : Iterable[int]
+        The tasks to change, e.g. from select_task_nums.
+    field : str
+        Name of the field to change: "username", "due_date" or
+        "completed".
+    value
+        New value of the field.
+    task_index : dict | None, optional
+        Task indexes to update, see build_task_index, by default None.
+    dry_run : bool, optional
+        Only count the tasks that would change, by default False.
 
-    # Open file
-    with open("tasks.txt", "w") as task_file:
-        # Write out tasks
-        task_file.write("\n".join(task_list_to_write))
+    Returns
+    -------
+    int
+        Number of tasks changed (or that would be with dry_run).
+    """
+    if field not in BULK_FIELDS:
+        raise ValueError(f"Tasks can't be updated in bulk by {field}")
+    to_change = [
+        task_num
+        for task_num in task_nums
+        if getattr(task_list[task_num], field) != value
+    ]
+    if dry_run or not to_change:
+        return len(to_change)
+
+    changes = [
+        update_task(
+            task_list=task_list,
+            task_num=task_num,
+            field=field,
+            value=value,
+            task_index=task_index,
+            commit=False,
+        )
+        for task_num in to_change
+    ]
+    commit_task_changes(task_list=task_list, changes=changes)
+    return len(changes)
 
 
-# Function that is called when a user selects ‘a’ to add a new task.
-def add_task(task_list: list[str], username_password: dict):
+# Function that is called when admin selects 'bu' to update tasks in bulk
+def bulk_update(
+    task_list: list[Task],
+    username_password: dict,
+    task_index: dict | None = None,
+):
     """
-    Allow a user to add a new task to task.txt file.
+    Reassign, complete, reopen or reschedule every task matching a filter.
 
-    Prompt a user for the following:
-        - A username of the person whom the task is assigned to.
-        - A title of a task.
-        - A description of the task
-        - The due date of the task in set format: YYYY-MM-DD
+    Prompt the admin for a filter (user, due date range and completion,
+    each optional), then for the change. The number of tasks that would
+    change is shown before anything is saved, and all the changes are
+    saved together once confirmed.
 
     Parameters
     ----------
-    task_list : list[str]
-        List of dictionaries representing tasks with keys:
+    task_list : list[Task]
+        List of Task objects (or a TaskStore) with fields:
         - username (str)
         - title (str)
         - description (str)
-        - due_date (datetime)
-        - assigned_date (datetime)
+        - due_date (date)
+        - assigned_date (date)
         - completed (bool)
     username_password : dict
         A dictionary where the keys are usernames and the values are passwords.
+    task_index : dict | None, optional
+        Task indexes, see build_task_index. Built from the task list if
+        not given, by default None.
     """
-    # Get user inputs
-    task_username = input("\nName of person assigned to task: ")
-    if task_username not in username_password.keys():
-        print("\nUser does not exist. Please enter a valid username")
+    if task_index is None:
+        task_index = build_task_index(task_list=task_list, search=False)
+
+    # Get the filter, blank answers match any task
+    CONSOLE.print("\nChoose the tasks to update. Leave blank to match any.")
+    username = CONSOLE.input("\nAssigned to username: ") or None
+    if username is not None and username not in username_password:
+        CONSOLE.print("\nUser does not exist. Please enter a valid username")
+        return
+    due_from = user_input_optional_date("\nDue on or after (YYYY-MM-DD): ")
+    due_to = user_input_optional_date("\nDue on or before (YYYY-MM-DD): ")
+    completed = {"y": True, "n": False}.get(
+        CONSOLE.input("\nCompleted? (y/n): ").lower()
+    )
+    task_nums = select_task_nums(
+        task_list=task_list,
+        task_index=task_index,
+        username=username,
+        due_from=due_from,
+        due_to=due_to,
+        completed=completed,
+    )
+    CONSOLE.print(f"\n{len(task_nums)} tasks match.")
+    if not task_nums:
         return
-    task_title = input("\nTitle of Task: ")
-    task_description = input("\nDescription of Task: ")
-    due_date_time = user_input_date("\nDue date of task (YYYY-MM-DD): ")
 
-    # Then get the current date.
-    curr_date = date.today()
+    # Get the change
+    operation = CONSOLE.input(
+        "\nra - Reassign to another user\n"
+        "c - Mark complete\n"
+        "o - Mark not complete\n"
+        "rs - Reschedule to a new due date\n"
+        ": "
+    ).lower()
+    if operation == "ra":
+        field = "username"
+        value = CONSOLE.input("\nReassign to username: ")
+        if value not in username_password:
+            CONSOLE.print("\nUsername not recognised. Exiting.")
+            return
+    elif operation == "c":
+        field, value = "completed", True
+    elif operation == "o":
+        field, value = "completed", False
+    elif operation == "rs":
+        field = "due_date"
+        value = user_input_date("\nNew due date (YYYY-MM-DD): ")
+    else:
+        CONSOLE.print("\nInvalid choice. Exiting.")
+        return
 
-    # Add the data to the file task.txt
-    # Include completed: False
-    new_task = {
-        "username": task_username,
-        "title": task_title,
-        "description": task_description,
-        "due_date": due_date_time,
-        "assigned_date": curr_date,
-        "completed": False,
-    }
-    task_list.append(new_task)
-    write_task_list(task_list=task_list)
-    print("\nTask successfully added.")
+    # Dry run first, so the admin sees how many tasks will change
+    change_count = bulk_update_tasks(
+        task_list=task_list,
+        task_nums=task_nums,
+        field=field,
+        value=value,
+        dry_run=True,
+    )
+    if change_count == 0:
+        CONSOLE.print("\nNo tasks need changing.")
+        return
+    confirm = user_input_yes_no(
+        msg=f"\n{change_count} tasks will change. Continue? (y/n): "
+    )
+    if confirm == "y":
+        bulk_update_tasks(
+            task_list=task_list,
+            task_nums=task_nums,
+            field=field,
+            value=value,
+            task_index=task_index,
+        )
+        CONSOLE.print(f"\n{change_count} tasks successfully updated.")
 
 
-# user input function: date
-def user_input_date(
-    msg: str = "\nPlease enter a date (YYYY-MM-DD): ",
-) -> datetime:
+def count_tasks(
+    task_list: Iterable[Task],
+    usernames: Iterable[str],
+    curr_date: date,
+    backend: str = "auto",
+) -> tuple[int, int, int, dict]:
     """
-    Prompt user for a date in the specified format.
+    Count total, completed and overdue tasks overall and for each user.
 
-    Re-prompt if date is entered in an invalid format.
+    A task is only counted as overdue if it is not completed. Every user in
+    usernames gets counts, even with no tasks, and so does any user with
+    tasks who is missing from usernames (e.g. removed from user.txt). The
+    other ways of counting (stats_counts, TaskStore.count_tasks and each
+    storage's report_counts) do the same.
+
+    The "numpy" backend counts with vectorised array operations. "auto"
+    uses it for lists and TaskStores when NumPy is installed (a TaskStore's
+    buffers are counted without copying, a list is read into arrays with
+    np.fromiter), and reads anything else (e.g. a generator) in a single
+    pass with plain Python.
 
     Parameters
     ----------
-    msg : str, optional
-        Prompt message, by default "Please enter a date:"
+    task_list : Iterable[Task]
+        List (or generator) of Task objects, or a TaskStore.
+    usernames : Iterable[str]
+        Usernames to include in the per user counts.
+    curr_date : date
+        Tasks due before this date are overdue.
+    backend : str, optional
+        "auto", "numpy" or "python", by default "auto".
 
     Returns
     -------
-    datetime
-        A datetime object representing the entered date.
+    tuple[int, int, int, dict]
+        - Total number of tasks.
+        - Number of completed tasks.
+        - Number of overdue tasks.
+        - Dictionary of each user's "task_count", "completed" and
+          "overdue" counts, keyed by username.
     """
-    while True:
-        try:
-            # Get input
-            user_date = input(msg)
-            # Cast to date
-            user_date = datetime.strptime(user_date, DATE_STRING_FORMAT)
-            return user_date
-        # On error loop
-        except ValueError:
-            print("\nInvalid date format. Please use the format specified.")
+    if backend == "auto":
+        use_numpy = np is not None and isinstance(task_list, (list, TaskStore))
+        backend = "numpy" if use_numpy else "python"
+    if backend == "numpy":
+        return count_tasks_numpy(
+            task_list=task_list, usernames=usernames, curr_date=curr_date
+        )
 
+    # A TaskStore can count straight from its buffers
+    if isinstance(task_list, TaskStore):
+        return task_list.count_tasks(usernames=usernames, curr_date=curr_date)
 
-# user input function: int
-def user_input_int(msg: str = "\nPlease enter an int:") -> int:
-    """
-    Prompt user for an integer input.
+    # Set up counters for total stats
+    total_tasks = 0
+    total_completed = 0
+    total_overdue = 0
 
-    Re-prompt if the input is not a valid integer.
+    # Create dict for user stats
+    user_dict = {}
+    for user in usernames:
+        user_dict[user] = {
+            "task_count": 0,
+            "completed": 0,
+            "overdue": 0,
+        }
+    # Loop through tasks
+    for t in task_list:
 
-    Parameters
-    ----------
-    msg : str, optional
-        Prompt message, by default "Please enter an integer:"
+        # Increase total and user task count, adding users missing from
+        # the user list
+        total_tasks += 1
+        user_stats = user_dict.setdefault(
+            t.username, {"task_count": 0, "completed": 0, "overdue": 0}
+        )
+        user_stats["task_count"] += 1
 
-    Returns
-    -------
-    int
-    """
-    while True:
-        try:
-            # Get input
-            user_int = input(msg)
-            # Cast to int
-            user_int = int(user_int)
-            return user_int
-        # On error loop
-        except ValueError:
-            print("\nInvalid input, please input an integer.")
+        # Check complete/overdue
+        completed = t.completed
+        overdue = t.due_date < curr_date
 
+        # Increase counters if required (only overdue if not completed)
+        if completed:
+            total_completed += 1
+            user_stats["completed"] += 1
+        elif overdue:
+            total_overdue += 1
+            user_stats["overdue"] += 1
 
-# User input function: y/n
-def user_input_yes_no(msg: str = "\nPlease enter y/n: ") -> str:
+    return total_tasks, total_completed, total_overdue, user_dict
+
+
+def count_tasks_numpy(
+    task_list: list[Task], usernames: Iterable[str], curr_date: date
+) -> tuple[int, int, int, dict]:
     """
-    Prompt user for a y/n input.
+    Count tasks as count_tasks does, using NumPy arrays.
 
-    Re-prompt if value is not 'y' or 'n'.
+    The tasks are turned into arrays of user codes, due date ordinals and
+    a completed mask (a TaskStore's buffers are used as they are, a list
+    is read with np.fromiter), then counted per user with bincount.
 
     Parameters
     ----------
-    msg : str, optional
-        Prompt message, by default "Please enter y/n: "
+    task_list : list[Task]
+        List of Task objects, or a TaskStore.
+    usernames : Iterable[str]
+        Usernames to include in the per user counts.
+    curr_date : date
+        Tasks due before this date are overdue.
 
     Returns
     -------
-    str
-        The entered response, 'y' for yes or 'n' for no.
+    tuple[int, int, int, dict]
+        See count_tasks.
     """
-    while True:
-        # Get input
-        user_yn = input(msg).lower()
-        # Check y/n else loop
-        if user_yn in ["y", "n"]:
-            return user_yn
-        else:
-            print("\nInvalid input, please enter 'y' or 'n'.")
+    if isinstance(task_list, TaskStore):
+        task_count = len(task_list)
+        user_table = task_list.usernames
+        task_users = np.frombuffer(task_list.task_users, dtype=np.intc)
+        due_dates = np.frombuffer(task_list.due_dates, dtype=np.intc)
+        completed = np.unpackbits(
+            np.frombuffer(task_list.completed, dtype=np.uint8),
+            count=task_count,
+            bitorder="little",
+        ).astype(bool)
+    else:
+        task_count = len(task_list)
+        # Codes are given to usernames in the order they are first seen
+        user_codes = {}
+        task_users = np.fromiter(
+            (
+                user_codes.setdefault(t.username, len(user_codes))
+                for t in task_list
+            ),
+            dtype=np.intc,
+            count=task_count,
+        )
+        user_table = list(user_codes)
+        due_dates = np.fromiter(
+            (t.due_date.toordinal() for t in task_list),
+            dtype=np.intc,
+            count=task_count,
+        )
+        completed = np.fromiter(
+            (t.completed for t in task_list), dtype=bool, count=task_count
+        )
 
+    # Only overdue if not completed
+    overdue = ~completed & (due_dates < curr_date.toordinal())
+    table_size = len(user_table)
+    user_task_counts = np.bincount(task_users, minlength=table_size)
+    user_completed = np.bincount(task_users[completed], minlength=table_size)
+    user_overdue = np.bincount(task_users[overdue], minlength=table_size)
 
-# Allow the user to select either a speciﬁc task (by entering a number) or
-# input ‘-1’ to return to the main menu
-def user_task_num_select(task_list: list[dict], curr_user: str) -> int:
+    user_dict = {
+        user: {"task_count": 0, "completed": 0, "overdue": 0}
+        for user in usernames
+    }
+    for code, user in enumerate(user_table):
+        # Skip users missing from the user list who have no tasks left
+        if user not in user_dict and not user_task_counts[code]:
+            continue
+        user_dict[user] = {
+            "task_count": int(user_task_counts[code]),
+            "completed": int(user_completed[code]),
+            "overdue": int(user_overdue[code]),
+        }
+    return (
+        task_count,
+        int(np.count_nonzero(completed)),
+        int(np.count_nonzero(overdue)),
+        user_dict,
+    )
+
+
+# ====Report Cache Section====
+# The last reports generated, kept in REPORT_CACHE_FILE with a fingerprint
+# of the tasks and users they were generated from, so unchanged data isn't
+# counted, rendered or written out again, even by a new process.
+class ReportCache:
     """
-    Prompt user for a task number.
+    Cache of the rendered task and user overview reports.
 
-    Task must belong to user.
+    The reports are stored with a fingerprint of their inputs (see
+    report_fingerprint) and the signatures of the report files as last
+    written, so the files are only written again if they have changed
+    since. The cache file is only read again when it has changed.
 
     Parameters
     ----------
-    task_list : list[dict]
-        List of dictionaries representing tasks with keys:
-        - username (str)
-        - title (str)
-        - description (str)
-        - due_date (datetime)
-        - assigned_date (datetime)
-        - completed (bool)
-    curr_user : str
-        The username of the current user.
-
-    Returns
-    -------
-    int
-        The selected task number, or -1 to return to the menu.
+    file_name : str, optional
+        The cache file, by default REPORT_CACHE_FILE.
     """
-    while True:
-        # Get an int from user
-        user_int = user_input_int(
-            msg=(
-                "Select a task number to update,"
-                " or input -1 to return to menu: "
-            )
-        )
 
-        # If -1 then exit
-        if user_int == -1:
-            return -1
-        # if less than 1 then not a valid list index number
-        elif user_int < -1:
-            print("\nThis is not a valid task number.")
-            continue
-        # if greater/equal-to the list len then nt valid index number
-        elif user_int >= len(task_list):
-            print("\nThis is not a valid task number.")
-            continue
+    def __init__(self, file_name: str = REPORT_CACHE_FILE):
+        self.file_name = file_name
+        # Cache file contents, and the cache file signature they were
+        # read from
+        self.entry = None
+        self.signature = None
+        # Reports are also cached by ReportWorker's thread
+        self.lock = threading.Lock()
+
+    def load(self) -> dict | None:
+        """
+        Read the cache file if it has changed since last read.
+
+        Returns
+        -------
+        dict | None
+            The cached "fingerprint", "task_overview", "user_overview"
+            and report file "signatures", or None if there is no cache.
+        """
+        with self.lock:
+            signature = file_signature(self.file_name)
+            if signature != self.signature:
+                self.entry = None
+                if signature is not None:
+                    try:
+                        with open(self.file_name, "r") as cache_file:
+                            self.entry = json.load(cache_file)
+                    except ValueError:
+                        # Unreadable cache, generate the reports again
+                        self.entry = None
+                self.signature = signature
+            return self.entry
+
+    def get(self, fingerprint: str) -> dict | None:
+        """
+        Get the cached reports if they were generated from the same data.
+        """
+        entry = self.load()
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            return None
+        return entry
+
+    def put(self, fingerprint: str, task_overview: str, user_overview: str):
+        """
+        Save reports just written, with the signatures of their files.
+        """
+        entry = {
+            "fingerprint": fingerprint,
+            "task_overview": task_overview,
+            "user_overview": user_overview,
+            "signatures": {
+                file_name: file_signature(file_name)
+                for file_name in REPORT_FILES
+            },
+        }
+        with self.lock:
+            with atomic_open(self.file_name) as cache_file:
+                json.dump(entry, cache_file)
+            self.entry = entry
+            self.signature = file_signature(self.file_name)
+
+    @staticmethod
+    def files_current(entry: dict) -> bool:
+        """
+        Check the report files are as they were when the entry was saved.
+        """
+        return all(
+            list(file_signature(file_name) or ()) == list(signature or ())
+            for file_name, signature in entry["signatures"].items()
+        )
 
-        # check this task is assigned to user
-        selected_task = task_list[user_int]
-        if selected_task["username"] == curr_user:
-            return user_int
 
-        # If not assigned to user, give error message and then loop
-        print("\nThis task is not assigned to you.")
+REPORT_CACHE = ReportCache()
 
 
-# Display task function used in va and vm
-def display_task(task: dict, task_num: int):
+def report_fingerprint(curr_date: date) -> str:
     """
-    Display the information for a task.
+    Fingerprint the data the reports are generated from: the tasks and
+    users in the storage (see data_fingerprint) and the date, which
+    decides which tasks are overdue.
 
     Parameters
     ----------
-    task : dict
-        Dictionary representing a task.
-    task_num : int
-        Task number.
+    curr_date : date
+        The date the reports are for.
+
+    Returns
+    -------
+    str
+        A hex digest, the same in any process for the same data.
     """
-    # Prep string
-    display_str = (
-        f"Task Number: \t {task_num}\n"
-        f"Task: \t\t {task['title']}\n"
-        f"Assigned to: \t {task['username']}\n"
-        f"Date Assigned: \t {task['assigned_date'].strftime(DATE_STRING_FORMAT)}\n"
-        f"Due Date: \t {task['due_date'].strftime(DATE_STRING_FORMAT)}\n"
-        f"Complete: \t {'Yes' if task['completed'] else 'No'}\n"
-        f"Task Description: \n\t{task['description']}\n"
+    inputs = (
+        type(STORAGE).__name__,
+        STORAGE.data_fingerprint(),
+        curr_date.toordinal(),
     )
-    # Print string
-    print(display_str)
+    return hashlib.sha256(repr(inputs).encode()).hexdigest()
 
 
-# Function that is called when users type ‘va’ to view all the tasks listed
-# in ‘tasks.txt’.
-def view_all(task_list: list[dict]):
+def cached_reports(fingerprint: str) -> tuple[str, str] | None:
     """
-    Print formatted task list to the console.
+    Get the cached reports for a fingerprint, writing the report files
+    again if they have been changed or removed since they were cached.
 
     Parameters
     ----------
-    task_list : list[dict]
-        List of dictionaries representing tasks with keys:
-        - username (str)
-        - title (str)
-        - description (str)
-        - due_date (datetime)
-        - assigned_date (datetime)
-        - completed (bool)
+    fingerprint : str
+        The fingerprint of the data, see report_fingerprint.
+
+    Returns
+    -------
+    tuple[str, str] | None
+        The task and user overview reports, or None if not cached.
     """
-    for i, t in enumerate(task_list):
-        display_task(task=t, task_num=i)
+    cached = REPORT_CACHE.get(fingerprint=fingerprint)
+    if cached is None:
+        return None
+    task_overview = cached["task_overview"]
+    user_overview = cached["user_overview"]
+    if not REPORT_CACHE.files_current(entry=cached):
+        write_reports(task_overview=task_overview, user_overview=user_overview)
+        REPORT_CACHE.put(
+            fingerprint=fingerprint,
+            task_overview=task_overview,
+            user_overview=user_overview,
+        )
+    return task_overview, user_overview
 
 
-# Function that is called when users type ‘vm’ to view all the tasks that have
-# been assigned to them. Allows for update of user tasks.
-def view_mine(task_list: list[dict], curr_user: str, username_password: dict):
+# Function that is called when users type ‘gr’ or 'ds'
+# Writes task_overview.txt and user_overview.txt reports
+# Option to display the reports
+@instrumented(name="generate_reports")
+def generate_reports(
+    task_list: Iterable[Task] | None,
+    username_password: dict,
+    display: bool = False,
+    task_index: dict | None = None,
+    cache: bool = False,
+):
     """
-    Print formatted task list to the console for tasks belonging to the user.
+    Generate and optionally display the task and user overview statistics.
+
+    With task_index the counts come from its running stats, in time
+    proportional to the number of users. Otherwise the tasks are read in a
+    single pass, so a generator such as iter_tasks can be passed instead
+    of a list to keep memory use flat. With task_list None the counts are
+    taken straight from the storage (an SQL query for sqlite storage).
 
     Parameters
     ----------
-    task_list : list[dict]
-        List of dictionaries representing tasks with keys:
+    task_list : Iterable[Task] | None
+        List (or generator) of Task objects, or a TaskStore, with fields:
         - username (str)
         - title (str)
         - description (str)
-        - due_date (datetime)
-        - assigned_date (datetime)
+        - due_date (date)
+        - assigned_date (date)
         - completed (bool)
-    curr_user : str
-        The username of the current user.
     username_password : dict
-        A dictionary containing username as key and password as values
+        A dictionary where the keys are usernames and the values are passwords.
+    display : Bool, optional
+        Whether to display the generated reports, by default False.
+    task_index : dict | None, optional
+        Task indexes kept up to date with the task list, see
+        build_task_index, by default None.
+    cache : bool, optional
+        Reuse the last reports if the tasks and users in the storage are
+        unchanged since, see ReportCache. Only for tasks and users that
+        are the same as the storage's, by default False.
     """
+    # Get date to check if overdue
+    curr_date = date.today()
 
-    # Check if user has any tasks
-    found = False
-    # List all of the task that belong to user
-    for i, t in enumerate(task_list):
-        if t["username"] == curr_user:
-            display_task(task=t, task_num=i)
-            found = True
-
-    # If no tasks then exit
-    if not found:
-        print("\nYou have no tasks assigned to you.")
-        return
-
-    # Get user task number (if they want to edit)
-    user_task_num = user_task_num_select(
-        task_list=task_list, curr_user=curr_user
-    )
-
-    # Exit if user selected -1
-    if user_task_num == -1:
+    # Reuse the last reports if generated from the same data, only writing
+    # the report files if they have been changed or removed since
+    signature = STORAGE.data_signature() if cache else None
+    fingerprint = report_fingerprint(curr_date=curr_date) if cache else None
+    cached = cached_reports(fingerprint=fingerprint) if cache else None
+    if cached is not None:
+        task_overview, user_overview = cached
+        display_reports(
+            task_overview=task_overview,
+            user_overview=user_overview,
+            display=display,
+        )
         return
 
-    # Get user task to update
-    user_task = task_list[user_task_num]
-
-    # If complete then cannot change, go to main menu
-    if user_task["completed"]:
-        print("\nThis task is complete and cannot be edited.")
-        return
+    # Count tasks overall and for each user
+    if task_index is not None:
+        counts = stats_counts(
+            stats=task_index["stats"],
+            usernames=username_password.keys(),
+            curr_date=curr_date,
+        )
+    elif task_list is None:
+        counts = STORAGE.report_counts(
+            usernames=username_password.keys(), curr_date=curr_date
+        )
+    else:
+        counts = count_tasks(
+            task_list=task_list,
+            usernames=username_password.keys(),
+            curr_date=curr_date,
+        )
 
-    # Check if want mark complete
-    mark_task_complete = user_input_yes_no(
-        msg="\nWould you like to mark the task as complete? (y/n): "
+    # Format the reports
+    task_overview, user_overview = render_reports(
+        counts=counts, user_count=len(username_password)
     )
 
-    # If so update task, write out file and go to main menu
-    if mark_task_complete == "y":
-        user_task["completed"] = True
-        write_task_list(task_list=task_list)
-        print("\nTask successfully marked as complete.")
-        return
+    # Write out files, caching the reports unless the tasks or users changed
+    # while they were counted
+    write_reports(task_overview=task_overview, user_overview=user_overview)
+    if cache and STORAGE.data_signature() == signature:
+        REPORT_CACHE.put(
+            fingerprint=fingerprint,
+            task_overview=task_overview,
+            user_overview=user_overview,
+        )
 
-    # Check if they want to edit the username
-    update_username = user_input_yes_no(
-        msg="\nWould you like update the username? (y/n): "
+    display_reports(
+        task_overview=task_overview,
+        user_overview=user_overview,
+        display=display,
     )
 
-    if update_username == "y":
-        # Get new username
-        new_username = input("\nProvide updated username: ")
-        # Check username exists, else exit to main menu
-        if new_username not in username_password:
-            print("\nUsername not recognised. Exiting.")
-            return
 
-        # Update task with new username and write out to file
-        user_task["username"] = new_username
-        write_task_list(task_list=task_list)
-        print("\nTask username successfully updated.")
+def write_reports(task_overview: str, user_overview: str):
+    """
+    Write out task_overview.txt and user_overview.txt.
 
-    # Check if they want to edit the due date
-    update_due_date = user_input_yes_no(
-        msg="\nWould you like update the due date? (y/n): "
-    )
+    Parameters
+    ----------
+    task_overview : str
+        The task overview report.
+    user_overview : str
+        The user overview report.
+    """
+    # Replace each file in one go so they are never read part written
+    with atomic_open("task_overview.txt") as task_overview_file:
+        # Write out tasks
+        task_overview_file.write(task_overview)
 
-    if update_due_date == "y":
-        # Get new due date
-        new_due_date = user_input_date(
-            "\nProvide updated due date (YYYY-MM-DD): "
-        )
-        # Update task and write to file
-        user_task["due_date"] = new_due_date
-        write_task_list(task_list=task_list)
-        print("\nTask due date successfully updated.")
+    with atomic_open("user_overview.txt") as user_overview_file:
+        # Write out tasks
+        user_overview_file.write(user_overview)
+    METRICS.add_bytes(
+        written=file_size("task_overview.txt") + file_size("user_overview.txt")
+    )
 
 
-# Function that is called when users type ‘gr’ or 'ds'
-# Writes task_overview.txt and user_overview.txt reports
-# Option to display the reports
-def generate_reports(
-    task_list: list[dict], username_password: dict, display: bool = False
-):
+def display_reports(task_overview: str, user_overview: str, display: bool):
     """
-    Generate and optionally display the task and user overview statistics.
+    Print the reports if display is set.
 
     Parameters
     ----------
-    task_list : list[dict]
-        List of dictionaries representing tasks with keys:
-        - username (str)
-        - title (str)
-        - description (str)
-        - due_date (datetime)
-        - assigned_date (datetime)
-        - completed (bool)
-    username_password : dict
-        A dictionary where the keys are usernames and the values are passwords.
-    display : Bool, optional
-        Whether to display the generated reports, by default False.
+    task_overview : str
+        The task overview report.
+    user_overview : str
+        The user overview report.
+    display : bool
+        Whether to display the reports.
     """
-    # Get date to check if overdue
-    curr_date = date.today()
+    # Display if needed
+    if display:
+        CONSOLE.print(
+            format_reports(
+                task_overview=task_overview, user_overview=user_overview
+            )
+        )
 
-    # Get total tasks
-    total_tasks = len(task_list)
 
-    # Set up counters for total stats
-    total_completed = 0
-    total_overdue = 0
+def format_reports(task_overview: str, user_overview: str) -> str:
+    """
+    Format the reports as ds displays them.
 
-    # Create dict for user stats
-    user_dict = {}
-    for user in username_password.keys():
-        user_dict[user] = {
-            "task_count": 0,
-            "completed": 0,
-            "overdue": 0,
-        }
-    # Loop through tasks
-    for t in task_list:
+    Parameters
+    ----------
+    task_overview : str
+        The task overview report.
+    user_overview : str
+        The user overview report.
 
-        # Increase user task count
-        username = t["username"]
-        user_dict[username]["task_count"] += 1
+    Returns
+    -------
+    str
+        Both reports with headings.
+    """
+    # Adj tabs as look good in files but not in print
+    task_overview_display = task_overview.replace("\t\t\t\t", "\t\t\t")
+    user_overview_display = user_overview.replace("\t\t\t\t", "\t\t")
+    return (
+        "\nTASK OVERVIEW:\n--------------\n"
+        f"{task_overview_display}\n\n"
+        "USER OVERVIEW:\n--------------\n"
+        f"{user_overview_display}\n"
+    )
 
-        # Check complete/overdue
-        completed = t["completed"]
-        overdue = t["due_date"].date() < curr_date
 
-        # Increase counters if required (only overdue if not completed)
-        if completed:
-            total_completed += 1
-            user_dict[username]["completed"] += 1
-        elif overdue:
-            total_overdue += 1
-            user_dict[username]["overdue"] += 1
+@instrumented(name="render_reports")
+def render_reports(counts: tuple, user_count: int) -> tuple[str, str]:
+    """
+    Format the task and user overview reports.
+
+    Parameters
+    ----------
+    counts : tuple
+        Report counts as returned by count_tasks.
+    user_count : int
+        Total number of users.
+
+    Returns
+    -------
+    tuple[str, str]
+        The task overview and user overview reports.
+    """
+    total_tasks, total_completed, total_overdue, user_dict = counts
 
     # Accounting for zero division if user has no tasks
     if total_tasks == 0:
@@ -679,7 +5961,7 @@ def generate_reports(
 
     # Generate base user overview stats
     user_overview = (
-        f"Total Number of Users: \t{len(username_password)}\n"
+        f"Total Number of Users: \t{user_count}\n"
         f"Total Number of Tasks: \t{total_tasks}"
     )
     # Loop to add user specific stats
@@ -712,23 +5994,182 @@ def generate_reports(
             f"Percentage Overdue: \t\t{user_pct_overdue:.2%}"
         )
 
-    # Write out files
-    with open("task_overview.txt", "w") as task_overview_file:
-        # Write out tasks
-        task_overview_file.write(task_overview)
+    return task_overview, user_overview
 
-    with open("user_overview.txt", "w") as user_overview_file:
-        # Write out tasks
-        user_overview_file.write(user_overview)
 
-    # Display if needed (note: adj tabs as look good in files but not in print)
-    if display:
-        print(
-            "\nTASK OVERVIEW:\n--------------\n"
-            f"{task_overview.replace('\t\t\t\t','\t\t\t')}\n\n"
-            "USER OVERVIEW:\n--------------\n"
-            f"{user_overview.replace('\t\t\t\t','\t\t')}\n"
+# ====Report Worker Section====
+# Reports asked for from the menu are generated on a background thread, so
+# the menu carries on straight away and says when they are ready.
+class ReportWorker:
+    """
+    Generates the task and user overview reports on a background thread.
+
+    Each request takes a snapshot on the calling thread: the usernames and
+    a copy of the totals in the task index stats (see stats_snapshot),
+    which the menu goes on changing, and the signature of the stored data
+    (see data_signature). Requests made while reports for the same
+    signature and date are being generated share that job rather than
+    counting again, and reports in the REPORT_CACHE are not generated
+    again at all (see build_reports).
+
+    The cache is keyed on the stored data, so it is only used when the
+    tasks in memory are the same as the stored tasks (see tasks_current)
+    and nothing changed while the snapshot was taken.
+    """
+
+    def __init__(self):
+        self.executor = None
+        # Signature and date (or the job itself, if not shared): job
+        # generating its reports, while it runs
+        self.jobs = {}
+        # Jobs to announce with take_notices once done, in order
+        self.notify = []
+
+    def submit(
+        self, username_password: dict, task_index: dict, notify: bool = True
+    ) -> Future:
+        """
+        Start generating the reports, unless they already are.
+
+        Parameters
+        ----------
+        username_password : dict
+            A dictionary where the keys are usernames and the values are
+            passwords.
+        task_index : dict
+            Task indexes kept up to date with the task list, see
+            build_task_index.
+        notify : bool, optional
+            Announce the reports with take_notices once ready, by default
+            True.
+
+        Returns
+        -------
+        Future
+            Gives the task and user overview reports.
+        """
+        # Forget finished jobs, the cache has their reports
+        self.jobs = {
+            key: job for key, job in self.jobs.items() if not job.done()
+        }
+
+        # Snapshot the data, only cheap file stats besides copying the
+        # stats: the data is fingerprinted by the job
+        curr_date = date.today()
+        signature = STORAGE.data_signature()
+        synced = STORAGE.tasks_current()
+        stats = stats_snapshot(stats=task_index["stats"], curr_date=curr_date)
+        usernames = tuple(username_password)
+        if not synced or STORAGE.data_signature() != signature:
+            # The snapshot may not match the stored data, so don't cache it
+            signature = None
+
+        key = None if signature is None else (signature, curr_date)
+        job = self.jobs.get(key) if key is not None else None
+        if job is None:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="reports"
+                )
+            job = self.executor.submit(
+                build_reports,
+                stats=stats,
+                usernames=usernames,
+                curr_date=curr_date,
+                signature=signature,
+            )
+            self.jobs[job if key is None else key] = job
+        if notify and job not in self.notify:
+            self.notify.append(job)
+        return job
+
+    def take_notices(self) -> list[str]:
+        """
+        Get a message for each announced job that has finished since last
+        called.
+        """
+        notices = []
+        for job in [job for job in self.notify if job.done()]:
+            self.notify.remove(job)
+            if job.exception() is not None:
+                notices.append(
+                    f"\nReport generation failed: {job.exception()}"
+                )
+            else:
+                notices.append(
+                    "\nReports ready: task_overview.txt and"
+                    " user_overview.txt have been written."
+                )
+        return notices
+
+    def wait(self):
+        """
+        Wait for every running job to finish, e.g. before changing
+        directory.
+        """
+        for job in list(self.jobs.values()):
+            job.exception()
+
+
+REPORT_WORKER = ReportWorker()
+
+
+@instrumented(name="build_reports")
+def build_reports(
+    stats: dict,
+    usernames: tuple[str],
+    curr_date: date,
+    signature: tuple | None,
+) -> tuple[str, str]:
+    """
+    Generate, write and cache the reports from a snapshot of the task
+    stats, unless they are cached already. Run by ReportWorker.
+
+    The stored data is fingerprinted here rather than on the menu thread,
+    as it can mean reading the whole task file, and the cache is only used
+    if the data is still as it was when the snapshot was taken.
+
+    Parameters
+    ----------
+    stats : dict
+        Snapshot of the task stats, see stats_snapshot.
+    usernames : tuple[str]
+        The usernames at the time of the snapshot.
+    curr_date : date
+        The date of the snapshot.
+    signature : tuple | None
+        The signature of the stored data at the snapshot, see
+        data_signature, or None to not use the cache when the snapshot may
+        not match the stored data.
+
+    Returns
+    -------
+    tuple[str, str]
+        The task and user overview reports.
+    """
+    fingerprint = None
+    if signature is not None:
+        fingerprint = report_fingerprint(curr_date=curr_date)
+        if STORAGE.data_signature() != signature:
+            fingerprint = None
+    cached = cached_reports(fingerprint=fingerprint) if fingerprint else None
+    if cached is not None:
+        return cached
+
+    counts = stats_counts(
+        stats=stats, usernames=usernames, curr_date=curr_date
+    )
+    task_overview, user_overview = render_reports(
+        counts=counts, user_count=len(usernames)
+    )
+    write_reports(task_overview=task_overview, user_overview=user_overview)
+    if fingerprint:
+        REPORT_CACHE.put(
+            fingerprint=fingerprint,
+            task_overview=task_overview,
+            user_overview=user_overview,
         )
+    return task_overview, user_overview
 
 
 def set_menu_text(curr_user: str) -> str:
@@ -746,13 +6187,17 @@ def set_menu_text(curr_user: str) -> str:
     menu_text : str
     """
 
-    # If user is admin give the extra options (gr and ds)
+    # If user is admin give the extra options (bu, gr and ds)
     if curr_user == "admin":
         menu_text = """Please select one of the following options below:
         r - Registering a user
         a - Adding a task
         va - View all tasks
         vm - View my task
+        vo - View overdue tasks
+        vu - View upcoming tasks
+        s - Search tasks
+        bu - Bulk update tasks
         gr - Generate reports
         ds - Display statistics
         e - Exit
@@ -764,15 +6209,466 @@ def set_menu_text(curr_user: str) -> str:
         a - Adding a task
         va - View all tasks
         vm - View my task
+        vo - View overdue tasks
+        vu - View upcoming tasks
+        s - Search tasks
         e - Exit
         : """
 
     return menu_text
 
 
+# ====Import/Export Section====
+# Bulk loading and saving of tasks and users as CSV or JSON lines, without
+# the menus. Used by the import and export commands.
+def file_format_of(file_name: str, file_format: str | None = None) -> str:
+    """
+    Get the format of an import or export file, from its extension unless
+    given.
+
+    Parameters
+    ----------
+    file_name : str
+        The file, ending in .csv or .jsonl.
+    file_format : str | None, optional
+        "csv" or "jsonl" whatever the extension, by default None.
+
+    Returns
+    -------
+    str
+        "csv" or "jsonl".
+    """
+    if file_format is None:
+        file_format = os.path.splitext(file_name)[1].lstrip(".").lower()
+    if file_format not in TRANSFER_FORMATS:
+        raise ValueError(
+            f"Unknown format for {file_name}, use .csv or .jsonl files"
+        )
+    return file_format
+
+
+def read_records(file_name: str, file_format: str) -> Iterator[dict]:
+    """
+    Yield the records of a CSV file (with a header row) or a JSON lines
+    file one at a time, as dictionaries.
+
+    Parameters
+    ----------
+    file_name : str
+        The file to read.
+    file_format : str
+        "csv" or "jsonl".
+    """
+    with open(file_name, "r", newline="") as in_file:
+        if file_format == "csv":
+            yield from csv.DictReader(in_file)
+        else:
+            for line in in_file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def iter_batches(items: Iterable, batch_size: int) -> Iterator[list]:
+    """
+    Yield lists of up to batch_size items.
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def check_text_field(name: str, value) -> str:
+    """
+    Check a text field can be stored in the text files, which separate
+    fields with semicolons and records with newlines.
+
+    Raises
+    ------
+    ValueError
+        If the value is missing, not text or holds a semicolon or newline.
+    """
+    if not isinstance(value, str) or not value:
+        raise ValueError(f"{name} must be non-empty text")
+    if ";" in value or "\n" in value or "\r" in value:
+        raise ValueError(f"{name} can't contain ';' or a line break")
+    return value
+
+
+def parse_completed(value) -> bool:
+    """
+    Parse an imported completed flag: Yes/No as in tasks.txt, true/false
+    or a JSON boolean. Missing means not completed.
+    """
+    if isinstance(value, bool):
+        return value
+    if value is None or value == "":
+        return False
+    flag = str(value).strip().lower()
+    if flag in ("yes", "true", "1"):
+        return True
+    if flag in ("no", "false", "0"):
+        return False
+    raise ValueError(f"invalid completed value {value!r}")
+
+
+def parse_import_tasks(
+    records: list[tuple[int, dict]], usernames: set, curr_date: date
+) -> tuple[list[Task], list[str]]:
+    """
+    Check and convert a batch of imported task records into tasks.
+
+    Each distinct date in the batch is parsed once.
+
+    Parameters
+    ----------
+    records : list[tuple[int, dict]]
+        Record number and record, with the keys of TASK_FIELDS. Missing
+        assigned dates default to curr_date and completed to False.
+    usernames : set
+        The existing usernames.
+    curr_date : date
+        Today's date.
+
+    Returns
+    -------
+    tuple[list[Task], list[str]]
+        The valid tasks, and a message for each invalid record.
+    """
+    date_strings = set()
+    for _, record in records:
+        date_strings.add(record.get("due_date"))
+        date_strings.add(record.get("assigned_date"))
+    dates = {}
+    for date_str in date_strings:
+        try:
+            dates[date_str] = parse_date(date_str)
+        except (TypeError, ValueError):
+            dates[date_str] = None
+    dates[None] = dates[""] = curr_date
+
+    new_tasks = []
+    errors = []
+    for record_num, record in records:
+        try:
+            username = check_text_field("username", record.get("username"))
+            if username not in usernames:
+                raise ValueError(f"unknown user {username!r}")
+            due_date = dates[record.get("due_date")]
+            assigned_date = dates[record.get("assigned_date")]
+            if due_date is None or not record.get("due_date"):
+                raise ValueError("due_date must be YYYY-MM-DD")
+            if assigned_date is None:
+                raise ValueError("assigned_date must be YYYY-MM-DD")
+            new_tasks.append(
+                Task(
+                    username=sys.intern(username),
+                    title=check_text_field("title", record.get("title")),
+                    description=check_text_field(
+                        "description", record.get("description")
+                    ),
+                    due_date=due_date,
+                    assigned_date=assigned_date,
+                    completed=parse_completed(record.get("completed")),
+                )
+            )
+        except ValueError as error:
+            errors.append(f"Record {record_num}: {error}")
+    return new_tasks, errors
+
+
+def report_progress(kind: str, count: int, start: float):
+    """
+    Write the number of records done and the rate so far to stderr.
+    """
+    seconds = time.perf_counter() - start
+    rate = count / seconds if seconds else 0
+    sys.stderr.write(f"\r{count} {kind} ({rate:,.0f}/s)")
+    sys.stderr.flush()
+
+
+def import_tasks(
+    file_name: str,
+    file_format: str | None = None,
+    batch_size: int = TRANSFER_BATCH_SIZE,
+) -> tuple[int, list[str]]:
+    """
+    Add the tasks in a CSV or JSON lines file to the storage.
+
+    The file is read in batches of batch_size records. Usernames are
+    checked against the users read once at the start. The stored tasks
+    are only counted, not loaded, and each batch is numbered on from them
+    and saved with one commit, e.g. one append to the task journal,
+    rather than one write per task. Invalid records are skipped. Progress
+    is written to stderr.
+
+    Parameters
+    ----------
+    file_name : str
+        The file to import, with the fields of TASK_FIELDS (a header row
+        for CSV, keys for JSON lines).
+    file_format : str | None, optional
+        "csv" or "jsonl", by default from the file extension.
+    batch_size : int, optional
+        Number of records saved at a time, by default TRANSFER_BATCH_SIZE.
+
+    Returns
+    -------
+    tuple[int, list[str]]
+        Number of tasks added, and a message for each skipped record.
+    """
+    file_format = file_format_of(file_name=file_name, file_format=file_format)
+    usernames = set(get_username_password(get_user_data()))
+    # New tasks are numbered after the existing ones
+    task_count = STORAGE.load_task_count()
+    curr_date = date.today()
+
+    added = 0
+    errors = []
+    start = time.perf_counter()
+    records = enumerate(read_records(file_name, file_format), start=1)
+    for batch in iter_batches(items=records, batch_size=batch_size):
+        new_tasks, batch_errors = parse_import_tasks(
+            records=batch, usernames=usernames, curr_date=curr_date
+        )
+        errors += batch_errors
+        changes = [
+            ("add", task_num, new_task)
+            for task_num, new_task in enumerate(new_tasks, start=task_count)
+        ]
+        if changes:
+            # No task list, so the text storage leaves its journal to be
+            # compacted by the next session that loads the tasks
+            STORAGE.commit(task_list=None, changes=changes)
+        task_count += len(changes)
+        added += len(changes)
+        report_progress(kind="tasks", count=added, start=start)
+    sys.stderr.write("\n")
+    return added, errors
+
+
+def import_users(
+    file_name: str,
+    file_format: str | None = None,
+    batch_size: int = TRANSFER_BATCH_SIZE,
+) -> tuple[int, list[str]]:
+    """
+    Add the users in a CSV or JSON lines file to the storage.
+
+    Users are saved a batch at a time with one add_users, which appends
+    them rather than rewriting every user. Existing usernames and invalid
+    records are skipped. Progress is written to stderr.
+
+    Parameters
+    ----------
+    file_name : str
+        The file to import, with username and password fields.
+    file_format : str | None, optional
+        "csv" or "jsonl", by default from the file extension.
+    batch_size : int, optional
+        Number of records saved at a time, by default TRANSFER_BATCH_SIZE.
+
+    Returns
+    -------
+    tuple[int, list[str]]
+        Number of users added, and a message for each skipped record.
+    """
+    file_format = file_format_of(file_name=file_name, file_format=file_format)
+    username_password = get_username_password(get_user_data())
+
+    added = 0
+    errors = []
+    start = time.perf_counter()
+    records = enumerate(read_records(file_name, file_format), start=1)
+    for batch in iter_batches(items=records, batch_size=batch_size):
+        new_users = []
+        for record_num, record in batch:
+            try:
+                username = check_text_field(
+                    "username", record.get("username")
+                )
+                password = check_text_field(
+                    "password", record.get("password")
+                )
+                if username in username_password:
+                    raise ValueError(f"user {username!r} already exists")
+            except ValueError as error:
+                errors.append(f"Record {record_num}: {error}")
+                continue
+            username_password[username] = password
+            new_users.append((username, password))
+        if new_users:
+            STORAGE.add_users(users=new_users)
+        added += len(new_users)
+        report_progress(kind="users", count=added, start=start)
+    sys.stderr.write("\n")
+    return added, errors
+
+
+def write_records(
+    records: Iterable[dict],
+    fields: tuple,
+    file_name: str,
+    file_format: str,
+    batch_size: int,
+    kind: str,
+) -> int:
+    """
+    Write records to a CSV or JSON lines file, one write per batch.
+
+    Parameters
+    ----------
+    records : Iterable[dict]
+        The records, with the keys in fields.
+    fields : tuple
+        Field names, in column order for CSV.
+    file_name : str
+        The file to write, replaced once complete.
+    file_format : str
+        "csv" or "jsonl".
+    batch_size : int
+        Number of records formatted per write.
+    kind : str
+        What the records are, for the progress written to stderr.
+
+    Returns
+    -------
+    int
+        Number of records written.
+    """
+    count = 0
+    start = time.perf_counter()
+    with atomic_open(file_name) as out_file:
+        if file_format == "csv":
+            # Format each batch in memory, then write it in one go
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=fields)
+            writer.writeheader()
+        for batch in iter_batches(items=records, batch_size=batch_size):
+            if file_format == "csv":
+                writer.writerows(batch)
+                out_file.write(buffer.getvalue())
+                buffer.seek(0)
+                buffer.truncate()
+            else:
+                out_file.write(
+                    "".join(json.dumps(record) + "\n" for record in batch)
+                )
+            count += len(batch)
+            report_progress(kind=kind, count=count, start=start)
+        if file_format == "csv":
+            # Header only if there were no records
+            out_file.write(buffer.getvalue())
+    sys.stderr.write("\n")
+    return count
+
+
+def export_tasks(
+    file_name: str,
+    file_format: str | None = None,
+    batch_size: int = TRANSFER_BATCH_SIZE,
+) -> int:
+    """
+    Write every task to a CSV or JSON lines file, see import_tasks.
+
+    Tasks are streamed from the storage, so they are not all held in
+    memory. Dates are written as YYYY-MM-DD, and completed as Yes/No in
+    CSV and as a boolean in JSON lines.
+
+    Parameters
+    ----------
+    file_name : str
+        The file to write.
+    file_format : str | None, optional
+        "csv" or "jsonl", by default from the file extension.
+    batch_size : int, optional
+        Number of tasks written at a time, by default TRANSFER_BATCH_SIZE.
+
+    Returns
+    -------
+    int
+        Number of tasks written.
+    """
+    file_format = file_format_of(file_name=file_name, file_format=file_format)
+    if file_format == "csv":
+        records = (
+            dict(zip(TASK_FIELDS, t_str.split(";")))
+            for t_str in iter_task_data()
+        )
+    else:
+        records = (
+            {
+                field: (
+                    getattr(t, field)
+                    if field == "completed"
+                    else format_task_field(
+                        field=field, value=getattr(t, field)
+                    )
+                )
+                for field in TASK_FIELDS
+            }
+            for t in iter_tasks()
+        )
+    return write_records(
+        records=records,
+        fields=TASK_FIELDS,
+        file_name=file_name,
+        file_format=file_format,
+        batch_size=batch_size,
+        kind="tasks",
+    )
+
+
+def export_users(
+    file_name: str,
+    file_format: str | None = None,
+    batch_size: int = TRANSFER_BATCH_SIZE,
+) -> int:
+    """
+    Write every user to a CSV or JSON lines file, see import_users.
+
+    Parameters
+    ----------
+    file_name : str
+        The file to write.
+    file_format : str | None, optional
+        "csv" or "jsonl", by default from the file extension.
+    batch_size : int, optional
+        Number of users written at a time, by default TRANSFER_BATCH_SIZE.
+
+    Returns
+    -------
+    int
+        Number of users written.
+    """
+    file_format = file_format_of(file_name=file_name, file_format=file_format)
+    records = (
+        {"username": username, "password": password}
+        for username, password in get_username_password(
+            get_user_data()
+        ).items()
+    )
+    return write_records(
+        records=records,
+        fields=("username", "password"),
+        file_name=file_name,
+        file_format=file_format,
+        batch_size=batch_size,
+        kind="users",
+    )
+
+
 # ====Main loop====
 def launch_menu(
-    curr_user: str, task_list: list[dict], username_password: dict
+    curr_user: str,
+    task_list: list[Task],
+    username_password: dict,
+    task_index: dict | None = None,
+    page_size: int = VIEW_PAGE_SIZE,
 ):
     """
     Present menu to the user allowing them to select an option.
@@ -783,6 +6679,10 @@ def launch_menu(
         a - Adding a task
         va - View all tasks
         vm - View my task
+        vo - View overdue tasks
+        vu - View upcoming tasks
+        s - Search tasks
+        bu - Bulk update tasks
         gr - Generate reports
         ds - Display statistics
         e - Exit
@@ -791,67 +6691,191 @@ def launch_menu(
     ----------
     curr_user : str
         The username of the current user.
-    task_list : list[dict]
-        List of dictionaries representing tasks with keys:
+    task_list : list[Task]
+        List of Task objects (or a TaskStore) with fields:
         - username (str)
         - title (str)
         - description (str)
-        - due_date (datetime)
-        - assigned_date (datetime)
+        - due_date (date)
+        - assigned_date (date)
         - completed (bool)
     username_password : dict
         A dictionary where the keys are usernames and the values are passwords.
+    task_index : dict | None, optional
+        Task indexes, see build_task_index. Built from the task list if
+        not given, by default None.
+    page_size : int, optional
+        Number of tasks on each page of view all, 0 for no pages, by
+        default VIEW_PAGE_SIZE.
     """
+    if task_index is None:
+        task_index = build_task_index(task_list=task_list)
+
     # User terminal display
     while True:
+        # Pick up tasks added or changed by other sessions since the last
+        # action
+        task_list, task_index = refresh_task_list(
+            task_list=task_list, task_index=task_index
+        )
+
+        # Say which reports generated in the background are ready
+        for notice in REPORT_WORKER.take_notices():
+            CONSOLE.print(notice)
+
         # Presenting the menu to the user and
         # making sure that the user input is converted to lower case.
-        print()
+        CONSOLE.print()
         menu_text = set_menu_text(curr_user=curr_user)
-        menu = input(menu_text).lower()
-
-        if menu == "r":
-            # Reg user
-            reg_user(username_password=username_password)
-        elif menu == "a":
-            # Add new task
-            add_task(task_list=task_list, username_password=username_password)
-        elif menu == "va":
-            # View all task
-            view_all(task_list=task_list)
-        elif menu == "vm":
-            # View my tasks
-            view_mine(
-                task_list=task_list,
-                curr_user=curr_user,
-                username_password=username_password,
-            )
-        # Admin Only - Generate_reports(task_list, username_password)
-        elif menu == "gr" and curr_user == "admin":
-            # Generate reports
-            generate_reports(
-                task_list=task_list, username_password=username_password
+        menu = CONSOLE.input(menu_text).lower()
+        action_start = time.perf_counter()
+
+        try:
+            with METRICS.action(action=menu):
+                if menu == "r":
+                    # Reg user
+                    reg_user(username_password=username_password)
+                elif menu == "a":
+                    # Add new task
+                    add_task(
+                        task_list=task_list,
+                        username_password=username_password,
+                        task_index=task_index,
+                    )
+                elif menu == "va":
+                    # View all task
+                    view_all(
+                        task_list=task_list,
+                        task_index=task_index,
+                        page_size=page_size,
+                    )
+                elif menu == "vm":
+                    # View my tasks
+                    view_mine(
+                        task_list=task_list,
+                        curr_user=curr_user,
+                        username_password=username_password,
+                        task_index=task_index,
+                    )
+                elif menu == "vo":
+                    # View overdue tasks
+                    view_overdue(
+                        task_list=task_list,
+                        task_index=task_index,
+                        page_size=page_size,
+                    )
+                elif menu == "vu":
+                    # View tasks due in the next few days
+                    view_upcoming(
+                        task_list=task_list,
+                        task_index=task_index,
+                        page_size=page_size,
+                    )
+                elif menu == "s":
+                    # Search task titles and descriptions
+                    search_tasks(
+                        task_list=task_list,
+                        curr_user=curr_user,
+                        task_index=task_index,
+                        page_size=page_size,
+                    )
+                # Admin Only - Update many tasks at once
+                elif menu == "bu" and curr_user == "admin":
+                    bulk_update(
+                        task_list=task_list,
+                        username_password=username_password,
+                        task_index=task_index,
+                    )
+                # Admin Only - Generate_reports(task_list, username_password)
+                elif menu == "gr" and curr_user == "admin":
+                    # The reports count the tasks in memory: load them
+                    # again in full if they differ from the stored tasks,
+                    # e.g. another session saved since they were refreshed
+                    if not STORAGE.tasks_current():
+                        task_list, task_index = refresh_task_list(
+                            task_list=task_list,
+                            task_index=task_index,
+                            full=True,
+                        )
+                    # Generate reports in the background, the menu says
+                    # when they are ready
+                    REPORT_WORKER.submit(
+                        username_password=username_password,
+                        task_index=task_index,
+                    )
+                    CONSOLE.print(
+                        "\nGenerating reports in the background. You will"
+                        " be told when they are ready."
+                    )
+                # Admin Only - Display statistics
+                elif menu == "ds" and curr_user == "admin":
+                    # Chose to regenerate reports rather than read from text
+                    # files in case they don't exist OR the tasks/users have
+                    # been updated since (the cache checks both). Waits for
+                    # reports of the same data already being generated.
+                    # Tasks are loaded again first if needed, as for gr
+                    if not STORAGE.tasks_current():
+                        task_list, task_index = refresh_task_list(
+                            task_list=task_list,
+                            task_index=task_index,
+                            full=True,
+                        )
+                    job = REPORT_WORKER.submit(
+                        username_password=username_password,
+                        task_index=task_index,
+                        notify=False,
+                    )
+                    try:
+                        task_overview, user_overview = job.result()
+                    except Exception as error:
+                        # Failures on the worker thread are raised here,
+                        # say so as take_notices does for gr
+                        CONSOLE.print(f"\nReport generation failed: {error}")
+                    else:
+                        display_reports(
+                            task_overview=task_overview,
+                            user_overview=user_overview,
+                            display=True,
+                        )
+                elif menu == "e":
+                    # Exit, once reports generated in the background are
+                    # written
+                    REPORT_WORKER.wait()
+                    for notice in REPORT_WORKER.take_notices():
+                        CONSOLE.print(notice)
+                    CONSOLE.print("\nYou are exiting the program. Goodbye.")
+                    exit()
+                else:
+                    # Invalid choice
+                    CONSOLE.print("\nInvalid choice. Please Try again")
+        except StaleDataError:
+            # Another session saved changes first: reload them so the
+            # action can be tried again on up to date tasks and users
+            CONSOLE.print(
+                "\nThe tasks or users were changed by another session and"
+                " have been reloaded. Please try again."
             )
-        # Admin Only - Display statistics
-        elif menu == "ds" and curr_user == "admin":
-            # Chose to regenerate reports rather than read from text files in
-            # case they don't exist OR the tasks/users have been updated since
-            generate_reports(
-                task_list=task_list,
-                username_password=username_password,
-                display=True,
+            task_list, task_index = refresh_task_list(
+                task_list=task_list, task_index=task_index, full=True
             )
-        elif menu == "e":
-            # Exit
-            print("\nYou are exiting the program. Goodbye.")
-            exit()
-        else:
-            # Invalid choice
-            print("\nInvalid choice. Please Try again")
+            username_password.clear()
+            if not isinstance(username_password, UserDirectory):
+                username_password.update(
+                    get_username_password(get_user_data())
+                )
+
+        # Time taken by the action, e.g. for session_replay.py
+        CONSOLE.record_action(
+            action=menu, seconds=time.perf_counter() - action_start
+        )
 
 
 # ====Main code====
-def launch_task_manager():
+def launch_task_manager(
+    store: str = "list",
+    page_size: int = VIEW_PAGE_SIZE,
+    lazy_search: bool = False,
+):
     """
     Launch task manager.
 
@@ -861,19 +6885,29 @@ def launch_task_manager():
         - Get user login
         - Display task manager menu
 
+    Parameters
+    ----------
+    store : str, optional
+        "list" to hold tasks as a list of Task objects, or "columnar" to
+        use a TaskStore for very large task files, by default "list".
+    page_size : int, optional
+        Number of tasks on each page of view all, 0 for no pages, by
+        default VIEW_PAGE_SIZE.
+    lazy_search : bool, optional
+        Build the search index at the first search rather than at start
+        up, by default False.
     """
 
     # ----Get tasks----
-    # Load task data from task.txt file
-    task_data = get_task_data()
-    # Split task data into a list of dictionaries represent each task
-    task_list = get_task_list(task_data=task_data)
+    # Stream task data from task.txt file straight into a list of
+    # Task objects (or a TaskStore) represent each task
+    task_list = load_task_list(store=store)
+    # Index the tasks, e.g. by user for view_mine
+    task_index = build_task_index(task_list=task_list, search=not lazy_search)
 
     # ----Get users----
-    # Get_user_data from user.txt file
-    user_data = get_user_data()
-    # Get username_password dictionary
-    username_password = get_username_password(user_data=user_data)
+    # Users are looked up one at a time from user.txt when needed
+    username_password = UserDirectory()
 
     # ----User login----
     curr_user = get_user_login(username_password=username_password)
@@ -883,12 +6917,288 @@ def launch_task_manager():
         curr_user=curr_user,
         username_password=username_password,
         task_list=task_list,
+        task_index=task_index,
+        page_size=page_size,
+    )
+
+
+def main(argv: list[str] | None = None):
+    """
+    Read command line options and launch the task manager.
+
+    Parameters
+    ----------
+    argv : list[str] | None, optional
+        Command line arguments, by default those of the program.
+    """
+    parser = argparse.ArgumentParser(description="Task manager")
+    parser.add_argument(
+        "--store",
+        choices=["list", "columnar"],
+        default="list",
+        help="how tasks are held in memory (columnar for very large files)",
+    )
+    parser.add_argument(
+        "--storage",
+        choices=list(STORAGE_TYPES),
+        default="text",
+        help="where tasks and users are saved",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="processes parsing and counting a very large tasks.txt (text"
+        " storage only), 0 for one per CPU",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=VIEW_PAGE_SIZE,
+        help="tasks per page when viewing all tasks, 0 to show every task",
+    )
+    parser.add_argument(
+        "--lazy-search",
+        action="store_true",
+        help="build the search index at the first search rather than at"
+        " start up, to start sooner with very large task files",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="FILE",
+        help="append everything typed (including passwords) to a session"
+        " file for session_replay.py",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="record timings, call counts and bytes read/written and save"
+        " them on exit (Prometheus text if FILE ends in .prom, else JSON)."
+        f" Also set by the {METRICS_ENV_VAR} environment variable",
+    )
+    parser.add_argument(
+        "--profile-action",
+        choices=MENU_ACTIONS,
+        help="run every use of one menu action under cProfile and save it"
+        " to profile_<action>.prof on exit",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    # migrate - copy tasks and users between storages
+    migrate_parser = subparsers.add_parser(
+        "migrate", help="copy all tasks and users to another storage"
+    )
+    migrate_parser.add_argument(
+        "--from", dest="source", choices=list(STORAGE_TYPES), default="text"
+    )
+    migrate_parser.add_argument(
+        "--to", dest="target", choices=list(STORAGE_TYPES), required=True
+    )
+
+    # report - generate the reports without logging in
+    report_parser = subparsers.add_parser(
+        "report", help="write task_overview.txt and user_overview.txt"
+    )
+    report_parser.add_argument(
+        "--display", action="store_true", help="also print the reports"
     )
 
+    # bulk - change every task matching a filter in one commit
+    bulk_parser = subparsers.add_parser(
+        "bulk", help="reassign, complete, reopen or reschedule many tasks"
+    )
+    bulk_parser.add_argument("--user", help="only tasks assigned to USER")
+    bulk_parser.add_argument(
+        "--due-from",
+        type=parse_date,
+        metavar="YYYY-MM-DD",
+        help="only tasks due on or after this date",
+    )
+    bulk_parser.add_argument(
+        "--due-to",
+        type=parse_date,
+        metavar="YYYY-MM-DD",
+        help="only tasks due on or before this date",
+    )
+    bulk_parser.add_argument(
+        "--completed",
+        choices=["yes", "no"],
+        help="only completed or uncompleted tasks",
+    )
+    bulk_change = bulk_parser.add_mutually_exclusive_group(required=True)
+    bulk_change.add_argument(
+        "--reassign", metavar="USER", help="assign the tasks to USER"
+    )
+    bulk_change.add_argument(
+        "--complete", action="store_true", help="mark the tasks complete"
+    )
+    bulk_change.add_argument(
+        "--reopen", action="store_true", help="mark the tasks not complete"
+    )
+    bulk_change.add_argument(
+        "--due",
+        type=parse_date,
+        metavar="YYYY-MM-DD",
+        help="set the due date of the tasks",
+    )
+    bulk_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="only count the tasks that would change",
+    )
+
+    # import/export - load or save tasks or users in bulk
+    for command, help_text in (
+        ("import", "add tasks or users from a CSV or JSON lines file"),
+        ("export", "save all tasks or users to a CSV or JSON lines file"),
+    ):
+        transfer_parser = subparsers.add_parser(command, help=help_text)
+        transfer_parser.add_argument("kind", choices=["tasks", "users"])
+        transfer_parser.add_argument(
+            "file", help="the file, ending in .csv or .jsonl"
+        )
+        transfer_parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=TRANSFER_FORMATS,
+            help="file format if not given by the file extension",
+        )
+        transfer_parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=TRANSFER_BATCH_SIZE,
+            help="records read or written at a time",
+        )
+
+    args = parser.parse_args(argv)
+    storage = STORAGE_TYPES[args.storage]()
+    # Only the text storage parses tasks, so only it has workers
+    if isinstance(storage, FlatFileStorage):
+        storage.workers = args.workers or os.cpu_count() or 1
+    set_storage(storage)
+
+    # Metrics are on if a metrics file is given by flag or environment
+    metrics_file = args.metrics or os.environ.get(METRICS_ENV_VAR)
+    set_metrics(
+        Metrics(
+            enabled=bool(metrics_file), profile_action=args.profile_action
+        )
+    )
+
+    try:
+        if args.command == "migrate":
+            if args.source == args.target:
+                parser.error("--from and --to must be different storages")
+            task_count, user_count = migrate_storage(
+                source=STORAGE_TYPES[args.source](),
+                target=STORAGE_TYPES[args.target](),
+            )
+            CONSOLE.print(
+                f"Migrated {task_count} tasks and {user_count} users"
+                f" from {args.source} to {args.target}."
+            )
+        elif args.command == "bulk":
+            username_password = get_username_password(get_user_data())
+            for username in (args.user, args.reassign):
+                if username is not None and username not in username_password:
+                    parser.error(f"user {username!r} does not exist")
+            if args.reassign is not None:
+                field, value = "username", args.reassign
+            elif args.due is not None:
+                field, value = "due_date", args.due
+            else:
+                field, value = "completed", args.complete
+            task_list = load_task_list(store=args.store)
+            task_index = build_task_index(task_list=task_list, search=False)
+            task_nums = select_task_nums(
+                task_list=task_list,
+                task_index=task_index,
+                username=args.user,
+                due_from=args.due_from,
+                due_to=args.due_to,
+                completed=(
+                    None if args.completed is None else args.completed == "yes"
+                ),
+            )
+            change_count = bulk_update_tasks(
+                task_list=task_list,
+                task_nums=task_nums,
+                field=field,
+                value=value,
+                task_index=task_index,
+                dry_run=args.dry_run,
+            )
+            CONSOLE.print(
+                f"{len(task_nums)} tasks match, {change_count}"
+                f" {'would change' if args.dry_run else 'changed'}."
+            )
+        elif args.command in ("import", "export"):
+            transfer = {
+                ("import", "tasks"): import_tasks,
+                ("import", "users"): import_users,
+                ("export", "tasks"): export_tasks,
+                ("export", "users"): export_users,
+            }[(args.command, args.kind)]
+            start = time.perf_counter()
+            try:
+                result = transfer(
+                    file_name=args.file,
+                    file_format=args.file_format,
+                    batch_size=max(args.batch_size, 1),
+                )
+            except ValueError as error:
+                # e.g. an unknown file format or malformed JSON
+                parser.error(str(error))
+            seconds = time.perf_counter() - start
+            if args.command == "import":
+                count, errors = result
+                sys.stderr.write("".join(f"{error}\n" for error in errors))
+                CONSOLE.print(
+                    f"Imported {count} {args.kind} in {seconds:.2f}s,"
+                    f" skipped {len(errors)} invalid records."
+                )
+            else:
+                CONSOLE.print(
+                    f"Exported {result} {args.kind} in {seconds:.2f}s."
+                )
+        elif args.command == "report":
+            username_password = get_username_password(get_user_data())
+            generate_reports(
+                task_list=None,
+                username_password=username_password,
+                display=args.display,
+                cache=True,
+            )
+        elif args.record:
+            set_console(RecordingConsole())
+            try:
+                launch_task_manager(
+                    store=args.store,
+                    page_size=args.page_size,
+                    lazy_search=args.lazy_search,
+                )
+            finally:
+                CONSOLE.save(file_name=args.record)
+        else:
+            launch_task_manager(
+                store=args.store,
+                page_size=args.page_size,
+                lazy_search=args.lazy_search,
+            )
+
+    finally:
+        # Save the metrics and profile however the program exits
+        if metrics_file:
+            METRICS.dump(file_name=metrics_file)
+        if args.profile_action:
+            METRICS.save_profile(
+                file_name=f"profile_{args.profile_action}.prof"
+            )
+
 
 # Code only executes if the script is run as the main program.
 # Stops code running straight away when imported as a module
 
 if __name__ == "__main__":
     # Run the task manager
-    launch_task_manager()
+    main()
@@ -0,0 +1,776 @@
+"""
+A task manager server for many users at once.
+
+The tasks and users are loaded once and held in memory, shared by every
+client. Clients connect over a local socket (a Unix socket, or TCP on
+localhost with --port), log in and use the same operations as the menu.
+Reads are answered straight from memory. Changes are applied in memory
+straight away and saved by a single writer, which commits everything
+that arrives within FLUSH_INTERVAL seconds as one batch, so concurrent
+edits are never lost. If a batch can't be saved, the tasks and users are
+loaded again from the storage and its changes are refused.
+
+Protocol: one command per line, fields separated by semicolons as in
+tasks.txt. Each response starts with "OK" or "ERR <message>", then any
+output lines, and ends with a line holding a single ".". Output lines
+that start with "." get an extra "." in front. Lists of tasks are sent a
+page at a time, the first page unless another is asked for.
+
+    login;<username>;<password>
+    r;<username>;<password>                      register a user
+    a;<username>;<title>;<description>;<due>     add a task (YYYY-MM-DD)
+    va[;<page>]                                  view all tasks, by page
+    vm[;<page>]                                  view my tasks
+    vo[;<page>]                                  view overdue tasks
+    vu[;<days>[;<page>]]                         view tasks due soon
+    s;<words>[;mine][;<page>]                    search titles/descriptions
+    complete;<task number>                       mark my task complete
+    assign;<task number>;<username>              reassign my task
+    due;<task number>;<due>                      change my task's due date
+    gr                                           generate reports (admin)
+    ds                                           display statistics (admin)
+    help                                         list the commands
+    e                                            exit
+
+Example usage (from the task_manager directory):
+python task_server.py serve
+python task_server.py client
+
+"""
+
+# ====importing libraries====
+import argparse
+import asyncio
+import functools
+import os
+import socket
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import task_manager as tm
+
+# Unix socket the server listens on by default
+DEFAULT_SOCKET = "task_server.sock"
+# Seconds the writer waits for more changes to save in the same batch
+FLUSH_INTERVAL = 0.005
+# Last line of every response
+END_OF_RESPONSE = "."
+# Longest command line accepted, in bytes
+LINE_LIMIT = 1024 * 1024
+
+
+class CommandError(Exception):
+    """
+    A command that cannot be carried out, sent to the client as ERR.
+    """
+
+
+# ====Server Section====
+class TaskServer:
+    """
+    Serves the task manager to many clients from one in-memory copy of the
+    tasks and users.
+
+    Parameters
+    ----------
+    store : str, optional
+        How tasks are held in memory, see launch_task_manager, by default
+        "list".
+    page_size : int, optional
+        Number of tasks on each page of va and the other task lists, by
+        default VIEW_PAGE_SIZE.
+    flush_interval : float, optional
+        Seconds to gather changes into one batch, by default
+        FLUSH_INTERVAL.
+    """
+
+    def __init__(
+        self,
+        store: str = "list",
+        page_size: int = tm.VIEW_PAGE_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+    ):
+        self.store = store
+        self.task_list, self.task_index, self.username_password = (
+            self.read_storage()
+        )
+        self.page_size = max(page_size, 1)
+        self.flush_interval = flush_interval
+        # Changes waiting for the writer: (kind, details, future)
+        self.write_queue = asyncio.Queue()
+        # Generates the reports, one at a time, off the event loop
+        self.report_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="reports"
+        )
+        # Held to change the tasks or users in memory, and by the writer
+        # while it saves a batch, so memory holds exactly the saved
+        # changes and the batch
+        self.change_lock = asyncio.Lock()
+        self.commands = {
+            "r": self.register_user,
+            "a": self.add_task,
+            "va": self.view_all,
+            "vm": self.view_mine,
+            "vo": self.view_overdue,
+            "vu": self.view_upcoming,
+            "s": self.search_tasks,
+            "complete": self.complete_task,
+            "assign": self.assign_task,
+            "due": self.change_due_date,
+            "gr": self.generate_reports,
+            "ds": self.display_statistics,
+            "help": self.show_help,
+        }
+
+    # ----Connections----
+    async def serve(
+        self, socket_path: str | None = None, port: int | None = None
+    ):
+        """
+        Accept clients until cancelled.
+
+        Parameters
+        ----------
+        socket_path : str | None, optional
+            Unix socket to listen on, by default None.
+        port : int | None, optional
+            TCP port on localhost to listen on instead, by default None.
+        """
+        writer_task = asyncio.create_task(self.run_writer())
+        if port is not None:
+            server = await asyncio.start_server(
+                self.handle_client,
+                host="127.0.0.1",
+                port=port,
+                limit=LINE_LIMIT,
+            )
+        else:
+            # Remove a socket left behind by a server that did not stop
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            server = await asyncio.start_unix_server(
+                self.handle_client, path=socket_path, limit=LINE_LIMIT
+            )
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            writer_task.cancel()
+            self.report_executor.shutdown(wait=False)
+            if port is None and os.path.exists(socket_path):
+                os.remove(socket_path)
+
+    async def handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """
+        Run the commands sent by one client until it exits or disconnects.
+        A line longer than LINE_LIMIT is refused and the connection closed,
+        as the rest of it can't be told apart from the next command.
+        """
+        curr_user = None
+        await self.send(
+            writer,
+            ["OK", "Task manager. Log in with: login;<username>;<password>"],
+        )
+        try:
+            while line := await reader.readline():
+                # Bytes that aren't UTF-8 can't match any command or user,
+                # so are replaced rather than dropping the connection
+                line = line.decode(errors="replace")
+                command, *args = line.rstrip("\r\n").split(";")
+                command = command.lower()
+                try:
+                    if command == "e":
+                        await self.send(
+                            writer,
+                            ["OK", "You are exiting the program. Goodbye."],
+                        )
+                        break
+                    elif command == "login":
+                        curr_user = self.login(args=args)
+                        output = ["Login Successful!"]
+                    elif curr_user is None:
+                        raise CommandError("Please log in first")
+                    elif command in self.commands:
+                        output = await self.commands[command](
+                            curr_user=curr_user, args=args
+                        )
+                    else:
+                        raise CommandError("Invalid choice, see help")
+                except CommandError as error:
+                    await self.send(writer, [f"ERR {error}"])
+                else:
+                    await self.send(writer, ["OK"] + output)
+        except ValueError:
+            # Raised by readline for a line over LINE_LIMIT
+            await self.send(writer, ["ERR Line too long"])
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def send(writer: asyncio.StreamWriter, lines: list[str]):
+        """
+        Send a response, ending it with END_OF_RESPONSE.
+        """
+        response = "\n".join(lines)
+        # Stop output lines being taken for the end of the response
+        if response.startswith("."):
+            response = "." + response
+        response = response.replace("\n.", "\n..")
+        writer.write(f"{response}\n{END_OF_RESPONSE}\n".encode())
+        await writer.drain()
+
+    def read_storage(self) -> tuple[list, dict, dict]:
+        """
+        Load the tasks, task indexes and users from the storage.
+        """
+        task_list = tm.load_task_list(store=self.store)
+        task_index = tm.build_task_index(task_list=task_list)
+        username_password = tm.get_username_password(
+            user_data=tm.get_user_data()
+        )
+        return task_list, task_index, username_password
+
+    # ----Writer----
+    async def run_writer(self):
+        """
+        Save changes in batches, the only place the storage is written.
+
+        Each batch is saved on a worker thread, so reads are answered
+        meanwhile, with one commit_task_changes call for its task changes.
+        Whoever queued a change is told once it is saved. If saving fails
+        (e.g. StaleDataError, as another session saved changes first) the
+        tasks and users are loaded again from the storage, undoing the
+        batch in memory, and whoever queued a change is given the error.
+        """
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="writer"
+        )
+        try:
+            while True:
+                batch = [await self.write_queue.get()]
+                # Let changes made at about the same time join the batch
+                await asyncio.sleep(self.flush_interval)
+                async with self.change_lock:
+                    while not self.write_queue.empty():
+                        batch.append(self.write_queue.get_nowait())
+                    error = await self.save_batch(
+                        loop=loop, executor=executor, batch=batch
+                    )
+
+                for _, _, future in batch:
+                    if future.done():
+                        continue
+                    if error is not None:
+                        future.set_exception(error)
+                    else:
+                        future.set_result(None)
+        finally:
+            executor.shutdown(wait=True)
+
+    async def save_batch(
+        self, loop, executor: ThreadPoolExecutor, batch: list[tuple]
+    ) -> Exception | None:
+        """
+        Save a batch of changes, loading the tasks and users again if that
+        fails. Returns the error, if any.
+        """
+        try:
+            await loop.run_in_executor(executor, self.write_batch, batch)
+        # Keep the writer running whatever goes wrong, and pass the error
+        # on to the clients that made the changes
+        except Exception as error:
+            try:
+                self.task_list, self.task_index, self.username_password = (
+                    await loop.run_in_executor(executor, self.read_storage)
+                )
+            except Exception as load_error:
+                print(f"Could not load the tasks and users: {load_error}")
+            return error
+        return None
+
+    def write_batch(self, batch: list[tuple]):
+        """
+        Write a batch of changes to the storage, see run_writer.
+        """
+        task_changes = [
+            details for kind, details, _ in batch if kind == "task"
+        ]
+        if task_changes:
+            tm.commit_task_changes(
+                task_list=self.task_list, changes=task_changes
+            )
+        users = [details for kind, details, _ in batch if kind == "user"]
+        if users:
+            tm.STORAGE.add_users(users=users)
+
+    def queue_change(self, kind: str, details: tuple) -> asyncio.Future:
+        """
+        Queue a change for the writer, once made in memory while holding
+        change_lock.
+
+        Parameters
+        ----------
+        kind : str
+            "task" for a task change (see commit_task_changes) or "user"
+            for a new user.
+        details : tuple
+            The task change, or the username and password.
+
+        Returns
+        -------
+        asyncio.Future
+            Done once the change is saved, see save.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.write_queue.put_nowait((kind, details, future))
+        return future
+
+    @staticmethod
+    async def save(future: asyncio.Future):
+        """
+        Wait until a queued change is saved.
+        """
+        try:
+            await future
+        except Exception as error:
+            raise CommandError(f"Could not save the change: {error}")
+
+    # ----Commands----
+    def login(self, args: list[str]) -> str:
+        """
+        Check a username and password, returning the username.
+        """
+        username, password = self.check_args(args=args, count=2)
+        if username not in self.username_password:
+            raise CommandError("User does not exist")
+        elif self.username_password[username] != password:
+            raise CommandError("Wrong password")
+        return username
+
+    async def register_user(self, curr_user: str, args: list[str]) -> list:
+        """
+        Register a new user.
+        """
+        username, password = self.check_args(args=args, count=2)
+        async with self.change_lock:
+            if username in self.username_password:
+                raise CommandError(
+                    "Username already exists."
+                    " Please choose a different username."
+                )
+            self.username_password[username] = password
+            saved = self.queue_change(
+                kind="user", details=(username, password)
+            )
+        await self.save(saved)
+        return ["New user added"]
+
+    async def add_task(self, curr_user: str, args: list[str]) -> list:
+        """
+        Add a task, assigned on today's date.
+        """
+        username, title, description, due = self.check_args(
+            args=args, count=4
+        )
+        new_task = tm.Task(
+            username=username,
+            title=title,
+            description=description,
+            due_date=self.check_date(due),
+            assigned_date=date.today(),
+            completed=False,
+        )
+        async with self.change_lock:
+            if username not in self.username_password:
+                raise CommandError(
+                    "User does not exist. Please enter a valid username"
+                )
+            change = tm.append_task(
+                task_list=self.task_list,
+                task=new_task,
+                task_index=self.task_index,
+                commit=False,
+            )
+            saved = self.queue_change(kind="task", details=change)
+        await self.save(saved)
+        return [f"Task successfully added as task {change[1]}."]
+
+    async def view_all(self, curr_user: str, args: list[str]) -> list:
+        """
+        Show one page of all the tasks, the first by default.
+        """
+        self.check_max_args(args=args, count=1)
+        return self.render_page(
+            task_nums=range(len(self.task_list)), page_arg=args
+        )
+
+    async def view_mine(self, curr_user: str, args: list[str]) -> list:
+        """
+        Show one page of the tasks assigned to the user.
+        """
+        self.check_max_args(args=args, count=1)
+        user_task_nums = tm.get_user_task_nums(
+            task_index=self.task_index, username=curr_user
+        )
+        if not user_task_nums:
+            return ["You have no tasks assigned to you."]
+        return self.render_page(task_nums=user_task_nums, page_arg=args)
+
+    async def view_overdue(self, curr_user: str, args: list[str]) -> list:
+        """
+        Show one page of the uncompleted tasks due before today, earliest
+        first.
+        """
+        self.check_max_args(args=args, count=1)
+        task_nums = tm.get_due_task_nums(
+            task_index=self.task_index,
+            due_to=date.today() - timedelta(days=1),
+        )
+        if not task_nums:
+            return ["There are no overdue tasks."]
+        return self.render_page(task_nums=task_nums, page_arg=args)
+
+    async def view_upcoming(self, curr_user: str, args: list[str]) -> list:
+        """
+        Show one page of the uncompleted tasks due in the next
+        UPCOMING_DAYS days, or the number of days given, earliest first.
+        """
+        self.check_max_args(args=args, count=2)
+        days = self.check_int(args[0]) if args else tm.UPCOMING_DAYS
+        # Up to ten years, well inside the dates a date can hold
+        if not 0 <= days <= 3650:
+            raise CommandError("Days must be 0 to 3650")
+        today = date.today()
+        task_nums = tm.get_due_task_nums(
+            task_index=self.task_index,
+            due_from=today,
+            due_to=today + timedelta(days=days),
+        )
+        if not task_nums:
+            return [f"No tasks are due in the next {days} days."]
+        return self.render_page(task_nums=task_nums, page_arg=args[1:])
+
+    async def search_tasks(self, curr_user: str, args: list[str]) -> list:
+        """
+        Show one page of the tasks with every word searched for in their
+        title or description, only the user's own with "mine".
+        """
+        mine = args[1:2] == ["mine"]
+        page_arg = args[2:] if mine else args[1:]
+        if not args or len(page_arg) > 1:
+            raise CommandError("Use s;<words>[;mine][;<page>]")
+        task_nums = tm.search_task_nums(
+            task_list=self.task_list,
+            task_index=self.task_index,
+            query=args[0],
+            username=curr_user if mine else None,
+        )
+        if not task_nums:
+            return ["No tasks match your search."]
+        return self.render_page(task_nums=task_nums, page_arg=page_arg)
+
+    def render_page(
+        self, task_nums: Sequence[int], page_arg: list[str]
+    ) -> list:
+        """
+        Show one page of a list of tasks, the page given or the first.
+
+        Parameters
+        ----------
+        task_nums : Sequence[int]
+            Numbers of all the tasks in the list, in order.
+        page_arg : list[str]
+            The page number field, or no fields for the first page.
+        """
+        task_count = len(task_nums)
+        page_count = max(-(-task_count // self.page_size), 1)
+        page_num = self.check_int(page_arg[0]) if page_arg else 1
+        if not 1 <= page_num <= page_count:
+            raise CommandError(f"Page must be 1 to {page_count}")
+        start = (page_num - 1) * self.page_size
+        page = tm.render_task_page(
+            task_list=self.task_list,
+            task_nums=task_nums[start : start + self.page_size],
+            task_index=self.task_index,
+        )
+        return page.splitlines() + [f"Page {page_num} of {page_count}"]
+
+    async def complete_task(self, curr_user: str, args: list[str]) -> list:
+        """
+        Mark one of the user's tasks as complete.
+        """
+        (task_num,) = self.check_args(args=args, count=1)
+        await self.update_user_task(
+            curr_user=curr_user,
+            task_num=self.check_int(task_num),
+            field="completed",
+            value=True,
+        )
+        return ["Task successfully marked as complete."]
+
+    async def assign_task(self, curr_user: str, args: list[str]) -> list:
+        """
+        Reassign one of the user's tasks to another user.
+        """
+        task_num, username = self.check_args(args=args, count=2)
+        await self.update_user_task(
+            curr_user=curr_user,
+            task_num=self.check_int(task_num),
+            field="username",
+            value=username,
+        )
+        return [f"Task reassigned to {username}."]
+
+    async def change_due_date(self, curr_user: str, args: list[str]) -> list:
+        """
+        Change the due date of one of the user's tasks.
+        """
+        task_num, due = self.check_args(args=args, count=2)
+        await self.update_user_task(
+            curr_user=curr_user,
+            task_num=self.check_int(task_num),
+            field="due_date",
+            value=self.check_date(due),
+        )
+        return ["Due date updated."]
+
+    async def update_user_task(
+        self, curr_user: str, task_num: int, field: str, value
+    ):
+        """
+        Change a field of one of the user's tasks, as view_mine allows.
+        """
+        async with self.change_lock:
+            if field == "username" and value not in self.username_password:
+                raise CommandError("User does not exist")
+            if task_num not in tm.get_user_task_nums(
+                task_index=self.task_index, username=curr_user
+            ):
+                raise CommandError("Task number not one of your tasks")
+            if self.task_list[task_num].completed:
+                raise CommandError(
+                    "This task is complete and cannot be edited."
+                )
+            change = tm.update_task(
+                task_list=self.task_list,
+                task_num=task_num,
+                field=field,
+                value=value,
+                task_index=self.task_index,
+                commit=False,
+            )
+            saved = self.queue_change(kind="task", details=change)
+        await self.save(saved)
+
+    async def generate_reports(self, curr_user: str, args: list[str]) -> list:
+        """
+        Write task_overview.txt and user_overview.txt (admin only).
+        """
+        self.check_admin(curr_user=curr_user)
+        await self.build_reports()
+        return ["Reports generated."]
+
+    async def display_statistics(
+        self, curr_user: str, args: list[str]
+    ) -> list:
+        """
+        Generate the reports and send them as ds shows them (admin only).
+        """
+        self.check_admin(curr_user=curr_user)
+        task_overview, user_overview = await self.build_reports()
+        return tm.format_reports(
+            task_overview=task_overview, user_overview=user_overview
+        ).splitlines()
+
+    async def build_reports(self) -> tuple[str, str]:
+        """
+        Generate and write the reports on report_executor, from a snapshot
+        of the task stats taken now, so other clients are answered
+        meanwhile. The report cache isn't used, as memory can hold changes
+        the writer hasn't saved yet.
+
+        Returns
+        -------
+        tuple[str, str]
+            The task and user overview reports.
+        """
+        curr_date = date.today()
+        stats = tm.stats_snapshot(
+            stats=self.task_index["stats"], curr_date=curr_date
+        )
+        return await asyncio.get_running_loop().run_in_executor(
+            self.report_executor,
+            functools.partial(
+                tm.build_reports,
+                stats=stats,
+                usernames=tuple(self.username_password),
+                curr_date=curr_date,
+                signature=None,
+            ),
+        )
+
+    async def show_help(self, curr_user: str, args: list[str]) -> list:
+        """
+        List the commands, from the module docstring.
+        """
+        return [
+            line.strip()
+            for line in __doc__.splitlines()
+            if line.startswith("    ")
+        ]
+
+    # ----Checks----
+    @staticmethod
+    def check_args(args: list[str], count: int) -> list[str]:
+        """
+        Check a command was given the right number of fields.
+        """
+        if len(args) != count:
+            raise CommandError(f"Expected {count} fields, see help")
+        return args
+
+    @staticmethod
+    def check_max_args(args: list[str], count: int):
+        """
+        Check a command was given no more than its optional fields.
+        """
+        if len(args) > count:
+            raise CommandError(f"Expected up to {count} fields, see help")
+
+    @staticmethod
+    def check_int(value: str) -> int:
+        """
+        Convert a field to an integer.
+        """
+        try:
+            return int(value)
+        except ValueError:
+            raise CommandError("Invalid input, please input an integer.")
+
+    @staticmethod
+    def check_date(value: str) -> date:
+        """
+        Convert a field in DATE_STRING_FORMAT to a date.
+        """
+        try:
+            return tm.parse_date(value)
+        except ValueError:
+            raise CommandError(
+                "Invalid date format. Please use the format specified."
+            )
+
+    @staticmethod
+    def check_admin(curr_user: str):
+        """
+        Only allow admin to run a command.
+        """
+        if curr_user != "admin":
+            raise CommandError("Only admin can do this")
+
+
+# ====Client Section====
+def run_client(socket_path: str | None = None, port: int | None = None):
+    """
+    A terminal client: send each line typed and print the response.
+
+    Parameters
+    ----------
+    socket_path : str | None, optional
+        Unix socket of the server, by default None.
+    port : int | None, optional
+        TCP port on localhost of the server instead, by default None.
+    """
+    if port is not None:
+        client = socket.create_connection(("127.0.0.1", port))
+    else:
+        client = socket.socket(socket.AF_UNIX)
+        client.connect(socket_path)
+
+    with client, client.makefile("rw", encoding="utf-8") as server:
+        while True:
+            # Print the response up to its last line
+            for line in server:
+                line = line.rstrip("\n")
+                if line == END_OF_RESPONSE:
+                    break
+                print(line[1:] if line.startswith("..") else line)
+            else:
+                # Server closed the connection
+                return
+            try:
+                command = input("> ")
+            except EOFError:
+                command = "e"
+            server.write(command + "\n")
+            server.flush()
+
+
+# ====Main code====
+def main():
+    """
+    Parse the command line and run the server or client.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip(),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--socket",
+        default=DEFAULT_SOCKET,
+        help=f"Unix socket to use, by default {DEFAULT_SOCKET}",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        help="use TCP on localhost with this port instead of a Unix socket",
+    )
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="run the server")
+    serve_parser.add_argument(
+        "--store", choices=["list", "columnar"], default="list"
+    )
+    serve_parser.add_argument(
+        "--storage", choices=list(tm.STORAGE_TYPES), default="text"
+    )
+    serve_parser.add_argument(
+        "--page-size", type=int, default=tm.VIEW_PAGE_SIZE
+    )
+    serve_parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=FLUSH_INTERVAL,
+        help="seconds to gather changes into one write",
+    )
+    subparsers.add_parser("client", help="connect to a running server")
+
+    args = parser.parse_args()
+    # Unix sockets are not available everywhere, e.g. older Windows
+    if args.port is None and not hasattr(socket, "AF_UNIX"):
+        parser.error("Unix sockets are not supported here, use --port")
+
+    if args.mode == "serve":
+        tm.set_storage(tm.STORAGE_TYPES[args.storage]())
+        server = TaskServer(
+            store=args.store,
+            page_size=args.page_size,
+            flush_interval=args.flush_interval,
+        )
+        where = args.socket if args.port is None else f"port {args.port}"
+        print(f"Serving {len(server.task_list)} tasks on {where}")
+        try:
+            asyncio.run(server.serve(socket_path=args.socket, port=args.port))
+        except KeyboardInterrupt:
+            pass
+    else:
+        run_client(socket_path=args.socket, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
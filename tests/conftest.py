@@ -0,0 +1,104 @@
+"""
+Shared fixtures for the task manager tests.
+
+The modules live in the task_manager directory and are run from there, so
+it is put on the import path. Every test runs in its own temporary
+directory, as the storage files are found relative to the working
+directory.
+"""
+
+# ====importing libraries====
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "task_manager",
+    ),
+)
+
+import task_manager as tm  # noqa: E402
+
+# Tasks to start from, including one assigned to a user missing from
+# user.txt
+TASK_LINES = [
+    "admin;Add tasks;Add the first tasks;2020-01-10;2020-01-01;No",
+    "user1;Fix leaking tap;Plumbing job;2099-05-01;2020-01-02;No",
+    "user1;Write report;Quarterly report;2020-02-01;2020-01-03;Yes",
+    "user2;Paint fence;Two coats;2020-03-15;2020-01-04;No",
+    "ghost;Old task;Left by a removed user;2020-04-01;2020-01-05;No",
+]
+USER_LINES = ["admin;password", "user1;pw1", "user2;pw2"]
+
+
+def pytest_addoption(parser):
+    """
+    Add the --report-tasks option, the size of the generated data the
+    reports are checked against the baseline with.
+    """
+    parser.addoption(
+        "--report-tasks",
+        type=int,
+        default=10000,
+        help="tasks to generate for the report tests, e.g. 5000000",
+    )
+
+
+def task_fields(task_list) -> list[tuple]:
+    """
+    Get the fields of every task, to compare task lists of any kind.
+    """
+    return [
+        tuple(getattr(t, field) for field in tm.TASK_FIELDS) for t in task_list
+    ]
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """
+    Run the test in a temporary directory holding TASK_LINES and
+    USER_LINES, with the text storage.
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "tasks.txt").write_text("\n".join(TASK_LINES))
+    (tmp_path / "user.txt").write_text("\n".join(USER_LINES))
+    monkeypatch.setattr(tm, "STORAGE", tm.FlatFileStorage())
+    monkeypatch.setattr(tm, "REPORT_CACHE", tm.ReportCache())
+    return tmp_path
+
+
+@pytest.fixture(params=sorted(tm.STORAGE_TYPES))
+def storage(request, data_dir, monkeypatch):
+    """
+    Each kind of storage, holding the tasks and users in data_dir.
+    """
+    if request.param != "text":
+        tm.migrate_storage(
+            source=tm.FlatFileStorage(),
+            target=tm.STORAGE_TYPES[request.param](),
+        )
+    storage = tm.STORAGE_TYPES[request.param]()
+    monkeypatch.setattr(tm, "STORAGE", storage)
+    return storage
+
+
+@pytest.fixture
+def script(monkeypatch):
+    """
+    Script the console. Call with the lines to type to get a StringIO
+    that everything printed is written to.
+    """
+
+    def set_inputs(*inputs: str) -> io.StringIO:
+        output = io.StringIO()
+        monkeypatch.setattr(
+            tm, "CONSOLE", tm.ScriptedConsole(inputs=inputs, output=output)
+        )
+        return output
+
+    return set_inputs
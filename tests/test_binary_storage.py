@@ -0,0 +1,79 @@
+"""
+Tests of the binary storage's in-place record patches and the change
+count in the task file header.
+"""
+
+# ====importing libraries====
+import os
+
+import pytest
+
+import task_manager as tm
+from conftest import task_fields
+
+
+@pytest.fixture
+def storage(data_dir, monkeypatch):
+    """
+    A binary storage holding the tasks and users in data_dir.
+    """
+    tm.migrate_storage(source=tm.FlatFileStorage(), target=tm.BinaryStorage())
+    storage = tm.BinaryStorage()
+    monkeypatch.setattr(tm, "STORAGE", storage)
+    return storage
+
+
+def test_patches_counted(storage):
+    """
+    Every save that patches records, and every rewrite of the files, adds
+    one to the change count.
+    """
+    task_list = tm.load_task_list()
+    start_count = storage.read_change_count()
+
+    tm.append_task(
+        task_list=task_list,
+        task=tm.parse_task("user1;New;Added;2030-01-01;2021-01-01;No"),
+    )
+    assert storage.read_change_count() == start_count
+    tm.update_task(
+        task_list=task_list, task_num=0, field="completed", value=True
+    )
+    assert storage.read_change_count() == start_count + 1
+    tm.write_task_list(task_list=task_list)
+    assert storage.read_change_count() == start_count + 2
+    assert storage.tasks_current()
+    assert task_fields(tm.BinaryStorage().load_task_store()) == task_fields(
+        task_list
+    )
+
+
+def test_patch_seen_with_same_mtime(storage):
+    """
+    A field patched by another session is noticed, and loaded by
+    refresh_task_list, even if the task file's modification time and size
+    are unchanged, e.g. two saves within one clock tick.
+    """
+    task_list = tm.load_task_list()
+    task_index = tm.build_task_index(task_list=task_list)
+    old_stat = os.stat(storage.task_file)
+
+    other_session = tm.BinaryStorage()
+    other_tasks = [
+        tm.parse_task(t_str) for t_str in other_session.iter_task_data()
+    ]
+    other_tasks[3].completed = True
+    other_session.commit(
+        task_list=other_tasks, changes=[("set", 3, "completed", True)]
+    )
+    os.utime(
+        storage.task_file, ns=(old_stat.st_atime_ns, old_stat.st_mtime_ns)
+    )
+    assert os.stat(storage.task_file).st_mtime_ns == old_stat.st_mtime_ns
+
+    assert not storage.tasks_current()
+    task_list, task_index = tm.refresh_task_list(
+        task_list=task_list, task_index=task_index
+    )
+    assert storage.tasks_current()
+    assert task_fields(task_list) == task_fields(other_tasks)
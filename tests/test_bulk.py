@@ -0,0 +1,195 @@
+"""
+Tests of changing many tasks at once: the filters, the single commit and
+dry runs, from the menu and the command line.
+"""
+
+# ====importing libraries====
+from datetime import date
+
+import pytest
+
+import benchmark
+import task_manager as tm
+from conftest import TASK_LINES
+
+
+def counted_commits(monkeypatch) -> list[int]:
+    """
+    Count the changes in each commit of task changes.
+    """
+    commits = []
+    commit_task_changes = tm.commit_task_changes
+
+    def counted_commit(task_list, changes):
+        commits.append(len(changes))
+        commit_task_changes(task_list=task_list, changes=changes)
+
+    monkeypatch.setattr(tm, "commit_task_changes", counted_commit)
+    return commits
+
+
+@pytest.mark.parametrize(
+    "filters, expected",
+    [
+        ({}, [0, 1, 2, 3, 4]),
+        ({"username": "user1"}, [1, 2]),
+        ({"username": "user1", "completed": True}, [2]),
+        ({"completed": False}, [0, 1, 3, 4]),
+        ({"completed": False, "due_to": date(2020, 3, 31)}, [0, 3]),
+        (
+            {"due_from": date(2020, 2, 1), "due_to": date(2020, 4, 1)},
+            [2, 3, 4],
+        ),
+        ({"username": "nobody"}, []),
+    ],
+)
+@pytest.mark.parametrize("store", ["list", "columnar"])
+def test_filters(data_dir, store, filters, expected):
+    """
+    Each filter picks out the matching tasks in task number order.
+    """
+    task_list = tm.load_task_list(store=store)
+    task_index = tm.build_task_index(task_list=task_list)
+
+    assert (
+        tm.select_task_nums(
+            task_list=task_list, task_index=task_index, **filters
+        )
+        == expected
+    )
+
+
+@pytest.mark.parametrize("store", ["list", "columnar"])
+def test_filters_match_a_scan(data_dir, store):
+    """
+    On generated tasks, the filters pick the same tasks as checking every
+    task.
+    """
+    benchmark.write_synthetic_data(
+        tasks=2000, users=10, today=date(2024, 6, 1)
+    )
+    task_list = tm.load_task_list(store=store)
+    task_index = tm.build_task_index(task_list=task_list)
+    due_from, due_to = date(2024, 3, 1), date(2024, 8, 31)
+
+    for username in (None, "user3"):
+        for completed in (None, True, False):
+            expected = [
+                task_num
+                for task_num, t in enumerate(task_list)
+                if username in (None, t.username)
+                and completed in (None, t.completed)
+                and due_from <= t.due_date <= due_to
+            ]
+            assert expected
+            assert (
+                tm.select_task_nums(
+                    task_list=task_list,
+                    task_index=task_index,
+                    username=username,
+                    due_from=due_from,
+                    due_to=due_to,
+                    completed=completed,
+                )
+                == expected
+            )
+
+
+def test_update_saved_in_one_commit(storage, monkeypatch):
+    """
+    Every change is saved in a single commit, tasks that already have the
+    value are left alone, and a dry run only counts.
+    """
+    commits = counted_commits(monkeypatch)
+    task_list = tm.load_task_list()
+    task_index = tm.build_task_index(task_list=task_list)
+    every_task = range(len(task_list))
+
+    assert (
+        tm.bulk_update_tasks(
+            task_list=task_list,
+            task_nums=every_task,
+            field="completed",
+            value=True,
+            dry_run=True,
+        )
+        == 4
+    )
+    assert commits == []
+    assert not task_list[0].completed
+
+    assert (
+        tm.bulk_update_tasks(
+            task_list=task_list,
+            task_nums=every_task,
+            field="completed",
+            value=True,
+            task_index=task_index,
+        )
+        == 4
+    )
+    assert commits == [4]
+    assert tm.get_due_task_nums(task_index=task_index) == []
+    stored = type(storage)().load_task_store()
+    assert all(t.completed for t in stored)
+
+    with pytest.raises(ValueError):
+        tm.bulk_update_tasks(
+            task_list=task_list,
+            task_nums=every_task,
+            field="title",
+            value="Renamed",
+        )
+
+
+def test_bulk_update_menu(data_dir, script, monkeypatch):
+    """
+    The admin chooses the tasks and the change, sees how many tasks will
+    change and confirms.
+    """
+    commits = counted_commits(monkeypatch)
+    task_list = tm.load_task_list()
+    task_index = tm.build_task_index(task_list=task_list)
+    username_password = tm.get_username_password(tm.get_user_data())
+    # user1's uncompleted tasks, reassigned to user2
+    output = script("user1", "", "", "n", "ra", "user2", "y")
+
+    tm.bulk_update(
+        task_list=task_list,
+        username_password=username_password,
+        task_index=task_index,
+    )
+
+    assert "1 tasks match." in output.getvalue()
+    assert "1 tasks will change." in output.getvalue()
+    assert commits == [1]
+    assert tm.load_task_list()[1].username == "user2"
+    assert tm.get_user_task_nums(task_index=task_index, username="user2") == [
+        1,
+        3,
+    ]
+
+    # Nothing is saved without confirming
+    output = script("", "", "", "", "rs", "2040-01-01", "n")
+    tm.bulk_update(task_list=task_list, username_password=username_password)
+    assert "5 tasks will change." in output.getvalue()
+    assert commits == [1]
+
+
+def test_bulk_command(data_dir, script):
+    """
+    The bulk command reports the matching and changed tasks, and saves
+    nothing with --dry-run.
+    """
+    output = script()
+    args = ["bulk", "--user", "user1", "--completed", "no", "--complete"]
+
+    tm.main(args + ["--dry-run"])
+    assert output.getvalue() == "1 tasks match, 1 would change.\n"
+    assert not tm.load_task_list()[1].completed
+
+    tm.main(args)
+    assert output.getvalue().endswith("1 tasks match, 1 changed.\n")
+    task_list = tm.load_task_list()
+    assert task_list[1].completed
+    assert len(task_list) == len(TASK_LINES)
@@ -0,0 +1,92 @@
+"""
+Tests that parse_date gives the same dates and errors as
+datetime.strptime with DATE_STRING_FORMAT.
+"""
+
+# ====importing libraries====
+from datetime import datetime
+
+import pytest
+
+import task_manager as tm
+
+
+def strptime_date(date_str: str):
+    """
+    Parse a date the way get_task_list did before parse_date.
+    """
+    return datetime.strptime(date_str, tm.DATE_STRING_FORMAT).date()
+
+
+@pytest.fixture(autouse=True)
+def clear_date_cache():
+    """
+    Start each test with no dates cached.
+    """
+    tm.parse_date.cache_clear()
+
+
+@pytest.mark.parametrize(
+    "date_str",
+    [
+        "2021-01-01",
+        "2020-02-29",
+        "1999-12-31",
+        "0001-01-01",
+        "9999-12-31",
+        "2024-3-7",
+        "2024-12-1",
+        "2024-1-10",
+    ],
+)
+def test_parse_date_matches_strptime(date_str):
+    """
+    Padded and unpadded dates parse to the same date as strptime, whether
+    or not they are already cached.
+    """
+    expected = strptime_date(date_str)
+    assert tm.parse_date(date_str) == expected
+    assert tm.parse_date(date_str) == expected
+
+
+@pytest.mark.parametrize(
+    "date_str",
+    [
+        "2021-02-30",
+        "2021-02-29",
+        "2021-13-01",
+        "2021-00-10",
+        "2021-01-32",
+        "0000-01-01",
+        "2021/01/01",
+        "21-01-01",
+        "2021-01-01 ",
+        "",
+        "not a date",
+        "٢٠٢١-٠١-٠١",
+    ],
+)
+def test_parse_date_rejects_invalid(date_str):
+    """
+    Invalid dates raise ValueError, as they do with strptime.
+    """
+    with pytest.raises(ValueError):
+        strptime_date(date_str)
+    with pytest.raises(ValueError):
+        tm.parse_date(date_str)
+    # Failures aren't cached, so a second try fails the same way
+    with pytest.raises(ValueError):
+        tm.parse_date(date_str)
+
+
+def test_parse_date_many_dates():
+    """
+    Every day over several years, padded and not, parses as strptime does.
+    """
+    first = strptime_date("2019-12-01").toordinal()
+    for ordinal in range(first, first + 4 * 366):
+        day = datetime.fromordinal(ordinal).date()
+        padded = day.strftime(tm.DATE_STRING_FORMAT)
+        unpadded = f"{day.year}-{day.month}-{day.day}"
+        assert tm.parse_date(padded) == strptime_date(padded) == day
+        assert tm.parse_date(unpadded) == strptime_date(unpadded) == day
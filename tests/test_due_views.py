@@ -0,0 +1,161 @@
+"""
+Tests of view_overdue, view_upcoming and the due date index behind them.
+"""
+
+# ====importing libraries====
+import random
+import re
+from datetime import date, timedelta
+
+import pytest
+
+import task_manager as tm
+
+
+def shown_task_nums(output) -> list[int]:
+    """
+    Get the numbers of the tasks shown, in the order shown.
+    """
+    return [
+        int(task_num)
+        for task_num in re.findall(
+            r"Task Number: \t (\d+)", output.getvalue()
+        )
+    ]
+
+
+def add_task(task_list, task_index, days: int, completed: bool = False):
+    """
+    Add a task for user1 due a number of days from today.
+    """
+    due_date = date.today() + timedelta(days=days)
+    tm.append_task(
+        task_list=task_list,
+        task=tm.Task(
+            username="user1",
+            title=f"Due in {days} days",
+            description="Added by a test",
+            due_date=due_date,
+            assigned_date=date(2021, 1, 1),
+            completed=completed,
+        ),
+        task_index=task_index,
+        commit=False,
+    )
+
+
+def test_overdue_earliest_first(data_dir, script):
+    """
+    Uncompleted tasks due before today are shown earliest due first,
+    including tasks of users no longer in user.txt.
+    """
+    task_list = tm.load_task_list()
+    task_index = tm.build_task_index(task_list=task_list)
+    add_task(task_list=task_list, task_index=task_index, days=-1)
+    add_task(task_list=task_list, task_index=task_index, days=0)
+    output = script()
+
+    tm.view_overdue(task_list=task_list, task_index=task_index, page_size=0)
+
+    assert "4 overdue tasks, earliest due first" in output.getvalue()
+    assert shown_task_nums(output) == [0, 3, 4, 5]
+
+
+def test_upcoming(data_dir, script):
+    """
+    Uncompleted tasks due from today to the number of days ahead are
+    shown earliest due first.
+    """
+    task_list = tm.load_task_list()
+    task_index = tm.build_task_index(task_list=task_list)
+    # Tasks 5 to 10
+    for days in (8, 3, 0, -1):
+        add_task(task_list=task_list, task_index=task_index, days=days)
+    add_task(
+        task_list=task_list, task_index=task_index, days=1, completed=True
+    )
+    add_task(task_list=task_list, task_index=task_index, days=7)
+
+    output = script()
+    tm.view_upcoming(task_list=task_list, task_index=task_index, page_size=0)
+    assert "3 tasks due in the next 7 days" in output.getvalue()
+    assert shown_task_nums(output) == [7, 6, 10]
+
+    output = script()
+    tm.view_upcoming(task_list=task_list, days=0, page_size=0)
+    assert shown_task_nums(output) == [7]
+
+    output = script()
+    tm.view_upcoming(task_list=tm.load_task_list(), page_size=0)
+    assert output.getvalue() == "\nNo tasks are due in the next 7 days.\n"
+
+
+def test_no_overdue_tasks(data_dir, script):
+    """
+    A message is shown when no tasks are overdue.
+    """
+    output = script()
+    tm.view_overdue(task_list=[], page_size=0)
+
+    assert output.getvalue() == "\nThere are no overdue tasks.\n"
+
+
+@pytest.mark.parametrize("store", ["list", "columnar"])
+def test_due_index_kept_up_to_date(data_dir, store):
+    """
+    After tasks are added, completed, reopened and rescheduled, the due
+    date index and stats are the same as ones built from scratch.
+    """
+    task_list = tm.load_task_list(store=store)
+    task_index = tm.build_task_index(task_list=task_list)
+    rng = random.Random(0)
+
+    for _ in range(300):
+        if rng.random() < 0.2:
+            add_task(
+                task_list=task_list,
+                task_index=task_index,
+                days=rng.randint(-5, 5),
+                completed=rng.random() < 0.3,
+            )
+            continue
+        field, value = rng.choice(
+            [
+                ("completed", True),
+                ("completed", False),
+                ("due_date", date.today() + timedelta(rng.randint(-5, 5))),
+                ("username", rng.choice(["user1", "user2"])),
+            ]
+        )
+        tm.update_task(
+            task_list=task_list,
+            task_num=rng.randrange(len(task_list)),
+            field=field,
+            value=value,
+            task_index=task_index,
+            commit=False,
+        )
+
+    rebuilt = tm.build_task_index(task_list=task_list)
+    assert task_index["due_dates"] == rebuilt["due_dates"]
+    assert task_index["by_due"] == rebuilt["by_due"]
+    # Users whose tasks were all reassigned keep an empty list
+    assert {
+        username: task_nums
+        for username, task_nums in task_index["by_user"].items()
+        if task_nums
+    } == rebuilt["by_user"]
+    assert tm.get_due_task_nums(task_index=task_index) == [
+        task_num
+        for task_num in sorted(
+            range(len(task_list)),
+            key=lambda task_num: task_list[task_num].due_date,
+        )
+        if not task_list[task_num].completed
+    ]
+    usernames = ("admin", "user1", "user2")
+    assert tm.stats_counts(
+        stats=task_index["stats"], usernames=usernames, curr_date=date.today()
+    ) == tm.count_tasks(
+        task_list=task_list, usernames=usernames, curr_date=date.today()
+    )
@@ -0,0 +1,60 @@
+"""
+Tests of the task journal: saved changes are appended to it, applied by
+every loader and folded back into tasks.txt.
+"""
+
+# ====importing libraries====
+import task_manager as tm
+from conftest import task_fields
+
+
+def new_task(title: str) -> tm.Task:
+    """
+    Make a task for user2 with the given title.
+    """
+    return tm.parse_task(
+        f"user2;{title};Added later;2030-01-01;2021-01-01;No"
+    )
+
+
+def test_loaders_apply_journal(data_dir):
+    """
+    Changes saved to the task journal are applied by every loader.
+    """
+    task_list = tm.load_task_list()
+    tm.append_task(task_list=task_list, task=new_task("New task"))
+    tm.update_task(
+        task_list=task_list, task_num=0, field="completed", value=True
+    )
+    assert (data_dir / tm.TASK_JOURNAL_FILE).exists()
+
+    assert task_fields(tm.load_task_list(store="list")) == task_fields(
+        task_list
+    )
+    assert task_fields(tm.load_task_list(store="columnar")) == task_fields(
+        task_list
+    )
+
+
+def test_journal_compaction(data_dir, monkeypatch):
+    """
+    The task journal is folded back into tasks.txt once it reaches
+    JOURNAL_COMPACT_THRESHOLD entries.
+    """
+    monkeypatch.setattr(tm, "JOURNAL_COMPACT_THRESHOLD", 3)
+    journal = data_dir / tm.TASK_JOURNAL_FILE
+    task_list = tm.load_task_list()
+
+    tm.append_task(task_list=task_list, task=new_task("Journalled"))
+    tm.update_task(
+        task_list=task_list, task_num=0, field="completed", value=True
+    )
+    assert len(journal.read_text().splitlines()) == 2
+    tm.update_task(
+        task_list=task_list, task_num=1, field="completed", value=True
+    )
+
+    assert not journal.exists()
+    saved_lines = (data_dir / "tasks.txt").read_text().splitlines()
+    assert saved_lines == [tm.format_task(task=t) for t in task_list]
+    assert task_fields(tm.load_task_list()) == task_fields(task_list)
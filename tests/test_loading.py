@@ -0,0 +1,35 @@
+"""
+Tests of loading tasks.txt one line at a time.
+"""
+
+# ====importing libraries====
+import task_manager as tm
+from conftest import TASK_LINES, task_fields
+
+
+def test_loaders_agree(data_dir):
+    """
+    Streaming the tasks gives the same tasks as reading tasks.txt whole.
+    """
+    expected = [tm.parse_task(t_str) for t_str in TASK_LINES]
+
+    assert task_fields(tm.load_task_list(store="list")) == task_fields(
+        expected
+    )
+    assert task_fields(tm.iter_tasks()) == task_fields(expected)
+    assert task_fields(
+        tm.get_task_list(task_data=tm.get_task_data())
+    ) == task_fields(expected)
+
+
+def test_blank_lines_skipped(data_dir):
+    """
+    Blank lines and missing line endings in tasks.txt are ignored.
+    """
+    (data_dir / "tasks.txt").write_text(
+        "\n\n" + "\n\n".join(TASK_LINES) + "\n\n"
+    )
+    task_data = tm.iter_task_data()
+
+    assert next(task_data) == TASK_LINES[0]
+    assert list(task_data) == TASK_LINES[1:]
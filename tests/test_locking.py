@@ -0,0 +1,101 @@
+"""
+Tests of sessions sharing the storage: the storage lock, saving over
+other sessions' changes, and many writers at once.
+"""
+
+# ====importing libraries====
+import pytest
+
+import benchmark
+import task_manager as tm
+from conftest import TASK_LINES
+
+
+def new_task(title: str) -> tm.Task:
+    """
+    Make a task for user1 with the given title.
+    """
+    return tm.parse_task(
+        f"user1;{title};Added by a test;2030-01-01;2021-01-01;No"
+    )
+
+
+def session_tasks(session) -> list[tm.Task]:
+    """
+    Load the tasks straight from another session's storage.
+    """
+    return [tm.parse_task(t_str) for t_str in session.iter_task_data()]
+
+
+def test_stale_commit_raises(storage):
+    """
+    A session can't save over changes another session saved after it
+    loaded the tasks, and can once it has reloaded them.
+    """
+    task_list = tm.load_task_list()
+    task_index = tm.build_task_index(task_list=task_list)
+
+    other_session = type(storage)()
+    other_tasks = session_tasks(other_session)
+    other_tasks.append(new_task("Saved first"))
+    other_session.commit(
+        task_list=other_tasks,
+        changes=[("add", len(other_tasks) - 1, other_tasks[-1])],
+    )
+
+    with pytest.raises(tm.StaleDataError):
+        tm.append_task(
+            task_list=task_list,
+            task=new_task("Saved second"),
+            task_index=task_index,
+        )
+
+    task_list, task_index = tm.refresh_task_list(
+        task_list=task_list, task_index=task_index, full=True
+    )
+    tm.append_task(
+        task_list=task_list,
+        task=new_task("Saved second"),
+        task_index=task_index,
+    )
+    titles = [t.title for t in tm.load_task_list()]
+    assert titles[-2:] == ["Saved first", "Saved second"]
+
+
+def test_lock_upgrade_refused(data_dir):
+    """
+    An exclusive hold of the storage lock can't be nested in a shared one.
+    """
+    with tm.STORAGE_LOCK.hold():
+        with tm.STORAGE_LOCK.hold(shared=True):
+            pass
+    with tm.STORAGE_LOCK.hold(shared=True):
+        with pytest.raises(RuntimeError):
+            with tm.STORAGE_LOCK.hold():
+                pass
+    assert tm.STORAGE_LOCK.depth == 0
+
+
+def test_partly_read_tasks_release_lock(data_dir):
+    """
+    Reading tasks doesn't keep the lock held between tasks, and a partly
+    read snapshot isn't changed by later saves.
+    """
+    task_data = tm.STORAGE.iter_task_data()
+    first = next(task_data)
+    assert tm.STORAGE_LOCK.depth == 0
+
+    other_session = tm.FlatFileStorage()
+    other_tasks = session_tasks(other_session)
+    other_session.write_tasks(task_list=other_tasks[:1])
+
+    assert [first, *task_data] == TASK_LINES
+
+
+def test_stress(data_dir, monkeypatch):
+    """
+    Many writer processes adding tasks at once lose or duplicate nothing.
+    """
+    # The benchmark chooses the storage itself
+    monkeypatch.setattr(tm, "STORAGE", tm.STORAGE)
+    benchmark.bench_stress(workers=4, adds=25, tasks=100)
@@ -0,0 +1,127 @@
+"""
+Tests of the opt-in metrics: timers, byte counts, the output formats and
+turning them on from the command line.
+"""
+
+# ====importing libraries====
+import json
+import threading
+
+import pytest
+
+import session_replay
+import task_manager as tm
+
+
+@pytest.fixture
+def metrics(data_dir, monkeypatch):
+    """
+    Enabled metrics, used by the task manager functions.
+    """
+    metrics = tm.Metrics(enabled=True)
+    monkeypatch.setattr(tm, "METRICS", metrics)
+    return metrics
+
+
+def test_disabled_records_nothing(data_dir):
+    """
+    Metrics record nothing unless enabled.
+    """
+    metrics = tm.Metrics()
+    with metrics.timer(name="load"):
+        metrics.add_bytes(read=10)
+    assert metrics.stats == {}
+    assert metrics.bytes_read == 0
+
+
+def test_instrumented_calls_and_bytes(metrics):
+    """
+    Instrumented functions are counted, and bytes are added to every timer
+    running at the time.
+    """
+    task_list = tm.load_task_list()
+    with metrics.action(action="a"):
+        tm.append_task(
+            task_list=task_list,
+            task=tm.parse_task("user1;New;Added;2030-01-01;2021-01-01;No"),
+        )
+    tm.load_task_list()
+
+    assert metrics.stats["load_task_list"]["calls"] == 2
+    assert metrics.stats["load_task_list"]["bytes_read"] > 0
+    commit_stats = metrics.stats["commit_task_changes"]
+    action_stats = metrics.stats["menu_a"]
+    assert commit_stats["calls"] == action_stats["calls"] == 1
+    assert commit_stats["bytes_written"] > 0
+    assert action_stats["bytes_written"] == commit_stats["bytes_written"]
+    assert metrics.bytes_written == commit_stats["bytes_written"]
+    assert action_stats["seconds"] >= commit_stats["seconds"]
+
+
+def test_timers_per_thread(metrics):
+    """
+    Bytes counted on another thread aren't added to this thread's timers.
+    """
+    with metrics.timer(name="menu_ds"):
+        worker = threading.Thread(target=lambda: metrics.add_bytes(read=5))
+        worker.start()
+        worker.join()
+    assert metrics.stats["menu_ds"]["bytes_read"] == 0
+    assert metrics.bytes_read == 5
+
+
+def test_output_formats(metrics, data_dir):
+    """
+    Metrics are saved as JSON, or as Prometheus text for .prom files.
+    """
+    with metrics.action(action="va"):
+        metrics.add_bytes(written=7)
+    with metrics.action(action="bad"):
+        pass
+
+    metrics.dump(file_name="metrics.json")
+    saved = json.loads((data_dir / "metrics.json").read_text())
+    assert saved["bytes_written"] == 7
+    assert saved["metrics"]["menu_va"]["calls"] == 1
+    assert saved["metrics"]["menu_invalid"]["calls"] == 1
+
+    metrics.dump(file_name="metrics.prom")
+    lines = (data_dir / "metrics.prom").read_text().splitlines()
+    assert "# TYPE task_manager_calls_total counter" in lines
+    assert 'task_manager_bytes_written_total{name="menu_va"} 7' in lines
+
+
+def test_profile_action(data_dir, monkeypatch):
+    """
+    Every use of the profiled action adds to one profile.
+    """
+    metrics = tm.Metrics(profile_action="va")
+    monkeypatch.setattr(tm, "METRICS", metrics)
+    assert not metrics.save_profile(file_name="profile_va.prof")
+
+    for _ in range(2):
+        session_replay.run_session(
+            inputs=["admin", "password", "va", "e"], page_size=0
+        )
+    assert metrics.stats == {}
+    assert metrics.save_profile(file_name="profile_va.prof")
+    assert (data_dir / "profile_va.prof").stat().st_size > 0
+
+
+@pytest.mark.parametrize("from_env", [False, True])
+def test_metrics_from_command_line(data_dir, monkeypatch, from_env):
+    """
+    --metrics, or the environment variable, turns the metrics on and saves
+    them on exit.
+    """
+    monkeypatch.setattr(tm, "METRICS", tm.METRICS)
+    if from_env:
+        monkeypatch.setenv(tm.METRICS_ENV_VAR, "metrics.json")
+        tm.main(["report"])
+    else:
+        monkeypatch.delenv(tm.METRICS_ENV_VAR, raising=False)
+        tm.main(["--metrics", "metrics.json", "report"])
+
+    saved = json.loads((data_dir / "metrics.json").read_text())
+    assert saved["metrics"]["generate_reports"]["calls"] == 1
+    assert saved["bytes_written"] > 0
@@ -0,0 +1,63 @@
+"""
+Tests of parsing and counting shares of a large tasks.txt in worker
+processes.
+"""
+
+# ====importing libraries====
+from datetime import date
+
+import benchmark
+import task_manager as tm
+from conftest import task_fields
+
+CURR_DATE = date(2021, 1, 1)
+
+
+def test_parallel_load_agrees(data_dir, monkeypatch):
+    """
+    Loading and counting shares of tasks.txt in worker processes gives
+    the same tasks and counts as a single pass.
+    """
+    benchmark.write_synthetic_data(tasks=3000, users=20)
+    monkeypatch.setattr(tm, "PARALLEL_CHUNK_BYTES", 16 * 1024)
+    serial = tm.FlatFileStorage()
+    parallel = tm.FlatFileStorage(workers=3)
+    assert len(parallel.split_task_file()) > 1
+
+    assert task_fields(parallel.load_task_store()) == task_fields(
+        serial.load_task_store()
+    )
+    usernames = tm.get_username_password(tm.get_user_data()).keys()
+    assert parallel.report_counts(
+        usernames=usernames, curr_date=CURR_DATE
+    ) == serial.report_counts(usernames=usernames, curr_date=CURR_DATE)
+
+
+def test_parallel_load_applies_journal(data_dir, monkeypatch):
+    """
+    Journalled changes are applied to the tasks in whichever share holds
+    them, and journalled tasks added after the last share.
+    """
+    benchmark.write_synthetic_data(tasks=3000, users=20)
+    monkeypatch.setattr(tm, "PARALLEL_CHUNK_BYTES", 16 * 1024)
+    serial = tm.FlatFileStorage()
+    task_list = serial.load_task_store()
+    new_task = tm.parse_task(
+        "user1;Journalled;Added after tasks.txt;2030-01-01;2021-01-01;No"
+    )
+    tm.append_task(task_list=task_list, task=new_task, commit=False)
+    changes = [("add", len(task_list) - 1, new_task)] + [
+        tm.update_task(
+            task_list=task_list,
+            task_num=task_num,
+            field="username",
+            value="user2",
+            commit=False,
+        )
+        for task_num in (0, 1500, 2999, 3000)
+    ]
+    serial.commit(task_list=task_list, changes=changes)
+
+    parallel = tm.FlatFileStorage(workers=3)
+    assert task_fields(parallel.load_task_store()) == task_fields(task_list)
+    assert task_fields(serial.load_task_store()) == task_fields(task_list)
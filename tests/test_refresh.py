@@ -0,0 +1,56 @@
+"""
+Tests of picking up the changes other sessions save to the storage.
+"""
+
+# ====importing libraries====
+import task_manager as tm
+from conftest import task_fields
+
+
+def new_task(title: str) -> tm.Task:
+    """
+    Make a task for user1 with the given title.
+    """
+    return tm.parse_task(
+        f"user1;{title};Added by a test;2030-01-01;2021-01-01;No"
+    )
+
+
+def session_tasks(session) -> list[tm.Task]:
+    """
+    Load the tasks straight from another session's storage.
+    """
+    return [tm.parse_task(t_str) for t_str in session.iter_task_data()]
+
+
+def test_refresh_reads_other_sessions(storage):
+    """
+    refresh_task_list picks up tasks added by another session, and the
+    storage says whether memory is still the same as the stored tasks.
+    """
+    task_list = tm.load_task_list()
+    task_index = tm.build_task_index(task_list=task_list)
+    assert storage.tasks_current()
+
+    other_session = type(storage)()
+    other_tasks = session_tasks(other_session)
+    other_tasks.append(new_task("From elsewhere"))
+    other_session.commit(
+        task_list=other_tasks,
+        changes=[
+            ("add", len(other_tasks) - 1, other_tasks[-1]),
+            ("set", 0, "completed", True),
+        ],
+    )
+    other_tasks[0].completed = True
+    assert not storage.tasks_current()
+
+    task_list, task_index = tm.refresh_task_list(
+        task_list=task_list, task_index=task_index
+    )
+    assert task_list[-1].title == "From elsewhere"
+    assert storage.tasks_current()
+    assert task_fields(task_list) == task_fields(other_tasks)
+    assert task_index["by_user"] == tm.build_task_index(task_list=task_list)[
+        "by_user"
+    ]
@@ -0,0 +1,113 @@
+"""
+Tests of reusing the last reports while the tasks and users they were
+generated from are unchanged.
+"""
+
+# ====importing libraries====
+import task_manager as tm
+
+
+def counted_renders(monkeypatch) -> list:
+    """
+    Count the times the reports are rendered rather than reused.
+    """
+    renders = []
+    render_reports = tm.render_reports
+
+    def counted_render(counts, user_count):
+        renders.append(user_count)
+        return render_reports(counts=counts, user_count=user_count)
+
+    monkeypatch.setattr(tm, "render_reports", counted_render)
+    return renders
+
+
+def report_files() -> tuple[str, str]:
+    """
+    Read task_overview.txt and user_overview.txt.
+    """
+    with open("task_overview.txt") as task_file:
+        task_overview = task_file.read()
+    with open("user_overview.txt") as user_file:
+        user_overview = user_file.read()
+    return task_overview, user_overview
+
+
+def generate():
+    """
+    Generate the reports as the report command does.
+    """
+    tm.generate_reports(
+        task_list=None,
+        username_password=tm.get_username_password(tm.get_user_data()),
+        cache=True,
+    )
+
+
+def test_unchanged_data_reused(storage, monkeypatch):
+    """
+    The reports are only rendered once while the data is unchanged, also
+    by a later session reading the cache file.
+    """
+    renders = counted_renders(monkeypatch)
+    generate()
+    reports = report_files()
+
+    generate()
+    monkeypatch.setattr(tm, "REPORT_CACHE", tm.ReportCache())
+    generate()
+
+    assert len(renders) == 1
+    assert report_files() == reports
+
+
+def test_changes_invalidate(storage, monkeypatch):
+    """
+    Saving a task or adding a user means the reports are generated again.
+    """
+    renders = counted_renders(monkeypatch)
+    generate()
+
+    task_list = tm.load_task_list()
+    tm.update_task(
+        task_list=task_list, task_num=0, field="completed", value=True
+    )
+    generate()
+    assert len(renders) == 2
+    assert "Total Number of Completed Tasks: \t2" in report_files()[0]
+
+    tm.STORAGE.add_user(username="user3", password="pw3")
+    generate()
+    assert len(renders) == 3
+    assert report_files()[1].startswith("Total Number of Users: \t4\n")
+
+
+def test_removed_files_rewritten(storage, data_dir, monkeypatch):
+    """
+    Report files removed or changed since are written again from the
+    cache without rendering.
+    """
+    renders = counted_renders(monkeypatch)
+    generate()
+    task_overview, user_overview = report_files()
+
+    (data_dir / "task_overview.txt").unlink()
+    with open("user_overview.txt", "a") as user_file:
+        user_file.write("\nEdited by hand")
+    generate()
+
+    assert len(renders) == 1
+    assert report_files() == (task_overview, user_overview)
+
+
+def test_unreadable_cache_ignored(data_dir, monkeypatch):
+    """
+    A cache file that can't be read is ignored and replaced.
+    """
+    renders = counted_renders(monkeypatch)
+    (data_dir / tm.REPORT_CACHE_FILE).write_text("not json")
+    generate()
+    generate()
+
+    assert len(renders) == 1
+    assert tm.REPORT_CACHE.load()["task_overview"] == report_files()[0]
@@ -0,0 +1,153 @@
+"""
+Tests of generating the reports on a background thread with ReportWorker.
+"""
+
+# ====importing libraries====
+import threading
+
+import pytest
+
+import task_manager as tm
+from conftest import TASK_LINES
+
+
+@pytest.fixture
+def worker(data_dir):
+    """
+    A ReportWorker of its own, finished with before leaving data_dir.
+    """
+    worker = tm.ReportWorker()
+    yield worker
+    worker.wait()
+    if worker.executor is not None:
+        worker.executor.shutdown()
+
+
+@pytest.fixture
+def loaded():
+    """
+    The tasks loaded from data_dir, their indexes and the users.
+    """
+    task_list = tm.load_task_list()
+    task_index = tm.build_task_index(task_list=task_list)
+    username_password = tm.get_username_password(tm.get_user_data())
+    return task_list, task_index, username_password
+
+
+def held_builds(monkeypatch) -> tuple[threading.Event, list]:
+    """
+    Hold every report job until the returned event is set, and list the
+    signature each job was given.
+    """
+    release = threading.Event()
+    signatures = []
+    build_reports = tm.build_reports
+
+    def held_build(signature, **kwargs):
+        signatures.append(signature)
+        release.wait(timeout=10)
+        return build_reports(signature=signature, **kwargs)
+
+    monkeypatch.setattr(tm, "build_reports", held_build)
+    return release, signatures
+
+
+def test_reports_match(worker, loaded):
+    """
+    The reports from a snapshot of the task stats are the same as those
+    counted from the task list.
+    """
+    task_list, task_index, username_password = loaded
+    job = worker.submit(
+        username_password=username_password, task_index=task_index
+    )
+    task_overview, user_overview = job.result(timeout=10)
+
+    tm.generate_reports(
+        task_list=task_list, username_password=username_password
+    )
+    with open("task_overview.txt") as task_file:
+        assert task_file.read() == task_overview
+    with open("user_overview.txt") as user_file:
+        assert user_file.read() == user_overview
+    assert f"Total Number of Tasks: \t{len(TASK_LINES)}" in user_overview
+
+
+def test_requests_share_a_job(worker, loaded, monkeypatch):
+    """
+    Requests for the same stored data while its reports are generated
+    share one job, and the reports are cached once done.
+    """
+    _, task_index, username_password = loaded
+    release, signatures = held_builds(monkeypatch)
+
+    first = worker.submit(
+        username_password=username_password, task_index=task_index
+    )
+    second = worker.submit(
+        username_password=username_password, task_index=task_index
+    )
+    release.set()
+
+    task_overview, _ = first.result(timeout=10)
+    assert second is first
+    assert len(signatures) == 1 and signatures[0] is not None
+    assert tm.REPORT_CACHE.load()["task_overview"] == task_overview
+
+
+def test_unsaved_changes_not_cached(worker, loaded, monkeypatch):
+    """
+    While memory holds tasks that aren't the stored ones, each request
+    gets a job of its own and nothing is cached.
+    """
+    _, task_index, username_password = loaded
+    release, signatures = held_builds(monkeypatch)
+    other_session = tm.FlatFileStorage()
+    other_tasks = [tm.parse_task(t_str) for t_str in TASK_LINES]
+    other_session.commit(
+        task_list=other_tasks, changes=[("set", 0, "completed", True)]
+    )
+
+    first = worker.submit(
+        username_password=username_password, task_index=task_index
+    )
+    second = worker.submit(
+        username_password=username_password, task_index=task_index
+    )
+    release.set()
+
+    assert first.result(timeout=10) == second.result(timeout=10)
+    assert second is not first
+    assert signatures == [None, None]
+    assert tm.REPORT_CACHE.load() is None
+
+
+def test_notices(worker, loaded, monkeypatch):
+    """
+    Each job asked to be announced is announced once when done, with its
+    error if it failed.
+    """
+    _, task_index, username_password = loaded
+    worker.submit(
+        username_password=username_password,
+        task_index=task_index,
+        notify=False,
+    )
+    worker.wait()
+    assert worker.take_notices() == []
+
+    worker.submit(username_password=username_password, task_index=task_index)
+    worker.wait()
+    assert worker.take_notices() == [
+        "\nReports ready: task_overview.txt and"
+        " user_overview.txt have been written."
+    ]
+    assert worker.take_notices() == []
+
+    def failed_build(**kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(tm, "build_reports", failed_build)
+    worker.submit(username_password=username_password, task_index=task_index)
+    worker.wait()
+    assert worker.take_notices() == ["\nReport generation failed: disk full"]
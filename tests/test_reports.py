@@ -0,0 +1,128 @@
+"""
+Tests of the report counts and of task_overview.txt and user_overview.txt
+against the reports written before the counting backends were added.
+
+The golden reports in tests/golden/<tasks> were written by the original
+generate_reports from benchmark.write_synthetic_data(tasks, users=50,
+today=REPORT_DATE), for 10000 (the default), 1000000 and 5000000 tasks.
+Pick the size with --report-tasks, e.g. --report-tasks 5000000.
+"""
+
+# ====importing libraries====
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+import benchmark
+import task_manager as tm
+
+CURR_DATE = date(2021, 1, 1)
+USERNAMES = ("admin", "user1", "user2")
+GOLDEN_DIR = Path(__file__).parent / "golden"
+REPORT_DATE = date(2024, 6, 1)
+REPORT_USERS = 50
+
+
+class ReportDate(date):
+    """
+    A date whose today() is REPORT_DATE, so the golden reports stay valid.
+    """
+
+    @classmethod
+    def today(cls) -> date:
+        return REPORT_DATE
+
+
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+def test_count_backends_agree(data_dir, backend):
+    """
+    Every way of counting gives the same counts, including for a user
+    with tasks who is missing from the user list.
+    """
+    if backend == "numpy" and tm.np is None:
+        pytest.skip("NumPy is not installed")
+    task_list = tm.load_task_list()
+    counts = tm.count_tasks(
+        task_list=task_list,
+        usernames=USERNAMES,
+        curr_date=CURR_DATE,
+        backend=backend,
+    )
+
+    total_tasks, total_completed, total_overdue, user_dict = counts
+    assert (total_tasks, total_completed, total_overdue) == (5, 1, 3)
+    assert user_dict["ghost"] == {
+        "task_count": 1,
+        "completed": 0,
+        "overdue": 1,
+    }
+    assert user_dict["user2"]["overdue"] == 1
+
+    task_index = tm.build_task_index(task_list=task_list)
+    assert (
+        tm.stats_counts(
+            stats=task_index["stats"], usernames=USERNAMES, curr_date=CURR_DATE
+        )
+        == counts
+    )
+    assert (
+        tm.load_task_list(store="columnar").count_tasks(
+            usernames=USERNAMES, curr_date=CURR_DATE
+        )
+        == counts
+    )
+    assert (
+        tm.count_tasks(
+            task_list=iter(task_list),
+            usernames=USERNAMES,
+            curr_date=CURR_DATE,
+        )
+        == counts
+    )
+
+
+@pytest.mark.parametrize(
+    "backend", ["python", "numpy", "columnar", "stats", "storage"]
+)
+def test_reports_match_baseline(data_dir, monkeypatch, request, backend):
+    """
+    generate_reports writes the same report files, byte for byte, as
+    before, however the tasks are counted.
+    """
+    tasks = request.config.getoption("report_tasks")
+    golden_dir = GOLDEN_DIR / str(tasks)
+    if not golden_dir.is_dir():
+        pytest.skip(f"No golden reports for {tasks} tasks")
+    if backend in ("numpy", "columnar") and tm.np is None:
+        pytest.skip("NumPy is not installed")
+    if backend == "python":
+        monkeypatch.setattr(tm, "np", None)
+    monkeypatch.setattr(tm, "date", ReportDate)
+    benchmark.write_synthetic_data(
+        tasks=tasks, users=REPORT_USERS, today=REPORT_DATE
+    )
+    username_password = tm.get_username_password(tm.get_user_data())
+
+    if backend == "storage":
+        tm.generate_reports(
+            task_list=None, username_password=username_password
+        )
+    elif backend == "columnar":
+        tm.generate_reports(
+            task_list=tm.load_task_list(store="columnar"),
+            username_password=username_password,
+        )
+    else:
+        task_list = tm.load_task_list()
+        task_index = tm.build_task_index(task_list=task_list)
+        tm.generate_reports(
+            task_list=task_list,
+            username_password=username_password,
+            task_index=task_index if backend == "stats" else None,
+        )
+
+    for file_name in tm.REPORT_FILES:
+        assert (data_dir / file_name).read_bytes() == (
+            golden_dir / file_name
+        ).read_bytes()
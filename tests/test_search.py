@@ -0,0 +1,157 @@
+"""
+Tests of searching task titles and descriptions, and of the search index
+kept up to date as tasks change.
+"""
+
+# ====importing libraries====
+import random
+
+import pytest
+
+import task_manager as tm
+from conftest import TASK_LINES
+
+
+@pytest.fixture(params=["list", "columnar"])
+def loaded(request, data_dir):
+    """
+    The tasks loaded from data_dir, held each way, and their indexes.
+    """
+    task_list = tm.load_task_list(store=request.param)
+    return task_list, tm.build_task_index(task_list=task_list)
+
+
+def search(loaded, query: str, username: str | None = None) -> list[int]:
+    """
+    Search the loaded tasks.
+    """
+    task_list, task_index = loaded
+    return tm.search_task_nums(
+        task_list=task_list,
+        task_index=task_index,
+        query=query,
+        username=username,
+    )
+
+
+def test_every_word_must_match(loaded):
+    """
+    Tasks match when every query word starts a word in their title or
+    description, in any case and order.
+    """
+    assert search(loaded, "report") == [2]
+    assert search(loaded, "REPORT quarterly") == [2]
+    assert search(loaded, "report tap") == []
+    assert search(loaded, "plumb tap") == [1]
+    assert search(loaded, "t") == [0, 1, 3, 4]
+    assert search(loaded, "ap") == []
+    assert search(loaded, " ;, ") == []
+
+
+def test_mine_only(loaded):
+    """
+    A search can be kept to one user's tasks.
+    """
+    assert search(loaded, "t", username="user1") == [1]
+    assert search(loaded, "report", username="user1") == [2]
+    assert search(loaded, "fence", username="user1") == []
+    assert search(loaded, "fence", username="nobody") == []
+
+
+def test_built_at_load(data_dir):
+    """
+    The search index is built with the other indexes unless asked not to,
+    when the first search builds it, and a full reload keeps to that.
+    """
+    task_list = tm.load_task_list()
+    assert tm.build_task_index(task_list=task_list)["search"] is not None
+
+    task_index = tm.build_task_index(task_list=task_list, search=False)
+    assert task_index["search"] is None
+    _, task_index = tm.refresh_task_list(
+        task_list=task_list, task_index=task_index, full=True
+    )
+    assert task_index["search"] is None
+    assert tm.search_task_nums(
+        task_list=task_list, task_index=task_index, query="fence"
+    ) == [3]
+    assert task_index["search"] is not None
+
+    _, task_index = tm.refresh_task_list(
+        task_list=task_list, task_index=task_index, full=True
+    )
+    assert task_index["search"] is not None
+
+
+def test_index_follows_changes(loaded):
+    """
+    Added tasks and changed titles, descriptions and users are found by
+    later searches without building the index again.
+    """
+    task_list, task_index = loaded
+    search_index = task_index["search"]
+    tm.append_task(
+        task_list=task_list,
+        task=tm.parse_task(
+            "user2;Fix gutter;Leaking downpipe;2030-01-01;2021-01-01;No"
+        ),
+        task_index=task_index,
+        commit=False,
+    )
+    for task_num, field, value in [
+        (1, "title", "Replace boiler"),
+        (3, "description", "One coat of varnish"),
+        (2, "username", "user2"),
+    ]:
+        tm.update_task(
+            task_list=task_list,
+            task_num=task_num,
+            field=field,
+            value=value,
+            task_index=task_index,
+            commit=False,
+        )
+
+    assert task_index["search"] is search_index
+    assert search(loaded, "leak") == [5]
+    assert search(loaded, "tap") == []
+    assert search(loaded, "boiler plumbing") == [1]
+    assert search(loaded, "two") == []
+    assert search(loaded, "varnish fence") == [3]
+    assert search(loaded, "report", username="user2") == [2]
+    assert search(loaded, "report", username="user1") == []
+
+
+def test_index_matches_rebuilt(data_dir):
+    """
+    After many random changes, the index kept up to date is the same as
+    one built from the tasks.
+    """
+    task_list = tm.load_task_list()
+    task_index = tm.build_task_index(task_list=task_list)
+    rng = random.Random(0)
+    words = ["fix", "paint", "report", "tap", "fence", "roof", "door"]
+
+    for _ in range(200):
+        text = " ".join(rng.sample(words, k=rng.randint(1, 3)))
+        if rng.random() < 0.2:
+            tm.append_task(
+                task_list=task_list,
+                task=tm.parse_task(
+                    f"user1;{text};{text};2030-01-01;2021-01-01;No"
+                ),
+                task_index=task_index,
+                commit=False,
+            )
+        else:
+            tm.update_task(
+                task_list=task_list,
+                task_num=rng.randrange(len(task_list)),
+                field=rng.choice(["title", "description"]),
+                value=text,
+                task_index=task_index,
+                commit=False,
+            )
+
+    assert len(task_list) > len(TASK_LINES)
+    assert task_index["search"] == tm.build_search_index(task_list=task_list)
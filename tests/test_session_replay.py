@@ -0,0 +1,98 @@
+"""
+Tests of driving the menus with a ScriptedConsole, and of recording and
+replaying sessions with session_replay.py.
+"""
+
+# ====importing libraries====
+import builtins
+
+import session_replay
+import task_manager as tm
+from conftest import TASK_LINES
+
+
+def test_scripted_session(data_dir):
+    """
+    A scripted session logs in, runs menu actions and exits, with the time
+    of each action kept.
+    """
+    completed, action_times = session_replay.run_session(
+        inputs=[
+            "user1",
+            "pw1",
+            "a",
+            "user2",
+            "Scripted task",
+            "Added by a script",
+            "2030-01-01",
+            "va",
+            "vm",
+            "-1",
+            "e",
+        ],
+        page_size=0,
+    )
+
+    assert completed
+    assert sorted(action_times) == ["a", "va", "vm"]
+    assert tm.load_task_list()[-1].title == "Scripted task"
+    assert isinstance(tm.CONSOLE, tm.Console)
+
+
+def test_session_out_of_input(data_dir):
+    """
+    A session whose input runs out before exit is reported incomplete.
+    """
+    completed, _ = session_replay.run_session(inputs=["admin", "password"])
+    assert not completed
+
+
+def test_generated_sessions_replay(data_dir):
+    """
+    Generated sessions all reach exit when replayed in order, and the
+    tasks and users they add are saved.
+    """
+    sessions = session_replay.generate_sessions(
+        count=30,
+        username_password=tm.get_username_password(tm.get_user_data()),
+        task_list=tm.load_task_list(),
+        page_size=2,
+        seed=1,
+    )
+    added_tasks = sum(inputs.count("a") for inputs in sessions)
+    added_users = sum(inputs.count("r") for inputs in sessions)
+
+    action_times = {}
+    for inputs in sessions:
+        completed, session_times = session_replay.run_session(
+            inputs=inputs, page_size=2
+        )
+        assert completed
+        for action, seconds in session_times.items():
+            action_times.setdefault(action, []).extend(seconds)
+
+    assert len(tm.load_task_list()) == len(TASK_LINES) + added_tasks
+    assert len(tm.get_user_data()) == 3 + added_users
+    summary = session_replay.latency_summary(action_times=action_times)
+    assert summary["a"]["count"] == added_tasks
+    assert all(
+        stats["p50_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+        for stats in summary.values()
+    )
+
+
+def test_recorded_session_round_trip(data_dir, monkeypatch):
+    """
+    A session recorded with RecordingConsole is saved and loaded back as
+    typed.
+    """
+    typed = iter(["admin", "password", "va", "e"])
+    monkeypatch.setattr(builtins, "input", lambda prompt="": next(typed))
+    console = tm.RecordingConsole()
+    for _ in range(4):
+        console.input("> ")
+    console.save(file_name="sessions.jsonl")
+    console.save(file_name="sessions.jsonl")
+
+    sessions = session_replay.load_sessions(file_name="sessions.jsonl")
+    assert sessions == [["admin", "password", "va", "e"]] * 2
@@ -0,0 +1,125 @@
+"""
+Tests of the text, sqlite and binary storages: saving and loading tasks
+and users.
+"""
+
+# ====importing libraries====
+from datetime import date
+
+import pytest
+
+import task_manager as tm
+from conftest import TASK_LINES, USER_LINES, task_fields
+
+CURR_DATE = date(2021, 1, 1)
+
+
+def new_task(title: str) -> tm.Task:
+    """
+    Make a task for user1 with the given title.
+    """
+    return tm.parse_task(
+        f"user1;{title};Added by a test;2030-01-01;2021-01-01;No"
+    )
+
+
+def test_round_trip(storage):
+    """
+    Tasks and changes saved by one session are loaded by the next.
+    """
+    task_list = tm.load_task_list()
+    assert task_fields(task_list) == task_fields(
+        tm.parse_task(t_str) for t_str in TASK_LINES
+    )
+
+    tm.append_task(task_list=task_list, task=new_task("Round trip"))
+    changes = [
+        tm.update_task(
+            task_list=task_list,
+            task_num=0,
+            field="completed",
+            value=True,
+            commit=False,
+        ),
+        tm.update_task(
+            task_list=task_list,
+            task_num=1,
+            field="due_date",
+            value=date(2031, 6, 1),
+            commit=False,
+        ),
+        tm.update_task(
+            task_list=task_list,
+            task_num=3,
+            field="username",
+            value="newcomer",
+            commit=False,
+        ),
+    ]
+    tm.commit_task_changes(task_list=task_list, changes=changes)
+
+    tm.set_storage(type(storage)())
+    assert task_fields(tm.load_task_list()) == task_fields(task_list)
+    assert task_fields(tm.load_task_list(store="columnar")) == task_fields(
+        task_list
+    )
+
+
+def test_users_round_trip(storage):
+    """
+    Users added one at a time or in a batch are found by the next session.
+    """
+    tm.STORAGE.add_user(username="user3", password="pw3")
+    tm.STORAGE.add_users(users=[("user4", "pw4"), ("user5", "pw5")])
+    with pytest.raises(tm.StaleDataError):
+        tm.STORAGE.add_user(username="user4", password="other")
+
+    next_session = type(storage)()
+    assert next_session.get_user(username="user1") == "pw1"
+    assert next_session.get_user(username="user5") == "pw5"
+    assert next_session.get_user(username="nobody") is None
+    assert len(next_session.get_user_data()) == 6
+
+
+def test_report_counts(storage):
+    """
+    Each storage counts the stored tasks as count_tasks does.
+    """
+    usernames = ("admin", "user1", "user2")
+    assert storage.report_counts(
+        usernames=usernames, curr_date=CURR_DATE
+    ) == tm.count_tasks(
+        task_list=tm.load_task_list(),
+        usernames=usernames,
+        curr_date=CURR_DATE,
+    )
+
+
+@pytest.mark.parametrize("target_type", sorted(tm.STORAGE_TYPES))
+def test_migrate_round_trip(data_dir, target_type):
+    """
+    Tasks and users migrated to a storage and back are unchanged.
+    """
+    if target_type == "text":
+        target = tm.FlatFileStorage(
+            task_file="copy_tasks.txt",
+            user_file="copy_user.txt",
+            journal_file="copy_journal.txt",
+            user_index_file="copy_user.idx",
+        )
+    else:
+        target = tm.STORAGE_TYPES[target_type]()
+    assert tm.migrate_storage(source=tm.FlatFileStorage(), target=target) == (
+        len(TASK_LINES),
+        len(USER_LINES),
+    )
+
+    back = tm.FlatFileStorage(
+        task_file="back_tasks.txt",
+        user_file="back_user.txt",
+        journal_file="back_journal.txt",
+        user_index_file="back_user.idx",
+    )
+    tm.migrate_storage(source=target, target=back)
+    assert list(back.iter_task_data()) == TASK_LINES
+    assert back.get_user_data() == USER_LINES
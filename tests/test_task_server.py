@@ -0,0 +1,277 @@
+"""
+Tests of task_server.py: the commands clients send, and the writer that
+saves their changes in batches.
+"""
+
+# ====importing libraries====
+import asyncio
+import contextlib
+import os
+
+import task_manager as tm
+import task_server
+from conftest import TASK_LINES
+
+SOCKET = "test_server.sock"
+
+
+class Client:
+    """
+    A client connected to the test server.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def command(self, line: str) -> list[str]:
+        """
+        Send a command and get the lines of its response.
+        """
+        self.writer.write(f"{line}\n".encode())
+        await self.writer.drain()
+        return await self.response()
+
+    async def response(self) -> list[str]:
+        """
+        Read a response up to END_OF_RESPONSE.
+        """
+        lines = []
+        while True:
+            line = (await self.reader.readline()).decode().rstrip("\n")
+            if line == task_server.END_OF_RESPONSE:
+                return lines
+            lines.append(line[1:] if line.startswith("..") else line)
+
+
+def run_server(test, **options):
+    """
+    Serve the tasks in the working directory while running test, which is
+    passed the server and a function that connects a client logged in as
+    a user (or not logged in, with None).
+    """
+
+    async def connect(username: str | None) -> Client:
+        client = Client(*await asyncio.open_unix_connection(SOCKET))
+        assert (await client.response())[0] == "OK"
+        if username is not None:
+            password = server.username_password[username]
+            assert await client.command(f"login;{username};{password}") == [
+                "OK",
+                "Login Successful!",
+            ]
+        return client
+
+    async def run():
+        serving = asyncio.create_task(server.serve(socket_path=SOCKET))
+        while not os.path.exists(SOCKET):
+            await asyncio.sleep(0.01)
+        try:
+            await test(server, connect)
+        finally:
+            serving.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await serving
+
+    server = task_server.TaskServer(**options)
+    asyncio.run(run())
+
+
+def test_commands(data_dir):
+    """
+    Commands need a login, pages are sent one at a time, and users can
+    only change their own tasks.
+    """
+
+    async def test(server, connect):
+        client = await connect(None)
+        assert await client.command("va") == ["ERR Please log in first"]
+        assert await client.command("login;user1;wrong") == [
+            "ERR Wrong password"
+        ]
+        assert await client.command("login;user1;pw1") == [
+            "OK",
+            "Login Successful!",
+        ]
+
+        first_page = await client.command("va")
+        assert first_page[0] == "OK"
+        assert first_page[-1] == "Page 1 of 3"
+        assert (await client.command("va;3"))[-1] == "Page 3 of 3"
+        assert await client.command("va;4") == ["ERR Page must be 1 to 3"]
+        assert await client.command("va;x") == [
+            "ERR Invalid input, please input an integer."
+        ]
+        assert (await client.command("vm"))[-1] == "Page 1 of 1"
+        assert (await client.command("s;fence"))[-1] == "Page 1 of 1"
+        assert await client.command("s;fence;mine") == [
+            "OK",
+            "No tasks match your search.",
+        ]
+
+        assert await client.command("complete;3") == [
+            "ERR Task number not one of your tasks"
+        ]
+        assert await client.command("complete;2") == [
+            "ERR This task is complete and cannot be edited."
+        ]
+        assert await client.command("assign;1;nobody") == [
+            "ERR User does not exist"
+        ]
+        assert await client.command("due;1;2031-02-03") == [
+            "OK",
+            "Due date updated.",
+        ]
+        assert await client.command("a;user2;Served;From a client;bad") == [
+            "ERR Invalid date format. Please use the format specified."
+        ]
+        assert await client.command("a;user2;Served;From a client;2030-01-01")
+        assert await client.command("gr") == ["ERR Only admin can do this"]
+        assert await client.command("nope") == [
+            "ERR Invalid choice, see help"
+        ]
+        assert "gr" in "\n".join(await client.command("help"))
+        assert await client.command("e") == [
+            "OK",
+            "You are exiting the program. Goodbye.",
+        ]
+
+    run_server(test, page_size=2)
+
+    task_list = tm.load_task_list()
+    assert len(task_list) == len(TASK_LINES) + 1
+    assert task_list[1].due_date == tm.parse_date("2031-02-03")
+    assert task_list[-1].title == "Served"
+
+
+def test_changes_saved_in_batches(data_dir, monkeypatch):
+    """
+    Changes sent by many clients at once are saved together: the task
+    changes with one commit and the new users with one add_users call.
+    """
+    commits = []
+    user_batches = []
+    commit_task_changes = tm.commit_task_changes
+    add_users = tm.STORAGE.add_users
+
+    def counted_commit(task_list, changes):
+        commits.append(len(changes))
+        commit_task_changes(task_list=task_list, changes=changes)
+
+    def counted_add_users(users):
+        user_batches.append(list(users))
+        add_users(users=users)
+
+    monkeypatch.setattr(tm, "commit_task_changes", counted_commit)
+    monkeypatch.setattr(tm.STORAGE, "add_users", counted_add_users)
+
+    async def test(server, connect):
+        clients = [await connect("user1") for _ in range(6)]
+        responses = await asyncio.gather(
+            *(
+                client.command(f"a;user2;Batched {i};In a batch;2030-01-01")
+                for i, client in enumerate(clients[:4])
+            ),
+            clients[4].command("r;user3;pw3"),
+            clients[5].command("r;user4;pw4"),
+        )
+        assert all(response[0] == "OK" for response in responses)
+        assert await clients[0].command("r;user3;again") == [
+            "ERR Username already exists. Please choose a different username."
+        ]
+
+    run_server(test, flush_interval=0.2)
+
+    assert commits == [4]
+    assert [sorted(users) for users in user_batches] == [
+        [("user3", "pw3"), ("user4", "pw4")]
+    ]
+    titles = sorted(t.title for t in tm.load_task_list()[len(TASK_LINES) :])
+    assert titles == [f"Batched {i}" for i in range(4)]
+    assert tm.STORAGE.get_user(username="user4") == "pw4"
+
+
+def test_failed_batch_reloads(data_dir):
+    """
+    If another session saved changes first, the batch is refused and the
+    server loads the tasks again from the storage.
+    """
+
+    async def test(server, connect):
+        client = await connect("user1")
+        other_session = tm.FlatFileStorage()
+        other_tasks = [
+            tm.parse_task(t_str) for t_str in other_session.iter_task_data()
+        ]
+        other_tasks.append(
+            tm.parse_task(
+                "user1;Elsewhere;Saved first;2030-01-01;2021-01-01;No"
+            )
+        )
+        other_session.commit(
+            task_list=other_tasks,
+            changes=[("add", len(other_tasks) - 1, other_tasks[-1])],
+        )
+
+        response = await client.command("a;user1;Late;Saved second;2030-01-01")
+        assert response[0].startswith("ERR Could not save the change")
+        assert [t.title for t in server.task_list][-1] == "Elsewhere"
+        assert (await client.command("a;user1;Late;Again;2030-01-01"))[
+            0
+        ] == "OK"
+
+    run_server(test)
+
+    titles = [t.title for t in tm.load_task_list()]
+    assert titles[-2:] == ["Elsewhere", "Late"]
+
+
+def test_reports(data_dir, monkeypatch):
+    """
+    gr writes the report files and ds sends them as the menu displays
+    them, without touching the menu's console.
+    """
+    console = tm.CONSOLE
+
+    async def test(server, connect):
+        client = await connect("admin")
+        assert await client.command("gr") == ["OK", "Reports generated."]
+        (data_dir / "task_overview.txt").unlink()
+        response = await client.command("ds")
+
+        with open("task_overview.txt") as task_overview_file:
+            task_overview = task_overview_file.read()
+        with open("user_overview.txt") as user_overview_file:
+            user_overview = user_overview_file.read()
+        assert response == ["OK"] + tm.format_reports(
+            task_overview=task_overview, user_overview=user_overview
+        ).splitlines()
+        assert user_overview.startswith("Total Number of Users: \t3\n")
+
+    run_server(test)
+
+    assert tm.CONSOLE is console
+
+
+def test_long_line_refused(data_dir, monkeypatch):
+    """
+    A line over LINE_LIMIT is answered with an error and the connection
+    closed, while the server keeps serving other clients.
+    """
+    monkeypatch.setattr(task_server, "LINE_LIMIT", 1024)
+
+    async def test(server, connect):
+        client = await connect("user1")
+        assert await client.command("s;" + "x" * 1000) == [
+            "OK",
+            "No tasks match your search.",
+        ]
+        assert await client.command("s;" + "x" * 2000) == [
+            "ERR Line too long"
+        ]
+        assert await client.reader.read() == b""
+
+        other_client = await connect("user2")
+        assert (await other_client.command("vm"))[0] == "OK"
+
+    run_server(test)
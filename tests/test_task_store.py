@@ -0,0 +1,49 @@
+"""
+Tests of the columnar TaskStore.
+"""
+
+# ====importing libraries====
+from datetime import date
+
+import task_manager as tm
+from conftest import TASK_LINES, task_fields
+
+
+def test_columnar_load_agrees(data_dir):
+    """
+    A TaskStore loaded from tasks.txt holds the same tasks as a list.
+    """
+    columnar_tasks = tm.load_task_list(store="columnar")
+
+    assert isinstance(columnar_tasks, tm.TaskStore)
+    assert task_fields(columnar_tasks) == task_fields(
+        tm.load_task_list(store="list")
+    )
+    assert list(columnar_tasks.iter_lines()) == TASK_LINES
+
+
+def test_store_edits(data_dir):
+    """
+    Tasks set, appended and extended onto a store read back unchanged.
+    """
+    task_list = tm.load_task_list(store="list")
+    store = tm.load_task_list(store="columnar")
+
+    task_list[1].completed = True
+    task_list[1].title = "Fix the leaking tap"
+    task_list[2].username = "newcomer"
+    store[1] = task_list[1]
+    store[-3] = task_list[2]
+    extra = tm.TaskStore.from_lines(TASK_LINES[:3])
+    task_list.extend(extra)
+    store.extend(extra)
+    task_list.append(task_list[0])
+    store.append(task_list[0])
+
+    assert len(store) == len(task_list) == 9
+    assert task_fields(store) == task_fields(task_list)
+    assert store.count_tasks(
+        usernames=("admin",), curr_date=date(2021, 1, 1)
+    ) == tm.count_tasks(
+        task_list=task_list, usernames=("admin",), curr_date=date(2021, 1, 1)
+    )
@@ -0,0 +1,152 @@
+"""
+Tests of importing and exporting tasks and users as CSV and JSON lines.
+"""
+
+# ====importing libraries====
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import task_manager as tm
+from conftest import TASK_LINES, task_fields
+
+
+@pytest.mark.parametrize("file_format", tm.TRANSFER_FORMATS)
+def test_tasks_round_trip(storage, monkeypatch, file_format):
+    """
+    Exported tasks are imported again the same, a batch at a time,
+    without loading the stored tasks.
+    """
+    file_name = f"tasks.{file_format}"
+    assert tm.export_tasks(file_name=file_name, batch_size=2) == len(
+        TASK_LINES
+    )
+
+    with monkeypatch.context() as patch:
+        # Compact the text storage's journal after every batch, if it could
+        patch.setattr(tm, "JOURNAL_COMPACT_THRESHOLD", 2)
+        patch.setattr(tm, "load_task_list", None)
+        added, errors = tm.import_tasks(file_name=file_name, batch_size=2)
+
+    assert added == len(TASK_LINES) - 1
+    # ghost isn't a user, so their task can't be imported
+    assert errors == ["Record 5: unknown user 'ghost'"]
+    expected = [tm.parse_task(t_str) for t_str in TASK_LINES]
+    task_list = type(storage)().load_task_store()
+    assert task_fields(task_list) == task_fields(expected + expected[:-1])
+
+
+@pytest.mark.parametrize("file_format", tm.TRANSFER_FORMATS)
+def test_users_round_trip(storage, file_format):
+    """
+    Exported users are all refused as existing when imported again, and
+    new users are added.
+    """
+    file_name = f"users.{file_format}"
+    assert tm.export_users(file_name=file_name) == 3
+    added, errors = tm.import_users(file_name=file_name)
+    assert added == 0
+    assert errors == [
+        f"Record {record_num}: user {username!r} already exists"
+        for record_num, username in enumerate(
+            ("admin", "user1", "user2"), start=1
+        )
+    ]
+
+    with open("new_users.jsonl", "w") as users_file:
+        for username in ("user3", "user4", "user3"):
+            users_file.write(
+                json.dumps({"username": username, "password": "pw"}) + "\n"
+            )
+    added, errors = tm.import_users(file_name="new_users.jsonl")
+    assert added == 2
+    assert errors == ["Record 3: user 'user3' already exists"]
+    assert type(storage)().get_user(username="user4") == "pw"
+
+
+def task_record(**fields) -> dict:
+    """
+    Make a valid task record for user1, with the fields given changed.
+    """
+    return {
+        "username": "user1",
+        "title": "Imported",
+        "description": "Added by a test",
+        "due_date": "2030-01-01",
+        **fields,
+    }
+
+
+def test_invalid_tasks_skipped(data_dir):
+    """
+    Records that can't be stored are skipped with a message each, and the
+    valid ones imported with the optional fields defaulted.
+    """
+    records = [
+        task_record(title="Good"),
+        task_record(username="nobody"),
+        task_record(due_date="2021-02-30"),
+        task_record(due_date=None),
+        task_record(title="Semi;colon"),
+        task_record(title=""),
+        task_record(assigned_date="01/01/2021"),
+        task_record(completed="maybe"),
+        task_record(
+            username="user2",
+            title="Done",
+            assigned_date="2021-01-01",
+            completed=True,
+        ),
+    ]
+    with open("tasks.jsonl", "w") as tasks_file:
+        tasks_file.write(
+            "".join(json.dumps(record) + "\n" for record in records)
+        )
+
+    added, errors = tm.import_tasks(file_name="tasks.jsonl", batch_size=4)
+
+    assert added == 2
+    assert errors == [
+        "Record 2: unknown user 'nobody'",
+        "Record 3: due_date must be YYYY-MM-DD",
+        "Record 4: due_date must be YYYY-MM-DD",
+        "Record 5: title can't contain ';' or a line break",
+        "Record 6: title must be non-empty text",
+        "Record 7: assigned_date must be YYYY-MM-DD",
+        "Record 8: invalid completed value 'maybe'",
+    ]
+    good, done = tm.load_task_list()[len(TASK_LINES) :]
+    assert (good.title, good.completed) == ("Good", False)
+    assert good.assigned_date == tm.date.today()
+    assert (done.title, done.completed) == ("Done", True)
+
+
+def test_unknown_format_refused(data_dir):
+    """
+    Files that aren't .csv or .jsonl need their format given.
+    """
+    with pytest.raises(ValueError):
+        tm.export_tasks(file_name="tasks.txt.bak")
+    assert tm.export_tasks(file_name="tasks.out", file_format="csv") == 5
+
+
+def test_run_as_module(data_dir):
+    """
+    python -m task_manager from the directory above task_manager runs the
+    commands on the files in the working directory.
+    """
+    repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-m", "task_manager", "export", "tasks", "out.csv"],
+        env={**os.environ, "PYTHONPATH": repo_dir},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert "Exported 5 tasks" in result.stdout
+    with open("out.csv") as out_file:
+        assert len(out_file.read().splitlines()) == len(TASK_LINES) + 1
@@ -0,0 +1,137 @@
+"""
+Tests of view_all and view_pages: pages, moving between them and the
+cache of display strings.
+"""
+
+# ====importing libraries====
+import re
+
+import pytest
+
+import task_manager as tm
+
+TASK_COUNT = 45
+PAGE_SIZE = 20
+
+
+def make_tasks(count: int = TASK_COUNT) -> list[tm.Task]:
+    """
+    Make a list of tasks numbered in their titles.
+    """
+    return [
+        tm.parse_task(f"user1;Task {i};Details;2030-01-01;2021-01-01;No")
+        for i in range(count)
+    ]
+
+
+def shown_task_nums(output) -> list[int]:
+    """
+    Get the numbers of the tasks shown, in the order shown.
+    """
+    return [
+        int(task_num)
+        for task_num in re.findall(
+            r"Task Number: \t (\d+)", output.getvalue()
+        )
+    ]
+
+
+def test_pages_in_order(script):
+    """
+    Each page is shown in turn, and next on the last page goes back to
+    the menu.
+    """
+    output = script("n", "n", "n")
+    tm.view_all(task_list=make_tasks(), page_size=PAGE_SIZE)
+
+    assert shown_task_nums(output) == list(range(TASK_COUNT))
+    assert "Page 1 of 3 (tasks 0 to 19 of 45)" in output.getvalue()
+    assert "Page 3 of 3 (tasks 40 to 44 of 45)" in output.getvalue()
+
+
+def test_previous_and_jump(script):
+    """
+    Pages can be jumped to and stepped back through, and invalid choices
+    and page numbers are refused.
+    """
+    output = script("j", "3", "p", "p", "p", "j", "9", "x", "q")
+    tm.view_all(task_list=make_tasks(), page_size=PAGE_SIZE)
+
+    pages = [
+        list(range(0, 20)),
+        list(range(40, 45)),
+        list(range(20, 40)),
+        *[list(range(0, 20))] * 4,
+    ]
+    assert shown_task_nums(output) == [num for page in pages for num in page]
+    assert "Invalid page number" in output.getvalue()
+    assert "Invalid choice" in output.getvalue()
+
+
+def test_single_page_no_prompt(script):
+    """
+    A single page is shown without asking for the next one.
+    """
+    output = script()
+    tm.view_all(task_list=make_tasks(count=5), page_size=PAGE_SIZE)
+
+    assert shown_task_nums(output) == list(range(5))
+    assert "Page" not in output.getvalue()
+
+
+def test_no_pages(script, monkeypatch):
+    """
+    With a page size of 0 every task is written in batches, without
+    prompts.
+    """
+    monkeypatch.setattr(tm, "VIEW_BATCH_SIZE", 7)
+    output = script()
+    tm.view_all(task_list=make_tasks(), page_size=0)
+
+    assert shown_task_nums(output) == list(range(TASK_COUNT))
+
+
+def test_display_cache(script, monkeypatch):
+    """
+    Display strings are kept for the most recently shown tasks only, and
+    a changed task is shown as it is now.
+    """
+    monkeypatch.setattr(tm, "DISPLAY_CACHE_SIZE", 10)
+    task_list = make_tasks()
+    task_index = tm.build_task_index(task_list=task_list)
+    display_cache = task_index["display"]
+
+    script("n", "q")
+    tm.view_all(task_list=task_list, task_index=task_index, page_size=5)
+    assert list(display_cache) == list(range(10))
+
+    # Tasks 0 to 4 are shown again, so tasks 5 to 9 are dropped first
+    script("j", "9", "q")
+    tm.view_all(task_list=task_list, task_index=task_index, page_size=5)
+    assert list(display_cache) == [*range(5), *range(40, 45)]
+
+    tm.update_task(
+        task_list=task_list,
+        task_num=3,
+        field="completed",
+        value=True,
+        task_index=task_index,
+        commit=False,
+    )
+    assert 3 not in display_cache
+    output = script("q")
+    tm.view_all(task_list=task_list, task_index=task_index, page_size=5)
+    assert "Complete: \t Yes" in display_cache[3]
+    assert display_cache[3] in output.getvalue()
+
+
+@pytest.mark.parametrize("store", ["list", "columnar"])
+def test_empty(script, data_dir, store):
+    """
+    With no tasks, view_all says so.
+    """
+    (data_dir / "tasks.txt").write_text("")
+    output = script()
+    tm.view_all(task_list=tm.load_task_list(store=store))
+
+    assert "There are no tasks." in output.getvalue()